@@ -5,6 +5,7 @@ const API_BASE_URL = 'http://localhost:8001';
 let cy = null; // Cytoscape instance
 let currentLayout = null;
 let currentEpisodes = []; // Store episode data
+let episodesNextCursor = null; // Cursor for the next page of episodes
 let temporalMode = false; // Toggle temporal view
 
 // Initialize on page load
@@ -626,13 +627,41 @@ function exportGraph() {
     addChatMessage('Graph data exported successfully!', 'system');
 }
 
-function searchGraph() {
-    const query = document.getElementById('graph-search').value.toLowerCase();
+async function searchGraph() {
+    const query = document.getElementById('graph-search').value.trim();
     if (!query) return;
     
+    let matchIds = [];
+    try {
+        // Server-side typeahead index - works before the full graph is loaded
+        const params = new URLSearchParams({ q: query, limit: '10' });
+        const response = await fetch(`${API_BASE_URL}/graph/search?${params}`, {
+            headers: {
+                'X-API-Key': localStorage.getItem('apiKey') || ''
+            }
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const data = await response.json();
+        matchIds = data.matches.map(match => match.uuid);
+        
+        // Load the neighborhood of the best match if it isn't in the view yet
+        if (matchIds.length > 0 && cy.getElementById(matchIds[0]).empty()) {
+            await loadNeighborhood(matchIds[0]);
+        }
+    } catch (error) {
+        console.error('Entity search failed, searching loaded nodes only:', error);
+        const lowerQuery = query.toLowerCase();
+        matchIds = cy.nodes()
+            .filter(node => (node.data('label') || '').toLowerCase().includes(lowerQuery))
+            .map(node => node.id());
+    }
+    
     // Highlight matching nodes
+    const matches = new Set(matchIds);
     cy.nodes().forEach(node => {
-        if (node.data('label').toLowerCase().includes(query)) {
+        if (matches.has(node.id())) {
             node.addClass('highlighted');
             node.style('background-color', '#EF4444');
             node.style('width', 80);
@@ -652,6 +681,54 @@ function searchGraph() {
     }
 }
 
+async function loadNeighborhood(uuid) {
+    const response = await fetch(`${API_BASE_URL}/graph/neighborhood/${encodeURIComponent(uuid)}`, {
+        headers: {
+            'X-API-Key': localStorage.getItem('apiKey') || ''
+        }
+    });
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    
+    // Remove placeholder nodes shown when the graph is empty
+    cy.nodes('[type = "message"]').remove();
+    
+    const elements = [];
+    data.nodes.forEach(node => {
+        if (cy.getElementById(node.id).empty()) {
+            elements.push({
+                data: {
+                    id: node.id,
+                    label: node.label,
+                    type: node.type,
+                    ...node.properties
+                }
+            });
+        }
+    });
+    data.edges.forEach(edge => {
+        const edgeId = `edge-${edge.source}-${edge.target}`;
+        if (cy.getElementById(edgeId).empty()) {
+            elements.push({
+                data: {
+                    id: edgeId,
+                    source: edge.source,
+                    target: edge.target,
+                    label: edge.properties.name || edge.type || 'related'
+                }
+            });
+        }
+    });
+    
+    if (elements.length > 0) {
+        cy.add(elements);
+        cy.layout({ name: 'cose' }).run();
+        updateGraphCounts();
+    }
+}
+
 // Chat functionality
 function initializeChat() {
     const chatInput = document.getElementById('chat-input');
@@ -941,39 +1018,35 @@ function initializeEpisodeControls() {
     }
 }
 
-async function fetchLatestEpisodes() {
+async function fetchLatestEpisodes(cursor = null) {
     try {
-        // In a real implementation, this would fetch episode metadata
-        // For now, we'll simulate episode data
-        currentEpisodes = [
-            {
-                id: 'episode-1',
-                type: 'government',
-                timestamp: new Date().toISOString(),
-                description: 'Government structure update',
-                entities_added: 7,
-                relationships_added: 6,
-                source: 'Initial data load'
-            },
-            {
-                id: 'episode-2',
-                type: 'election',
-                timestamp: new Date(Date.now() - 86400000).toISOString(),
-                description: 'Election data update',
-                entities_added: 3,
-                relationships_added: 4,
-                source: 'AI Research Agent'
-            },
-            {
-                id: 'episode-3',
-                type: 'legal',
-                timestamp: new Date(Date.now() - 172800000).toISOString(),
-                description: 'City Charter amendments',
-                entities_added: 2,
-                relationships_added: 2,
-                source: 'Manual update'
+        const params = new URLSearchParams({ limit: '20' });
+        if (cursor) params.set('cursor', cursor);
+        
+        const response = await fetch(`${API_BASE_URL}/graph/episodes?${params}`, {
+            method: 'GET',
+            headers: {
+                'X-API-Key': localStorage.getItem('apiKey') || ''
             }
-        ];
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        const data = await response.json();
+        const episodes = data.episodes.map(episode => ({
+            id: episode.uuid,
+            type: episode.source || 'unknown',
+            timestamp: episode.valid_at || episode.created_at,
+            description: episode.name,
+            entities_added: episode.entity_count,
+            relationships_added: episode.edge_count,
+            source: episode.source_description || 'Unknown'
+        }));
+        
+        // Later pages are appended to the timeline
+        currentEpisodes = cursor ? currentEpisodes.concat(episodes) : episodes;
+        episodesNextCursor = data.next_cursor;
         
         document.getElementById('episode-count').textContent = currentEpisodes.length;
         
@@ -1038,6 +1111,15 @@ function populateEpisodeTimeline() {
         episodeCard.addEventListener('click', () => highlightEpisodeData(episode));
         episodeList.appendChild(episodeCard);
     });
+    
+    if (episodesNextCursor) {
+        const loadMore = document.createElement('button');
+        loadMore.type = 'button';
+        loadMore.className = 'w-full px-3 py-2 text-sm text-indigo-600 hover:text-indigo-800';
+        loadMore.textContent = 'Load older episodes';
+        loadMore.addEventListener('click', () => fetchLatestEpisodes(episodesNextCursor));
+        episodeList.appendChild(loadMore);
+    }
 }
 
 function formatRelativeTime(timestamp) {
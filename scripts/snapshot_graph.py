@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Snapshot the knowledge graph to a file or restore it from one.
+
+Restoring loads nodes, edges and embeddings directly, so a new environment
+can be provisioned from a known-good graph without re-running the AI
+research and extraction pipeline.
+
+Usage:
+    uv run scripts/snapshot_graph.py dump snapshots/fwtx.jsonl.gz
+    uv run scripts/snapshot_graph.py restore snapshots/fwtx.jsonl.gz [--clear]
+"""
+
+import argparse
+import asyncio
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def dump(path: str):
+    """Write a snapshot of the current graph."""
+    from src.db.falkor import falkor_driver
+    from src.services.graph.snapshot import create_snapshot
+
+    try:
+        await create_snapshot(falkor_driver, path)
+    finally:
+        await falkor_driver.close()
+
+
+async def restore(path: str, clear: bool):
+    """Restore a snapshot and rebuild the Graphiti indices."""
+    from src.services.graph.snapshot import restore_snapshot
+    from src.services.graphiti.index import graphiti
+
+    try:
+        await restore_snapshot(graphiti.driver, path, clear=clear)
+
+        logger.info("Building graph indices and constraints...")
+        await graphiti.build_indices_and_constraints()
+        logger.info("Restore complete")
+    finally:
+        await graphiti.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot or restore the Fort Worth knowledge graph")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = subparsers.add_parser("dump", help="Write a gzip JSONL snapshot of the graph")
+    dump_parser.add_argument("path", help="Snapshot file to write")
+
+    restore_parser = subparsers.add_parser("restore", help="Load a snapshot into the graph")
+    restore_parser.add_argument("path", help="Snapshot file to read")
+    restore_parser.add_argument("--clear", action="store_true", help="Delete the existing graph first")
+
+    args = parser.parse_args()
+    if args.command == "dump":
+        asyncio.run(dump(args.path))
+    else:
+        asyncio.run(restore(args.path, args.clear))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 
 from src.middleware.auth import get_api_key
 from src.models.chat import ChatRequest, ChatResponse
 
+from src.config import settings
 from src.services.graphiti.index import query_knowledge_graph, contextual_search
+from src.services.readiness import get_query_log, get_readiness
 
 router = APIRouter()
 
@@ -27,6 +30,10 @@ async def chat_with_knowledge_graph(
     # Use effective query (message or query)
     query = request.effective_query
     
+    # Frequent queries are warmed up by new workers
+    if settings.READINESS_WARMUP_QUERIES:
+        get_query_log().record_in_background(query)
+    
     # Choose search method based on request parameters
     if request.use_contextual_search and request.context_entities:
         # Use contextual search with focal node reranking
@@ -96,4 +103,15 @@ async def health_check():
     
     Returns the status of the API
     """
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@router.get("/ready", tags=["system"])
+async def readiness_check():
+    """
+    Readiness check endpoint
+    
+    Returns 503 until this worker has loaded the graph, built its entity
+    index and warmed up, with the state of each check
+    """
+    readiness = get_readiness().status()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503) 
\ No newline at end of file
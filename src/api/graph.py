@@ -2,17 +2,44 @@
 Graph API endpoints for direct graph queries and visualization.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Path, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 import logging
 
 from src.db.falkor import falkor_driver
+from src.services.graph.decoder import GraphResultDecoder, decode_all, summary_line, to_ndjson
+from src.services.graph.entity_index import EntityIndex, get_neighborhood
+from src.services.graph.episodes import EpisodeTimeline
+from src.services.graph.export import FORMAT_ARROW, MEDIA_TYPES, GraphExporter, export_available
+from src.services.graph.safe_query import QueryRejectedError, QueryTimeoutError, SafeQueryExecutor
+from src.services.graph.templates import QueryTemplateRegistry
+from src.services.graphiti.ingest import EPISODE_HASH_LABEL, add_ingest_listener
 from src.middleware.auth import get_api_key
-from src.models.graph import GraphQueryRequest, GraphQueryResponse
+from src.models.graph import (
+    GraphQueryRequest,
+    GraphQueryResponse,
+    EpisodePage,
+    EntitySearchResponse,
+    QueryTemplateInfo,
+    TemplateQueryRequest,
+    TemplateQueryResponse
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/graph", tags=["graph"])
 
+episode_timeline = EpisodeTimeline(falkor_driver)
+
+safe_query = SafeQueryExecutor(falkor_driver)
+
+entity_index = EntityIndex(falkor_driver)
+add_ingest_listener(lambda episodes: entity_index.invalidate())
+
+query_templates = QueryTemplateRegistry(safe_query)
+add_ingest_listener(lambda episodes: query_templates.cache.clear())
+
 @router.post("/query", response_model=GraphQueryResponse)
 async def execute_graph_query(
     request: GraphQueryRequest,
@@ -21,152 +48,138 @@ async def execute_graph_query(
     """
     Execute a raw Cypher query on the graph database.
     
+    Queries run read-only with a timeout and a row cap (see GRAPH_QUERY_*
+    settings); truncated is set when more rows were available. Queries with
+    oversized cartesian products are rejected.
+    
     Returns nodes and edges formatted for visualization.
     """
     try:
         logger.info(f"Executing graph query: {request.query}")
         
-        # Execute the query
-        results, summary, keys = await falkor_driver.execute_query(
+        # Execute the query within the configured time, row and cost limits
+        rows, truncated = await safe_query.execute_iter(
             request.query,
-            **request.params
+            request.params,
+            read_only=request.read_only,
+            timeout_ms=request.timeout_ms,
+            row_limit=request.limit
         )
         
-        # Check if results is None or empty
-        if results is None:
-            logger.warning("Query returned None")
-            return GraphQueryResponse(nodes=[], edges=[], raw_results=[])
-            
-        logger.info(f"Query returned {len(results) if hasattr(results, '__len__') else 'unknown'} results")
-        logger.info(f"Keys: {keys}")
-        
-        # Process results to extract nodes and edges
-        nodes = []
-        edges = []
-        node_ids = set()
-        edge_ids = set()
-        
-        # Convert results to list if needed
-        try:
-            results_list = list(results) if results else []
-        except Exception as e:
-            logger.error(f"Error converting results to list: {e}")
-            results_list = []
+        # Decode nodes, edges and raw rows in a single pass over the results
+        nodes, edges, raw_results = decode_all(rows, request.include_raw_results)
         
-        for i, record in enumerate(results_list):
-            if record is None:
-                continue
-                
-            # Debug logging for first few records
-            if i < 3:
-                logger.info(f"Record {i}: type={type(record)}, attributes={dir(record)}")
-                
-            # Get all values from the record directly (keys might be None)
-            values = []
-            if hasattr(record, 'values'):
-                values = record.values()
-            elif hasattr(record, '__iter__'):
-                values = record
-            elif hasattr(record, 'get'):
-                # If we have keys, use them
-                if keys:
-                    values = [record.get(k) for k in keys]
-                else:
-                    # Try to get values directly
-                    values = record.values() if hasattr(record, 'values') else []
-            
-            for j, value in enumerate(values):
-                if i < 3:
-                    logger.info(f"  Value {j}: type={type(value)}, hasattr_properties={hasattr(value, 'properties')}, hasattr_type={hasattr(value, 'type')}")
-                
-                # Handle nodes (FalkorDB returns Node objects)
-                if value is not None and hasattr(value, 'properties'):
-                    # This is a node
-                    try:
-                        props = value.properties if hasattr(value, 'properties') else {}
-                        node_id = str(props.get('uuid', f"node_{id(value)}"))
-                        
-                        if node_id not in node_ids:
-                            node_ids.add(node_id)
-                            
-                            # Get node labels
-                            labels = []
-                            if hasattr(value, 'labels'):
-                                labels = list(value.labels)
-                            elif hasattr(value, 'label'):
-                                labels = [value.label]
-                            
-                            nodes.append({
-                                'id': node_id,
-                                'label': props.get('name', props.get('title', 'Unknown')),
-                                'type': labels[0] if labels else 'Entity',
-                                'properties': props
-                            })
-                    except Exception as e:
-                        logger.warning(f"Error processing node: {e}")
-                
-                # Handle relationships (FalkorDB Edge objects)
-                elif value is not None and hasattr(value, 'type') and not hasattr(value, 'properties'):
-                    # This is likely a relationship/edge
-                    try:
-                        edge_id = f"edge_{id(value)}"
-                        
-                        if edge_id not in edge_ids:
-                            # Get source and target node IDs from the edge
-                            source_id = None
-                            target_id = None
-                            
-                            if hasattr(value, 'src_node') and hasattr(value, 'dest_node'):
-                                # FalkorDB edge format
-                                source_id = str(value.src_node)
-                                target_id = str(value.dest_node)
-                            elif hasattr(value, 'start_node') and hasattr(value, 'end_node'):
-                                # Alternative format
-                                source_id = str(value.start_node)
-                                target_id = str(value.end_node)
-                            
-                            if source_id and target_id:
-                                edge_ids.add(edge_id)
-                                edges.append({
-                                    'id': edge_id,
-                                    'source': source_id,
-                                    'target': target_id,
-                                    'type': value.type if hasattr(value, 'type') else 'RELATES_TO',
-                                    'properties': {}
-                                })
-                    except Exception as e:
-                        logger.warning(f"Error processing edge: {e}")
-        
-        # Also return raw results for flexibility
-        raw_results = []
-        for record in results_list:
-            if record is not None:
-                try:
-                    # Try to convert record to a serializable format
-                    record_dict = {}
-                    if hasattr(record, 'keys'):
-                        for k in record.keys():
-                            v = record.get(k)
-                            # Skip non-serializable objects in raw results
-                            if v is None or isinstance(v, (str, int, float, bool, list, dict)):
-                                record_dict[k] = v
-                    if record_dict:
-                        raw_results.append(record_dict)
-                except Exception as e:
-                    # If can't convert to dict, skip
-                    logger.debug(f"Skipping raw result due to: {e}")
-                    pass
+        logger.info(
+            f"Query returned {len(nodes)} nodes and {len(edges)} edges"
+            f"{' (truncated)' if truncated else ''}"
+        )
         
         return GraphQueryResponse(
             nodes=nodes,
             edges=edges,
-            raw_results=raw_results
+            raw_results=raw_results,
+            truncated=truncated
         )
         
+    except QueryRejectedError as e:
+        logger.warning(f"Rejected graph query: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueryTimeoutError as e:
+        logger.warning(f"Graph query timed out: {e}")
+        raise HTTPException(status_code=408, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error executing graph query: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/query/stream")
+async def stream_graph_query(
+    request: GraphQueryRequest,
+    api_key: str = Depends(get_api_key)
+) -> StreamingResponse:
+    """
+    Execute a Cypher query and stream the decoded results as NDJSON.
+    
+    Each line is a node, edge or row object tagged with its "kind"; the
+    last line is a summary with the row count and the truncated flag.
+    Limits and errors are the same as for POST /graph/query.
+    """
+    try:
+        logger.info(f"Streaming graph query: {request.query}")
+        rows, truncated = await safe_query.execute_iter(
+            request.query,
+            request.params,
+            read_only=request.read_only,
+            timeout_ms=request.timeout_ms,
+            row_limit=request.limit
+        )
+    except QueryRejectedError as e:
+        logger.warning(f"Rejected graph query: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueryTimeoutError as e:
+        logger.warning(f"Graph query timed out: {e}")
+        raise HTTPException(status_code=408, detail=str(e))
     except Exception as e:
         logger.error(f"Error executing graph query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    def ndjson_lines():
+        decoder = GraphResultDecoder(include_raw_results=request.include_raw_results)
+        count = 0
+        try:
+            for row in rows:
+                count += 1
+                for item in decoder.decode_row(row):
+                    yield to_ndjson(item)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming graph query results: {e}")
+            yield summary_line(count, truncated, error=str(e))
+            return
+        yield summary_line(count, truncated)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/templates", response_model=List[QueryTemplateInfo])
+async def list_query_templates(
+    api_key: str = Depends(get_api_key)
+) -> List[QueryTemplateInfo]:
+    """List the named query templates and their parameters."""
+    return [QueryTemplateInfo(**template) for template in query_templates.list()]
+
+
+@router.post("/templates/{name}", response_model=TemplateQueryResponse)
+async def run_query_template(
+    name: str,
+    request: TemplateQueryRequest,
+    api_key: str = Depends(get_api_key)
+) -> TemplateQueryResponse:
+    """
+    Run a named query template with typed parameters.
+    
+    Responses are cached per template and parameters for the template's
+    TTL; the cache is cleared whenever new episodes are ingested.
+    """
+    try:
+        response, cached = await query_templates.run(
+            name,
+            request.params,
+            limit=request.limit,
+            include_raw_results=request.include_raw_results
+        )
+        return TemplateQueryResponse(**response, template=name, cached=cached)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown query template: {name}")
+    except QueryRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueryTimeoutError as e:
+        logger.warning(f"Query template {name} timed out: {e}")
+        raise HTTPException(status_code=408, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running query template {name}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @router.get("/all", response_model=GraphQueryResponse)
 async def get_all_graph_data(
@@ -184,7 +197,7 @@ async def get_all_graph_data(
         edges = []
         
         # First get all nodes
-        node_results, _, _ = await falkor_driver.execute_query("MATCH (n) RETURN n")
+        node_results, _, _ = await falkor_driver.execute_query(f"MATCH (n) WHERE NOT n:{EPISODE_HASH_LABEL} RETURN n")
         node_list = list(node_results) if node_results else []
         
         logger.info(f"Found {len(node_list)} nodes")
@@ -258,7 +271,7 @@ async def get_graph_counts(
     """
     try:
         # Count nodes
-        node_result, _, _ = await falkor_driver.execute_query("MATCH (n) RETURN count(n) as count")
+        node_result, _, _ = await falkor_driver.execute_query(f"MATCH (n) WHERE NOT n:{EPISODE_HASH_LABEL} RETURN count(n) as count")
         node_count = 0
         if node_result:
             node_count = list(node_result)[0].get('count', 0) if node_result else 0
@@ -279,4 +292,94 @@ async def get_graph_counts(
             "nodes": 0,
             "edges": 0,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+@router.get("/episodes", response_model=EpisodePage)
+async def list_episodes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    order_by: str = Query("created_at", pattern="^(created_at|valid_at)$"),
+    api_key: str = Depends(get_api_key)
+) -> EpisodePage:
+    """
+    List episodes newest first with mentioned entity and edge counts.
+    
+    Pass the returned next_cursor to fetch the following page.
+    """
+    try:
+        episodes, next_cursor = await episode_timeline.list_episodes(limit, cursor, order_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing episodes: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return EpisodePage(episodes=episodes, next_cursor=next_cursor)
+
+
+@router.get("/search", response_model=EntitySearchResponse)
+async def search_entities(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    api_key: str = Depends(get_api_key)
+) -> EntitySearchResponse:
+    """
+    Typeahead search over entity names, aliases and top_ids.
+    
+    Matches are served from an in-memory prefix index; use
+    /graph/neighborhood/{uuid} to load a match into the graph view.
+    """
+    try:
+        matches = await entity_index.search(q, limit)
+    except Exception as e:
+        logger.error(f"Error searching entities: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return EntitySearchResponse(query=q, matches=matches)
+
+
+@router.get("/neighborhood/{uuid}", response_model=GraphQueryResponse)
+async def get_entity_neighborhood(
+    uuid: str,
+    limit: int = Query(50, ge=1, le=500),
+    api_key: str = Depends(get_api_key)
+) -> GraphQueryResponse:
+    """
+    Get an entity and its directly related entities.
+    """
+    try:
+        nodes, edges = await get_neighborhood(falkor_driver, uuid, limit)
+    except Exception as e:
+        logger.error(f"Error getting neighborhood for {uuid}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not nodes:
+        raise HTTPException(status_code=404, detail=f"Entity {uuid} not found")
+    
+    return GraphQueryResponse(nodes=nodes, edges=edges, raw_results=[])
+
+
+@router.get("/export/{kind}")
+async def export_graph(
+    kind: str = Path(..., pattern="^(nodes|edges)$"),
+    format: str = Query("parquet", pattern="^(arrow|parquet)$"),
+    api_key: str = Depends(get_api_key)
+) -> StreamingResponse:
+    """
+    Stream all nodes or edges as a Parquet file or an Arrow IPC stream.
+    
+    Properties are flattened into typed columns and embeddings are
+    fixed-size float32 lists, so the result loads directly into pandas,
+    polars or DuckDB. Requires the optional pyarrow dependency.
+    """
+    if not export_available():
+        raise HTTPException(status_code=501, detail="Graph export requires pyarrow (install fwtx-wiki[export])")
+    
+    exporter = GraphExporter(falkor_driver)
+    extension = "arrows" if format == FORMAT_ARROW else "parquet"
+    return StreamingResponse(
+        exporter.stream(kind, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="fwtx-{kind}.{extension}"'}
+    )
@@ -0,0 +1,40 @@
+"""
+API endpoints for polling and cancelling background jobs.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.middleware.auth import get_api_key
+from src.services.jobs.queue import get_job_queue
+from src.models.jobs import JobAccepted, JobStatus
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def job_accepted(job) -> JobAccepted:
+    return JobAccepted(job_id=job.id, status=job.status, status_url=f"{router.prefix}/{job.id}")
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, authenticated: bool = Depends(get_api_key)):
+    """
+    Get a job's status, per-stage progress and timings, and its result once finished.
+    """
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@router.delete("/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str, authenticated: bool = Depends(get_api_key)):
+    """
+    Cancel a queued or running job.
+    """
+    if not authenticated:
+        raise HTTPException(status_code=401, detail="Authentication required to cancel jobs")
+    
+    job = await get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
@@ -2,16 +2,23 @@
 API endpoints for AI research operations.
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
 
+from src.api.jobs import job_accepted
 from src.middleware.auth import get_api_key
+from src.services.agent.budget import get_budget_manager
 from src.services.agent.researcher import FortWorthResearchWorkflow
-from src.services.graphiti.index import graphiti
+from src.services.graphiti.index import get_graphiti
+from src.services.graphiti.ingest import ingest_episodes
+from src.services.jobs.queue import STAGE_INGEST, STAGE_RESEARCH, get_job_queue, job_stage
+from src.models.jobs import JobAccepted
 from src.models.research import ResearchRequest, ResearchResponse
 
 router = APIRouter(prefix="/api/research", tags=["research"])
 
-@router.post("/topic", response_model=ResearchResponse)
+@router.post("/topic", response_model=JobAccepted, status_code=202)
 async def research_topic(
     request: ResearchRequest,
     authenticated: bool = Depends(get_api_key)
@@ -22,37 +29,42 @@ async def research_topic(
     - **topic**: Topic to research (e.g., "current mayor", "city budget", "council districts")
     - **data_requirements**: Specific data points to extract
     - **search_queries**: Optional specific search queries to use
+    
+    The research runs as a background job; poll the returned status URL for
+    its progress and result.
     """
-    try:
-        # Create research task
-        research_task = {
-            "name": request.topic,
-            "config": {
-                "search_queries": request.search_queries or [
-                    f"Fort Worth Texas {request.topic} 2024",
-                    f"Fort Worth {request.topic} official information"
-                ],
-                "data_needed": request.data_requirements or []
-            }
+    # Create research task
+    research_task = {
+        "name": request.topic,
+        "config": {
+            "search_queries": request.search_queries or [
+                f"Fort Worth Texas {request.topic} 2024",
+                f"Fort Worth {request.topic} official information"
+            ],
+            "data_needed": request.data_requirements or []
         }
+    }
+    
+    async def run_research():
+        # Research in a worker thread so the agent team doesn't block the event loop
+        async with job_stage(STAGE_RESEARCH):
+            workflow = FortWorthResearchWorkflow(get_graphiti())
+            with get_budget_manager().track_run(f"research: {request.topic}"):
+                episodes = await workflow.research_tasks_concurrently([research_task])
         
-        # Run research
-        workflow = FortWorthResearchWorkflow(graphiti)
-        episodes = await workflow.research_all_tasks([research_task])
-        
-        # Add episodes to graph
-        if episodes:
-            await graphiti.add_episode_bulk(episodes)
+        # Add new episodes to graph, skipping content that is already ingested
+        async with job_stage(STAGE_INGEST):
+            episodes = await ingest_episodes(get_graphiti(), episodes)
         
         return ResearchResponse(
             topic=request.topic,
             status="success",
             episodes_created=len(episodes),
             results_summary=f"Researched {request.topic} and created {len(episodes)} knowledge graph entries"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Research failed: {str(e)}")
+        ).model_dump()
+    
+    job = await get_job_queue().submit("research", run_research, params=request.model_dump())
+    return job_accepted(job)
 
 
 @router.get("/tasks")
@@ -111,20 +123,16 @@ async def custom_research(
             }
         }
         
-        workflow = FortWorthResearchWorkflow(graphiti)
+        workflow = FortWorthResearchWorkflow(get_graphiti())
         
-        # Run the research directly and get the response
-        response_content = []
-        for response in workflow.run(research_task):
-            if response.content:
-                response_content.append(response.content)
+        # Run the research in a worker thread so the team doesn't block the event loop
+        response_content = await asyncio.to_thread(workflow.run_task, research_task)
         
         # Get episodes from session state
         episodes = workflow.session_state.get("Custom Research_episodes", [])
         
-        # Add to graph if we have episodes
-        if episodes:
-            await graphiti.add_episode_bulk(episodes)
+        # Add new episodes to graph, skipping content that is already ingested
+        episodes = await ingest_episodes(get_graphiti(), episodes)
         
         return {
             "status": "success",
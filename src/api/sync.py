@@ -4,14 +4,17 @@ API endpoints for data synchronization management.
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from src.api.jobs import job_accepted
 from src.middleware.auth import get_api_key
+from src.services.jobs.queue import get_job_queue
 from src.services.sync.scheduler import manual_sync, get_scheduler_status
 
+from src.models.jobs import JobAccepted
 from src.models.sync import SyncRequest, SyncResponse
 
 router = APIRouter(prefix="/api/sync", tags=["sync"])
 
-@router.post("/trigger", response_model=SyncResponse)
+@router.post("/trigger", response_model=JobAccepted, status_code=202)
 async def trigger_sync(
     request: SyncRequest,
     authenticated: bool = Depends(get_api_key)
@@ -24,16 +27,21 @@ async def trigger_sync(
       - incremental: Sync only recent changes
       - services: Sync service URLs from fwtx.json
       - governance: Sync governance structure
+    
+    The sync runs as a background job; poll the returned status URL for
+    its progress and result.
     """
     if not authenticated:
         raise HTTPException(status_code=401, detail="Authentication required for sync operations")
     
-    result = await manual_sync(request.sync_type)
-    
-    if result["status"] == "error":
-        raise HTTPException(status_code=500, detail=result.get("error", "Sync failed"))
+    async def run_sync():
+        result = await manual_sync(request.sync_type)
+        if result["status"] == "error":
+            raise RuntimeError(result.get("error", "Sync failed"))
+        return SyncResponse(**result).model_dump()
     
-    return SyncResponse(**result)
+    job = await get_job_queue().submit("sync", run_sync, params=request.model_dump())
+    return job_accepted(job)
 
 
 @router.get("/status")
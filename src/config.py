@@ -40,23 +40,75 @@ class Settings(BaseSettings):
     ENABLE_SYNC_SCHEDULER: bool = os.getenv("ENABLE_SYNC_SCHEDULER", "false").lower() in ("1", "true", "yes")
     SYNC_INTERVAL_HOURS: int = int(os.getenv("SYNC_INTERVAL_HOURS", "24"))
     SYNC_ON_STARTUP: bool = os.getenv("SYNC_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    LEADER_ELECTION_ENABLED: bool = os.getenv("LEADER_ELECTION_ENABLED", "true").lower() in ("1", "true", "yes")
+    LEADER_LEASE_SECONDS: int = int(os.getenv("LEADER_LEASE_SECONDS", "30"))
+    LEADER_LOCK_KEY: str = os.getenv("LEADER_LOCK_KEY", "fwtx:sync-leader")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_HISTORY_SIZE: int = int(os.getenv("JOB_HISTORY_SIZE", "200"))
+    JOB_TTL_SECONDS: int = int(os.getenv("JOB_TTL_SECONDS", "86400"))
+    URGENT_CHECK_CONCURRENCY: int = int(os.getenv("URGENT_CHECK_CONCURRENCY", "4"))
+    URGENT_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("URGENT_CHECK_TIMEOUT_SECONDS", "20"))
+    SYNC_TOKENS_PER_HOUR: int = int(os.getenv("SYNC_TOKENS_PER_HOUR", "200000"))
+    SYNC_RESEARCH_TASK_TOKENS: int = int(os.getenv("SYNC_RESEARCH_TASK_TOKENS", "20000"))
+    SYNC_OFF_PEAK_HOURS: str = os.getenv("SYNC_OFF_PEAK_HOURS", "0-6")
     
     # Agent Configuration
     AGENT_CACHE_ENABLED: bool = os.getenv("AGENT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
     AGENT_CACHE_TTL_HOURS: int = int(os.getenv("AGENT_CACHE_TTL_HOURS", "24"))
     AGENT_MAX_RETRIES: int = int(os.getenv("AGENT_MAX_RETRIES", "3"))
+    # Shared limits for every OpenAI call in the process (Graphiti and research agents)
+    OPENAI_REQUESTS_PER_MINUTE: int = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+    OPENAI_TOKENS_PER_MINUTE: int = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
     AGENT_TIMEOUT_SECONDS: int = int(os.getenv("AGENT_TIMEOUT_SECONDS", "300"))
+    # LLM usage caps for research (0 disables a cap) and prices for cost accounting
+    LLM_RUN_TOKEN_CAP: int = int(os.getenv("LLM_RUN_TOKEN_CAP", "1000000"))
+    LLM_DAY_TOKEN_CAP: int = int(os.getenv("LLM_DAY_TOKEN_CAP", "3000000"))
+    LLM_RUN_COST_CAP_USD: float = float(os.getenv("LLM_RUN_COST_CAP_USD", "0"))
+    LLM_DAY_COST_CAP_USD: float = float(os.getenv("LLM_DAY_COST_CAP_USD", "0"))
+    LLM_INPUT_COST_PER_MTOK: float = float(os.getenv("LLM_INPUT_COST_PER_MTOK", "0.15"))
+    LLM_OUTPUT_COST_PER_MTOK: float = float(os.getenv("LLM_OUTPUT_COST_PER_MTOK", "0.60"))
     
     # Enhanced Sync Settings
     SYNC_USE_AI_AGENT: bool = os.getenv("SYNC_USE_AI_AGENT", "true").lower() in ("1", "true", "yes")
     SYNC_PDF_EXTRACTION: bool = os.getenv("SYNC_PDF_EXTRACTION", "true").lower() in ("1", "true", "yes")
+    SYNC_PDF_PAGE_BATCH: int = int(os.getenv("SYNC_PDF_PAGE_BATCH", "8"))
+    SYNC_PDF_WORKERS: int = int(os.getenv("SYNC_PDF_WORKERS", "2"))
+    SYNC_STATE_DIR: Path = Path(os.getenv("SYNC_STATE_DIR", str(Path(__file__).parent.parent / ".sync")))
     SYNC_RESEARCH_BATCH_SIZE: int = int(os.getenv("SYNC_RESEARCH_BATCH_SIZE", "5"))
+    SYNC_CHUNK_MAX_TOKENS: int = int(os.getenv("SYNC_CHUNK_MAX_TOKENS", "1000"))
+    SYNC_CHUNK_OVERLAP_TOKENS: int = int(os.getenv("SYNC_CHUNK_OVERLAP_TOKENS", "100"))
+    SYNC_JSON_LLM_ENRICHMENT: bool = os.getenv("SYNC_JSON_LLM_ENRICHMENT", "false").lower() in ("1", "true", "yes")
+    SYNC_COMMUNITY_RESUMMARY_THRESHOLD: float = float(os.getenv("SYNC_COMMUNITY_RESUMMARY_THRESHOLD", "0.2"))
+    SYNC_COMMUNITY_REBUILD_DAYS: int = int(os.getenv("SYNC_COMMUNITY_REBUILD_DAYS", "7"))
+    SYNC_DEDUPLICATE_EPISODES: bool = os.getenv("SYNC_DEDUPLICATE_EPISODES", "true").lower() in ("1", "true", "yes")
+    SYNC_INGEST_CHUNK_SIZE: int = int(os.getenv("SYNC_INGEST_CHUNK_SIZE", "10"))
+    SYNC_INGEST_MAX_RETRIES: int = int(os.getenv("SYNC_INGEST_MAX_RETRIES", "3"))
+    SYNC_INGEST_RETRY_BACKOFF_SECONDS: float = float(os.getenv("SYNC_INGEST_RETRY_BACKOFF_SECONDS", "2"))
+    SYNC_INGEST_MAX_ATTEMPTS: int = int(os.getenv("SYNC_INGEST_MAX_ATTEMPTS", "5"))
+    SYNC_INGEST_CHECKPOINT_RETENTION_DAYS: int = int(os.getenv("SYNC_INGEST_CHECKPOINT_RETENTION_DAYS", "30"))
+    SYNC_STRUCTURED_WRITES: bool = os.getenv("SYNC_STRUCTURED_WRITES", "true").lower() in ("1", "true", "yes")
     LOAD_INITIAL_DATA: bool = os.getenv("LOAD_INITIAL_DATA", "false").lower() in ("1", "true", "yes")
     SYNC_MODE: str = os.getenv("SYNC_MODE", "initial")
     
     # Search Configuration
     SEARCH_RESULT_LIMIT: int = int(os.getenv("SEARCH_RESULT_LIMIT", "10"))
     SEARCH_INCLUDE_RELATIONSHIPS: bool = os.getenv("SEARCH_INCLUDE_RELATIONSHIPS", "true").lower() in ("1", "true", "yes")
+    GRAPH_SEARCH_REFRESH_SECONDS: int = int(os.getenv("GRAPH_SEARCH_REFRESH_SECONDS", "300"))
+    
+    # Readiness (GET /ready) and startup warm-up
+    READINESS_WARMUP_QUERIES: int = int(os.getenv("READINESS_WARMUP_QUERIES", "0"))
+    READINESS_WARMUP_TIMEOUT_SECONDS: int = int(os.getenv("READINESS_WARMUP_TIMEOUT_SECONDS", "60"))
+    READINESS_RETRY_SECONDS: int = int(os.getenv("READINESS_RETRY_SECONDS", "10"))
+    QUERY_LOG_MAX_ENTRIES: int = int(os.getenv("QUERY_LOG_MAX_ENTRIES", "1000"))
+    
+    # Graph Query Limits (POST /graph/query)
+    GRAPH_QUERY_READ_ONLY: bool = os.getenv("GRAPH_QUERY_READ_ONLY", "true").lower() in ("1", "true", "yes")
+    GRAPH_QUERY_TIMEOUT_MS: int = int(os.getenv("GRAPH_QUERY_TIMEOUT_MS", "5000"))
+    GRAPH_QUERY_MAX_ROWS: int = int(os.getenv("GRAPH_QUERY_MAX_ROWS", "1000"))
+    GRAPH_QUERY_MAX_CARTESIAN_ROWS: int = int(os.getenv("GRAPH_QUERY_MAX_CARTESIAN_ROWS", "1000000"))
+    GRAPH_TEMPLATE_CACHE_SIZE: int = int(os.getenv("GRAPH_TEMPLATE_CACHE_SIZE", "256"))
+    GRAPH_EXPORT_PAGE_SIZE: int = int(os.getenv("GRAPH_EXPORT_PAGE_SIZE", "5000"))
+    GRAPH_SNAPSHOT_BATCH_SIZE: int = int(os.getenv("GRAPH_SNAPSHOT_BATCH_SIZE", "1000"))
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,19 @@
+"""
+Range indexes created on demand by the services that query them.
+"""
+
+import weakref
+from typing import Set, Tuple
+
+# Driver -> (label, property) pairs whose index was created by this process
+_created: "weakref.WeakKeyDictionary[object, Set[Tuple[str, str]]]" = weakref.WeakKeyDictionary()
+
+
+async def ensure_index(driver, label: str, prop: str):
+    """Create a range index on (label, prop) once per driver."""
+    created = _created.setdefault(driver, set())
+    if (label, prop) in created:
+        return
+    # FalkorDriver returns None instead of raising when the index exists
+    await driver.execute_query(f"CREATE INDEX FOR (n:{label}) ON (n.{prop})")
+    created.add((label, prop))
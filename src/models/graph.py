@@ -1,12 +1,68 @@
-from pydantic import BaseModel
-from typing import Dict, Any, List
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 
 class GraphQueryRequest(BaseModel):
     query: str
     params: Dict[str, Any] = {}
+    read_only: Optional[bool] = None
+    timeout_ms: Optional[int] = Field(None, gt=0)
+    limit: Optional[int] = Field(None, gt=0)
+    include_raw_results: bool = True
 
 
 class GraphQueryResponse(BaseModel):
     nodes: List[Dict[str, Any]]
     edges: List[Dict[str, Any]]
-    raw_results: List[Dict[str, Any]]
\ No newline at end of file
+    raw_results: List[Dict[str, Any]]
+    truncated: bool = False
+
+
+class EpisodeSummary(BaseModel):
+    uuid: str
+    name: Optional[str] = None
+    source: Optional[str] = None
+    source_description: Optional[str] = None
+    group_id: Optional[str] = None
+    created_at: Optional[str] = None
+    valid_at: Optional[str] = None
+    entity_count: int = 0
+    edge_count: int = 0
+
+
+class EpisodePage(BaseModel):
+    episodes: List[EpisodeSummary]
+    next_cursor: Optional[str] = None
+
+
+class EntityMatch(BaseModel):
+    uuid: str
+    name: str
+    labels: List[str] = []
+    top_id: Optional[str] = None
+    aliases: List[str] = []
+    matched: str
+    score: float
+
+
+class EntitySearchResponse(BaseModel):
+    query: str
+    matches: List[EntityMatch]
+
+
+class QueryTemplateInfo(BaseModel):
+    name: str
+    description: str = ""
+    params: Dict[str, str]
+    default_limit: int
+    cache_ttl_seconds: int
+
+
+class TemplateQueryRequest(BaseModel):
+    params: Dict[str, Any] = {}
+    limit: Optional[int] = Field(None, gt=0)
+    include_raw_results: bool = True
+
+
+class TemplateQueryResponse(GraphQueryResponse):
+    template: str
+    cached: bool = False
@@ -0,0 +1,39 @@
+"""
+Data models for background job endpoints.
+"""
+
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+
+class JobStage(BaseModel):
+    """Progress of one stage of a job."""
+    status: str
+    started_at: str
+    finished_at: Optional[str] = None
+    duration_seconds: float
+
+
+class JobStatus(BaseModel):
+    """State of a background job."""
+    id: str
+    kind: str
+    params: Dict[str, Any] = {}
+    status: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    current_stage: Optional[str] = None
+    stages: Dict[str, JobStage] = {}
+    result: Any = None
+    error: Optional[str] = None
+    # Set when the job runs in another API worker and will stop at its next stage
+    cancel_requested: bool = False
+
+
+class JobAccepted(BaseModel):
+    """Response for a request that was queued as a job."""
+    job_id: str
+    status: str
+    status_url: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal
+from typing import Literal, Optional
 
 class SyncRequest(BaseModel):
     sync_type: Literal["full", "incremental", "services", "governance"] = "incremental"
@@ -9,4 +9,7 @@ class SyncResponse(BaseModel):
     status: str
     sync_type: str
     timestamp: str
-    error: str = None
\ No newline at end of file
+    error: str = None
+    # Sync that actually ran, e.g. "full" when a queued full sync covered the request
+    handled_by: Optional[str] = None
+    merged: bool = False
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Token and cost accounting for research runs.
+
+Every research task records the prompt and completion tokens of the team
+leader and each member agent from the agno run metrics. Usage is totalled
+per agent and task within the current run (a sync or a research job, set
+with track_run()) and per day, and a task isn't started once its run or
+the day has reached its cap. Daily totals are kept in SYNC_STATE_DIR so a
+restart doesn't reset the daily cap.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from uuid import uuid4
+
+from src.config import settings
+from src.services.sync.state import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+USAGE_STATE_FILE = "token_usage.json"
+DAYS_KEPT = 30
+RUNS_KEPT = 20
+
+_current_run: ContextVar[Optional["RunUsage"]] = ContextVar("current_budget_run", default=None)
+
+
+class BudgetExceededError(Exception):
+    """A run or the day has used up its token or cost budget."""
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+
+
+def _add(totals: Dict[str, Any], input_tokens: int, output_tokens: int, cost: float):
+    totals["input_tokens"] += input_tokens
+    totals["output_tokens"] += output_tokens
+    totals["cost_usd"] = round(totals["cost_usd"] + cost, 6)
+
+
+def _metric_total(metrics: Optional[Dict[str, Any]], *keys: str) -> int:
+    """Sum a token count from agno metrics, which hold one value per model call."""
+    for key in keys:
+        value = (metrics or {}).get(key)
+        total = sum(value) if isinstance(value, list) else (value or 0)
+        if total:
+            return int(total)
+    return 0
+
+
+class RunUsage:
+    """Usage of one sync run or research job."""
+
+    def __init__(self, name: str):
+        self.id = uuid4().hex[:12]
+        self.name = name
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.totals = _empty_totals()
+        self.by_agent: Dict[str, Dict[str, Any]] = {}
+        self.by_task: Dict[str, Dict[str, Any]] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            **self.totals,
+            "by_agent": self.by_agent,
+            "by_task": self.by_task,
+        }
+
+
+class TokenBudgetManager:
+    """Records LLM usage and enforces per-run and per-day caps."""
+
+    def __init__(
+        self,
+        run_token_cap: Optional[int] = None,
+        day_token_cap: Optional[int] = None,
+        run_cost_cap: Optional[float] = None,
+        day_cost_cap: Optional[float] = None,
+        state_dir: Optional[Path] = None
+    ):
+        # A cap of 0 disables it
+        self.run_token_cap = settings.LLM_RUN_TOKEN_CAP if run_token_cap is None else run_token_cap
+        self.day_token_cap = settings.LLM_DAY_TOKEN_CAP if day_token_cap is None else day_token_cap
+        self.run_cost_cap = settings.LLM_RUN_COST_CAP_USD if run_cost_cap is None else run_cost_cap
+        self.day_cost_cap = settings.LLM_DAY_COST_CAP_USD if day_cost_cap is None else day_cost_cap
+        self.input_cost_per_token = settings.LLM_INPUT_COST_PER_MTOK / 1_000_000
+        self.output_cost_per_token = settings.LLM_OUTPUT_COST_PER_MTOK / 1_000_000
+        self.state = JsonStateFile(USAGE_STATE_FILE, state_dir)
+        self.days: Dict[str, Dict[str, Any]] = self.state.data.setdefault("days", {})
+        self.runs: "OrderedDict[str, RunUsage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _today(self) -> Dict[str, Any]:
+        day = self.days.setdefault(date.today().isoformat(), {**_empty_totals(), "by_agent": {}})
+        for old in sorted(self.days)[:-DAYS_KEPT]:
+            del self.days[old]
+        return day
+
+    @contextmanager
+    def track_run(self, name: str) -> Iterator[RunUsage]:
+        """Attribute the usage of everything inside to a new run."""
+        run = RunUsage(name)
+        with self._lock:
+            self.runs[run.id] = run
+            while len(self.runs) > RUNS_KEPT:
+                self.runs.popitem(last=False)
+        token = _current_run.set(run)
+        try:
+            yield run
+        finally:
+            _current_run.reset(token)
+            run.finished_at = datetime.now()
+            logger.info(
+                f"{name}: {run.totals['input_tokens']} prompt + {run.totals['output_tokens']} "
+                f"completion tokens (${run.totals['cost_usd']:.4f})"
+            )
+
+    def check(self):
+        """
+        Raise if the current run or today has reached a cap.
+
+        Raises:
+            BudgetExceededError: With the cap that was reached
+        """
+        with self._lock:
+            today = self._today()
+        self._check_totals("Daily", today, self.day_token_cap, self.day_cost_cap)
+        run = _current_run.get()
+        if run is not None:
+            self._check_totals(f"Run '{run.name}'", run.totals, self.run_token_cap, self.run_cost_cap)
+
+    @staticmethod
+    def _check_totals(label: str, totals: Dict[str, Any], token_cap: int, cost_cap: float):
+        tokens = totals["input_tokens"] + totals["output_tokens"]
+        if token_cap and tokens >= token_cap:
+            raise BudgetExceededError(f"{label} token budget of {token_cap} reached ({tokens} used)")
+        if cost_cap and totals["cost_usd"] >= cost_cap:
+            raise BudgetExceededError(f"{label} cost budget of ${cost_cap:.2f} reached (${totals['cost_usd']:.2f} used)")
+
+    def record(self, agent: str, task: str, input_tokens: int, output_tokens: int):
+        """Add one agent's usage on a task to the current run and today."""
+        if not input_tokens and not output_tokens:
+            return
+        cost = input_tokens * self.input_cost_per_token + output_tokens * self.output_cost_per_token
+        with self._lock:
+            today = self._today()
+            _add(today, input_tokens, output_tokens, cost)
+            _add(today["by_agent"].setdefault(agent, _empty_totals()), input_tokens, output_tokens, cost)
+            run = _current_run.get()
+            if run is not None:
+                _add(run.totals, input_tokens, output_tokens, cost)
+                _add(run.by_agent.setdefault(agent, _empty_totals()), input_tokens, output_tokens, cost)
+                _add(run.by_task.setdefault(task, _empty_totals()), input_tokens, output_tokens, cost)
+            self.state.save()
+
+    def record_team_run(self, task: str, response: Any):
+        """Record a team run: the leader's own calls and each member's."""
+        self.record(
+            getattr(response, "team_name", None) or "Research Team",
+            task,
+            _metric_total(response.metrics, "input_tokens", "prompt_tokens"),
+            _metric_total(response.metrics, "output_tokens", "completion_tokens"),
+        )
+        for member in getattr(response, "member_responses", None) or []:
+            if hasattr(member, "member_responses"):
+                self.record_team_run(task, member)
+            else:
+                self.record(
+                    member.agent_name or member.agent_id or "agent",
+                    task,
+                    _metric_total(member.metrics, "input_tokens", "prompt_tokens"),
+                    _metric_total(member.metrics, "output_tokens", "completion_tokens"),
+                )
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "caps": {
+                    "run_tokens": self.run_token_cap,
+                    "day_tokens": self.day_token_cap,
+                    "run_cost_usd": self.run_cost_cap,
+                    "day_cost_usd": self.day_cost_cap,
+                },
+                "today": self._today(),
+                "runs": [run.to_dict() for run in reversed(self.runs.values())],
+            }
+
+
+_budget_manager: Optional[TokenBudgetManager] = None
+
+
+def get_budget_manager() -> TokenBudgetManager:
+    """The process-wide budget manager."""
+    global _budget_manager
+    if _budget_manager is None:
+        _budget_manager = TokenBudgetManager()
+    return _budget_manager
@@ -5,16 +5,14 @@ This module implements an AI agent team for researching and structuring
 Fort Worth municipal government data from various sources.
 """
 
-from typing import Iterator, Dict, Any, List
+from typing import TYPE_CHECKING, Iterator, Dict, Any, List, Optional
 from datetime import datetime
+import asyncio
 import json
 import logging
+import threading
 
-from agno.agent import Agent, RunResponse
-from agno.models.openai import OpenAIChat
-from agno.team.team import Team
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.reasoning import ReasoningTools
+from agno.agent import RunResponse
 from agno.utils.pprint import pprint_run_response
 from agno.workflow import Workflow
 
@@ -32,11 +30,16 @@ from src.models.top.structured import (
     CouncilMemberData
 )
 
+if TYPE_CHECKING:
+    from agno.team.team import Team
+
 logger = logging.getLogger(__name__)
 
 
 # Import settings to get model configurations
 from src.config import settings
+from src.services.agent.budget import BudgetExceededError, get_budget_manager
+from src.services.sync.document_chunker import CHARS_PER_TOKEN
 
 # Log OpenAI configuration
 logger.info(f"Using OpenAI model: {settings.OPENAI_MODEL}")
@@ -47,101 +50,145 @@ else:
 
 # Helper function to create OpenAI model
 def create_openai_model(model_id: str, **kwargs):
-    """Create an OpenAI model."""
-    return OpenAIChat(
+    """Create an OpenAI model; the rate limiter's transport handles retries."""
+    from src.services.llm.openai_chat import RateLimitedOpenAIChat
+    
+    return RateLimitedOpenAIChat(
         id=model_id,
+        max_retries=0,
         **kwargs
     )
 
-# Define specialized agents for different research tasks
-# Web researcher uses OpenAI for accurate, up-to-date information
-web_researcher = Agent(
-    name="Web Research Agent",
-    role="Research Fort Worth government websites and official sources",
-    model=create_openai_model(settings.OPENAI_MODEL),
-    tools=[DuckDuckGoTools()],
-    instructions=[
-        "Focus on official Fort Worth government websites (.gov domains)",
-        "Always include source URLs and dates",
-        "Verify information from multiple sources when possible",
-        "Extract structured data according to Texas Ontology Protocol (TOP)",
-        "Ensure factual accuracy of government data",
-    ],
-    add_datetime_to_instructions=True,
-    show_tool_calls=True,
-    # Enable structured output when researching specific entity types
-    response_model=None  # Will be set dynamically based on task
-)
+# Maximum characters of provided data content included in a research prompt,
+# derived from the chunk budget so a document chunk and its overlap always fit
+MAX_DATA_CONTENT_CHARS = (settings.SYNC_CHUNK_MAX_TOKENS + settings.SYNC_CHUNK_OVERLAP_TOKENS) * CHARS_PER_TOKEN
 
-data_structurer = Agent(
-    name="Data Structure Agent", 
-    role="Structure raw data into Texas Ontology Protocol compliant format",
-    model=create_openai_model(settings.OPENAI_MODEL),
-    instructions=[
-        "Convert unstructured data into TOP-compliant JSON format",
-        "Use appropriate entity types: HomeRuleCity, Mayor, Department, etc.",
-        "Include temporal data (valid_from, valid_until) for all entities",
-        "Add source attribution with confidence levels",
-        "Ensure all required fields are populated",
-        "Follow the exact structure of TOPEpisodeData model",
-    ],
-    add_datetime_to_instructions=True,
-    # Use structured output for data structuring
-    response_model=TOPEpisodeData,
-    use_json_mode=True
-)
 
-county_analyst = Agent(
-    name="County Integration Analyst",
-    role="Analyze Fort Worth's relationship with Tarrant County and Texas state structure",
-    model=create_openai_model(settings.OPENAI_MODEL),
-    tools=[DuckDuckGoTools()],
-    instructions=[
-        "Research Fort Worth's position within Tarrant County",
-        "Identify overlapping jurisdictions and shared services",
-        "Analyze intergovernmental agreements",
-        "Map relationships between city, county, and state entities",
-        "Verify jurisdictional boundaries and legal structures",
-    ],
-    add_datetime_to_instructions=True,
-    show_tool_calls=True,
-)
+def create_research_team() -> "Team":
+    """
+    Build the Fort Worth research team and its member agents.
+    
+    Agno agents and teams keep per-run state, so concurrent research runs
+    each need their own team instance.
+    """
+    # Imported here so the API starts without loading the agent tooling
+    from agno.agent import Agent
+    from agno.team.team import Team
+    from agno.tools.duckduckgo import DuckDuckGoTools
+    from agno.tools.reasoning import ReasoningTools
+    
+    # Define specialized agents for different research tasks
+    # Web researcher uses OpenAI for accurate, up-to-date information
+    web_researcher = Agent(
+        name="Web Research Agent",
+        role="Research Fort Worth government websites and official sources",
+        model=create_openai_model(settings.OPENAI_MODEL),
+        tools=[DuckDuckGoTools()],
+        instructions=[
+            "Focus on official Fort Worth government websites (.gov domains)",
+            "Always include source URLs and dates",
+            "Verify information from multiple sources when possible",
+            "Extract structured data according to Texas Ontology Protocol (TOP)",
+            "Ensure factual accuracy of government data",
+        ],
+        add_datetime_to_instructions=True,
+        show_tool_calls=True,
+        # Enable structured output when researching specific entity types
+        response_model=None  # Will be set dynamically based on task
+    )
 
-# Create the research team with OpenAI model
-fort_worth_research_team = Team(
-    name="Fort Worth Municipal Research Team",
-    mode="coordinate",
-    model=create_openai_model(settings.OPENAI_MODEL),
-    members=[web_researcher, data_structurer, county_analyst],
-    tools=[ReasoningTools(add_instructions=True)],
-    instructions=[
-        "Collaborate to research comprehensive Fort Worth municipal data",
-        "Ensure all data follows Texas Ontology Protocol (TOP) standards",
-        "Cross-verify information between team members",
-        "Output structured JSON data ready for knowledge graph ingestion",
-        "Include confidence levels and source citations for all data points",
-        "Prioritize official government sources",
-    ],
-    markdown=True,
-    show_members_responses=True,
-    enable_agentic_context=True,
-    add_datetime_to_instructions=True,
-    success_criteria="The team has provided complete, structured Fort Worth municipal data with proper TOP formatting, source citations, and confidence levels.",
-)
+    data_structurer = Agent(
+        name="Data Structure Agent", 
+        role="Structure raw data into Texas Ontology Protocol compliant format",
+        model=create_openai_model(settings.OPENAI_MODEL),
+        instructions=[
+            "Convert unstructured data into TOP-compliant JSON format",
+            "Use appropriate entity types: HomeRuleCity, Mayor, Department, etc.",
+            "Include temporal data (valid_from, valid_until) for all entities",
+            "Add source attribution with confidence levels",
+            "Ensure all required fields are populated",
+            "Follow the exact structure of TOPEpisodeData model",
+        ],
+        add_datetime_to_instructions=True,
+        # Use structured output for data structuring
+        response_model=TOPEpisodeData,
+        use_json_mode=True
+    )
+
+    county_analyst = Agent(
+        name="County Integration Analyst",
+        role="Analyze Fort Worth's relationship with Tarrant County and Texas state structure",
+        model=create_openai_model(settings.OPENAI_MODEL),
+        tools=[DuckDuckGoTools()],
+        instructions=[
+            "Research Fort Worth's position within Tarrant County",
+            "Identify overlapping jurisdictions and shared services",
+            "Analyze intergovernmental agreements",
+            "Map relationships between city, county, and state entities",
+            "Verify jurisdictional boundaries and legal structures",
+        ],
+        add_datetime_to_instructions=True,
+        show_tool_calls=True,
+    )
+
+    # Create the research team with OpenAI model
+    return Team(
+        name="Fort Worth Municipal Research Team",
+        mode="coordinate",
+        model=create_openai_model(settings.OPENAI_MODEL),
+        members=[web_researcher, data_structurer, county_analyst],
+        tools=[ReasoningTools(add_instructions=True)],
+        instructions=[
+            "Collaborate to research comprehensive Fort Worth municipal data",
+            "Ensure all data follows Texas Ontology Protocol (TOP) standards",
+            "Cross-verify information between team members",
+            "Output structured JSON data ready for knowledge graph ingestion",
+            "Include confidence levels and source citations for all data points",
+            "Prioritize official government sources",
+        ],
+        markdown=True,
+        show_members_responses=True,
+        enable_agentic_context=True,
+        add_datetime_to_instructions=True,
+        success_criteria="The team has provided complete, structured Fort Worth municipal data with proper TOP formatting, source citations, and confidence levels.",
+    )
+
+
+_research_team: Optional["Team"] = None
+
+
+def get_research_team() -> "Team":
+    """The shared research team, built on first use."""
+    global _research_team
+    if _research_team is None:
+        _research_team = create_research_team()
+    return _research_team
+
+
+def __getattr__(name: str):
+    if name == "fort_worth_research_team":
+        return get_research_team()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class FortWorthResearchWorkflow(Workflow):
     """Workflow for researching Fort Worth municipal data."""
     
-    team = fort_worth_research_team
-    
-    def __init__(self, graphiti=None):
+    def __init__(self, graphiti=None, team: "Team" = None):
         super().__init__()
         self.graphiti = graphiti
+        self._team = team
         self.research_cache = {}
         self.cache_enabled = settings.AGENT_CACHE_ENABLED
         self.cache_ttl_hours = settings.AGENT_CACHE_TTL_HOURS
     
+    @property
+    def team(self) -> "Team":
+        """This workflow's team, or the shared one if none was given."""
+        if self._team is None:
+            self._team = get_research_team()
+        return self._team
+    
     def run(self) -> Iterator[RunResponse]:
         """
         Run research workflow for a specific task.
@@ -177,14 +224,23 @@ class FortWorthResearchWorkflow(Workflow):
         
         logger.info(f"Starting research for '{task_name}'")
         
+        # Don't start a task once the run or the day is over budget
+        budget = get_budget_manager()
+        budget.check()
+        
         # Run the team research
         logger.info(f"Running team research with prompt (first 200 chars): {prompt[:200]}...")
         
+        # A run that fails before responding must not re-record the previous task's usage
+        self.team.run_response = None
         try:
             yield from self.team.run(prompt, stream=True)
         except Exception as e:
             logger.error(f"Team research failed: {e}", exc_info=True)
             raise
+        finally:
+            if self.team.run_response:
+                budget.record_team_run(task_name, self.team.run_response)
         
         # Cache the results if enabled
         if self.cache_enabled and self.team.run_response:
@@ -244,8 +300,8 @@ Please research the following information about Fort Worth, Texas municipal gove
         if 'data_content' in config:
             prompt += "Data content provided for processing:\n"
             prompt += "=" * 80 + "\n"
-            prompt += config['data_content'][:5000]  # Limit to first 5000 chars to avoid token limits
-            if len(config['data_content']) > 5000:
+            prompt += config['data_content'][:MAX_DATA_CONTENT_CHARS]  # Avoid token limits; chunk long documents first
+            if len(config['data_content']) > MAX_DATA_CONTENT_CHARS:
                 prompt += "\n... (content truncated)"
             prompt += "\n" + "=" * 80 + "\n\n"
         
@@ -449,28 +505,113 @@ Ensure all data is properly structured and validated according to TOP specificat
         return None
     
     async def research_all_tasks(self, tasks: List[Dict[str, Any]]) -> List[RawEpisode]:
-        """Research all tasks and return episodes."""
+        """
+        Research tasks one after another and return their episodes.
+        
+        Team runs block, so each runs in a worker thread; on the event loop
+        they would stall lease renewals, job polls and API requests.
+        """
         all_episodes = []
         
         for task in tasks:
-            logger.info(f"Researching: {task['name']}")
-            
-            # Set the task in session state
-            self.session_state['research_task'] = task
-            
-            # Run the research
-            response_iter = self.run()
-            
-            # Consume the iterator to get results
+            try:
+                all_episodes.extend(await self._research_in_thread(task))
+            except BudgetExceededError as e:
+                # Keep what was researched so far instead of failing the whole run
+                logger.warning(f"Stopping research before '{task['name']}': {e}")
+                break
+        
+        return all_episodes
+    
+    async def research_tasks_concurrently(
+        self,
+        tasks: List[Dict[str, Any]],
+        max_concurrency: int = None
+    ) -> List[RawEpisode]:
+        """Research independent tasks in parallel and return episodes in task order."""
+        all_episodes = []
+        for task_episodes in await self.research_each_task(tasks, max_concurrency):
+            if task_episodes:
+                all_episodes.extend(task_episodes)
+        return all_episodes
+    
+    async def research_each_task(
+        self,
+        tasks: List[Dict[str, Any]],
+        max_concurrency: int = None
+    ) -> List[Optional[List[RawEpisode]]]:
+        """
+        Research independent tasks in parallel, returning episodes per task.
+        
+        Each task runs on its own workflow and team in a worker thread, since
+        team runs are blocking and keep per-run state. Failed tasks are None.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or settings.SYNC_RESEARCH_BATCH_SIZE)
+        
+        async def research_one(task: Dict[str, Any]) -> List[RawEpisode]:
+            async with semaphore:
+                workflow = FortWorthResearchWorkflow(self.graphiti, team=create_research_team())
+                return await workflow._research_in_thread(task)
+        
+        results = await asyncio.gather(
+            *(research_one(task) for task in tasks),
+            return_exceptions=True
+        )
+        
+        task_results = []
+        for task, result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Research failed for '{task['name']}': {result}")
+                task_results.append(None)
+            else:
+                task_results.append(result)
+        
+        return task_results
+    
+    async def _research_in_thread(self, task: Dict[str, Any]) -> List[RawEpisode]:
+        """
+        Run a research task in a worker thread and return its episodes.
+        
+        A thread can't be cancelled, so cancelling the caller flags the run
+        instead and the thread stops at the team's next streamed response.
+        """
+        cancelled = threading.Event()
+        try:
+            return await asyncio.to_thread(self._research_task, task, cancelled)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    def run_task(self, task: Dict[str, Any], cancelled: Optional[threading.Event] = None) -> List[str]:
+        """Run a single research task to completion and return its response contents."""
+        logger.info(f"Researching: {task['name']}")
+        
+        # Set the task in session state
+        self.session_state['research_task'] = task
+        
+        contents = []
+        response_iter = self.run()
+        try:
             for response in response_iter:
+                if cancelled is not None and cancelled.is_set():
+                    logger.info(f"Research for '{task['name']}' was cancelled")
+                    break
                 if response.content:
                     logger.debug(f"Research response: {response.content[:200]}...")
-            
-            # Get episodes from session state
-            task_episodes = self.session_state.get(f"{task['name']}_episodes", [])
-            all_episodes.extend(task_episodes)
+                    contents.append(response.content)
+        finally:
+            # Closing the run stops the team before its next step
+            response_iter.close()
+        return contents
+    
+    def _research_task(self, task: Dict[str, Any], cancelled: Optional[threading.Event] = None) -> List[RawEpisode]:
+        """Run a single research task to completion and return its episodes."""
+        self.run_task(task, cancelled)
+        if cancelled is not None and cancelled.is_set():
+            return []
         
-        return all_episodes
+        # Get episodes from session state
+        return self.session_state.get(f"{task['name']}_episodes", [])
 
 
 # Standalone function for direct agent research
@@ -495,13 +636,8 @@ async def research_fort_worth_topic(topic: str, data_requirements: List[str] = N
         }
     }
     
-    # Set the task in session state
-    workflow.session_state['research_task'] = research_task
-    
-    results = []
-    for response in workflow.run():
-        if response.content:
-            results.append(response.content)
+    # Team runs block, so keep them off the event loop
+    results = await asyncio.to_thread(workflow.run_task, research_task)
     
     return {
         "topic": topic,
@@ -0,0 +1 @@
+"""Read-side graph services used by the graph API."""
\ No newline at end of file
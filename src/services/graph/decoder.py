@@ -0,0 +1,145 @@
+"""
+Single-pass decoding of FalkorDB query rows for visualization.
+
+Each row is visited once: nodes and edges are dispatched on their type,
+deduplicated by FalkorDB's integer ids, and emitted together with an
+optional JSON-safe copy of the row, so results can be streamed as NDJSON
+while they are decoded.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from falkordb import Edge, Node, Path
+
+# Emitted items are (kind, payload) with kind "node", "edge" or "row"
+DecodedItem = Tuple[str, Dict[str, Any]]
+
+_SKIP = object()
+
+
+class GraphResultDecoder:
+    """Turns query rows into node, edge and raw row items."""
+
+    def __init__(self, include_raw_results: bool = True):
+        self.include_raw_results = include_raw_results
+        self.node_ids: Set[int] = set()
+        self.edge_ids: Set[int] = set()
+        # FalkorDB node id -> id used in the response (uuid when available)
+        self.node_keys: Dict[int, str] = {}
+        self._row_edges: List[Edge] = []
+        self._dispatch: Dict[type, Callable[[Any], Iterator[DecodedItem]]] = {
+            Node: self._decode_node,
+            Edge: self._decode_edge,
+            Path: self._decode_path,
+            list: self._decode_list,
+        }
+
+    def decode(self, rows: Iterable[Dict[str, Any]]) -> Iterator[DecodedItem]:
+        """Decode rows lazily, yielding items as soon as each row is read."""
+        for row in rows:
+            yield from self.decode_row(row)
+
+    def decode_row(self, row: Dict[str, Any]) -> Iterator[DecodedItem]:
+        raw = {} if self.include_raw_results else None
+        for key, value in row.items():
+            handler = self._dispatch.get(type(value))
+            if handler:
+                yield from handler(value)
+            if raw is not None:
+                plain = _plain(value)
+                if plain is not _SKIP:
+                    raw[key] = plain
+        # Edges go last so their endpoints in the same row resolve to uuids
+        edges, self._row_edges = self._row_edges, []
+        for edge in edges:
+            yield from self._emit_edge(edge)
+        if raw:
+            yield "row", raw
+
+    def _node_key(self, node_id: int) -> str:
+        return self.node_keys.get(node_id, str(node_id))
+
+    def _decode_node(self, node: Node) -> Iterator[DecodedItem]:
+        if node.id in self.node_ids:
+            return
+        self.node_ids.add(node.id)
+        props = node.properties
+        key = str(props.get("uuid", node.id))
+        self.node_keys[node.id] = key
+        labels = node.labels or []
+        yield "node", {
+            "id": key,
+            "label": props.get("name", props.get("title", "Unknown")),
+            "type": labels[0] if labels else "Entity",
+            "properties": props
+        }
+
+    def _decode_edge(self, edge: Edge) -> Iterator[DecodedItem]:
+        if edge.id not in self.edge_ids:
+            self.edge_ids.add(edge.id)
+            self._row_edges.append(edge)
+        return iter(())
+
+    def _emit_edge(self, edge: Edge) -> Iterator[DecodedItem]:
+        # Parsed edges reference their endpoints by FalkorDB node id
+        source = getattr(edge.src_node, "id", edge.src_node)
+        target = getattr(edge.dest_node, "id", edge.dest_node)
+        props = edge.properties
+        yield "edge", {
+            "id": str(props.get("uuid", f"edge_{edge.id}")),
+            "source": self._node_key(source),
+            "target": self._node_key(target),
+            "type": edge.relation or "RELATES_TO",
+            "properties": props
+        }
+
+    def _decode_path(self, path: Path) -> Iterator[DecodedItem]:
+        for node in path.nodes():
+            yield from self._decode_node(node)
+        for edge in path.edges():
+            yield from self._decode_edge(edge)
+
+    def _decode_list(self, values: list) -> Iterator[DecodedItem]:
+        for value in values:
+            handler = self._dispatch.get(type(value))
+            if handler:
+                yield from handler(value)
+
+
+def decode_all(
+    rows: Iterable[Dict[str, Any]],
+    include_raw_results: bool = True
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Decode rows into (nodes, edges, raw_results) lists."""
+    collected: Dict[str, List[Dict[str, Any]]] = {"node": [], "edge": [], "row": []}
+    for kind, payload in GraphResultDecoder(include_raw_results).decode(rows):
+        collected[kind].append(payload)
+    return collected["node"], collected["edge"], collected["row"]
+
+
+def _plain(value: Any) -> Any:
+    """JSON-safe copy of a scalar, list or map value; _SKIP for graph objects."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, list):
+        items = [_plain(item) for item in value]
+        return _SKIP if any(item is _SKIP for item in items) else items
+    if isinstance(value, dict):
+        items = {k: _plain(v) for k, v in value.items()}
+        return _SKIP if any(v is _SKIP for v in items.values()) else items
+    return _SKIP
+
+
+def to_ndjson(item: DecodedItem) -> str:
+    """Encode a decoded item as one NDJSON line."""
+    kind, payload = item
+    return json.dumps({"kind": kind, **payload}, default=str) + "\n"
+
+
+def summary_line(rows: int, truncated: bool, error: Optional[str] = None) -> str:
+    """Final NDJSON line describing the result."""
+    summary = {"kind": "summary", "rows": rows, "truncated": truncated}
+    if error:
+        summary["error"] = error
+    return json.dumps(summary) + "\n"
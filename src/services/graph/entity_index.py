@@ -0,0 +1,195 @@
+"""
+In-memory typeahead index over graph entities.
+
+Entity names, aliases and TOP ids are normalized into search keys (the value
+from each of its words onwards) and kept in a sorted list, so a prefix lookup
+is a binary search followed by a short scan. The index is rebuilt from FalkorDB
+after ingestion and at most every GRAPH_SEARCH_REFRESH_SECONDS.
+"""
+
+import asyncio
+import bisect
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase text and collapse punctuation into single spaces."""
+    return " ".join(TOKEN_PATTERN.findall(text.lower()))
+
+
+def search_keys(value: str) -> List[str]:
+    """Keys a value can be found by: the whole value and each of its words."""
+    normalized = normalize(value)
+    if not normalized:
+        return []
+    words = normalized.split(" ")
+    # Suffixes let "worth water" match "Fort Worth Water Department"
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+
+class EntityIndex:
+    """Prefix index over entity names, aliases and top_ids."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._keys: List[Tuple[str, int]] = []
+        self._entities: List[Dict[str, Any]] = []
+        self._built_at: Optional[float] = None
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """Mark the index for rebuilding before the next search."""
+        self._stale = True
+
+    @property
+    def needs_rebuild(self) -> bool:
+        if self._stale or self._built_at is None:
+            return True
+        return time.monotonic() - self._built_at > settings.GRAPH_SEARCH_REFRESH_SECONDS
+
+    async def rebuild(self):
+        """Load all entities and rebuild the key list."""
+        records, _, _ = await self.driver.execute_query(
+            """
+            MATCH (n:Entity)
+            RETURN n.uuid AS uuid,
+                   n.name AS name,
+                   labels(n) AS labels,
+                   n.top_id AS top_id,
+                   n.aliases AS aliases
+            """
+        )
+
+        entities: List[Dict[str, Any]] = []
+        keys: List[Tuple[str, int]] = []
+        for record in records:
+            if not record.get("uuid"):
+                continue
+            aliases = record.get("aliases") or []
+            if isinstance(aliases, str):
+                aliases = [aliases]
+            entity = {
+                "uuid": record["uuid"],
+                "name": record.get("name") or "",
+                "labels": [label for label in record.get("labels") or [] if label != "Entity"],
+                "top_id": record.get("top_id"),
+                "aliases": list(aliases),
+            }
+            position = len(entities)
+            entities.append(entity)
+
+            values = [entity["name"], *entity["aliases"]]
+            if entity["top_id"]:
+                values.append(entity["top_id"])
+            for value in values:
+                keys.extend((key, position) for key in search_keys(str(value)))
+
+        keys.sort()
+        self._keys, self._entities = keys, entities
+        self._built_at = time.monotonic()
+        self._stale = False
+        logger.info(f"Entity search index rebuilt: {len(entities)} entities, {len(keys)} keys")
+
+    async def ensure_current(self):
+        if not self.needs_rebuild:
+            return
+        async with self._lock:
+            if self.needs_rebuild:
+                await self.rebuild()
+
+    async def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find entities whose name, alias or top_id words start with the query.
+
+        Exact matches rank first, then matches on the start of the full
+        value, then matches on later words; shorter names break ties.
+        """
+        await self.ensure_current()
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        best: Dict[int, Tuple[int, str]] = {}
+        start = bisect.bisect_left(self._keys, (prefix, -1))
+        for key, position in self._keys[start:]:
+            if not key.startswith(prefix):
+                break
+            entity = self._entities[position]
+            rank = 0 if key == prefix else 1 if normalize(entity["name"]).startswith(prefix) else 2
+            if position not in best or rank < best[position][0]:
+                best[position] = (rank, key)
+            # Enough candidates to rank - avoid scanning very common prefixes
+            if len(best) >= limit * 20:
+                break
+
+        ranked = sorted(best.items(), key=lambda item: (item[1][0], len(self._entities[item[0]]["name"])))
+        return [
+            {**self._entities[position], "matched": key, "score": 1.0 / (rank + 1)}
+            for position, (rank, key) in ranked[:limit]
+        ]
+
+
+async def get_neighborhood(driver, uuid: str, limit: int = 50) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return the entity with its direct RELATES_TO neighbours as nodes and edges."""
+    records, _, _ = await driver.execute_query(
+        f"""
+        MATCH (n:Entity {{uuid: $uuid}})
+        OPTIONAL MATCH (n)-[r:RELATES_TO]-(m:Entity)
+        RETURN n, r, m
+        LIMIT {int(limit)}
+        """,
+        uuid=uuid
+    )
+
+    nodes: Dict[str, Dict[str, Any]] = {}
+    edges: List[Dict[str, Any]] = []
+    for record in records:
+        center, relationship, neighbour = record.get("n"), record.get("r"), record.get("m")
+        for node in (center, neighbour):
+            if node is not None:
+                node_dict = _node_to_dict(node)
+                nodes.setdefault(node_dict["id"], node_dict)
+        if relationship is None or neighbour is None:
+            continue
+
+        props = _without_embeddings(relationship.properties)
+        # Relationship direction follows the stored edge, not the match pattern
+        source, target = center, neighbour
+        src_node = getattr(relationship, "src_node", None)
+        if getattr(src_node, "id", src_node) == neighbour.id:
+            source, target = neighbour, center
+        edges.append({
+            "id": str(props.get("uuid", f"edge_{id(relationship)}")),
+            "source": str(source.properties.get("uuid")),
+            "target": str(target.properties.get("uuid")),
+            "type": getattr(relationship, "relation", "RELATES_TO"),
+            "properties": props
+        })
+
+    return list(nodes.values()), edges
+
+
+def _without_embeddings(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in properties.items() if not k.endswith("_embedding")}
+
+
+def _node_to_dict(node) -> Dict[str, Any]:
+    props = _without_embeddings(node.properties)
+    labels = [label for label in node.labels or [] if label != "Entity"]
+    return {
+        "id": str(props.get("uuid", f"node_{id(node)}")),
+        "label": props.get("name", props.get("title", "Unknown")),
+        "type": labels[0] if labels else "Entity",
+        "properties": props
+    }
@@ -0,0 +1,152 @@
+"""
+Episode timeline queries.
+
+Episodes are listed newest first with keyset pagination over a range index
+on the ordering property. Each page is read from bounded time windows that
+widen geometrically until the page is full, so the cost of a page depends on
+the page size rather than on the total number of Episodic nodes.
+"""
+
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from graphiti_core.utils.datetime_utils import utc_now
+
+from src.db.indexes import ensure_index
+
+logger = logging.getLogger(__name__)
+
+
+EPISODE_ORDER_FIELDS = ("created_at", "valid_at")
+
+# Upper bound for the first page; sorts after every ISO timestamp
+MAX_TIMESTAMP = "9999-12-31T23:59:59.999999+00:00"
+
+INITIAL_WINDOW = timedelta(days=1)
+WINDOW_GROWTH = 4
+
+
+def encode_cursor(order_value: str, uuid: str) -> str:
+    """Encode the position of the last episode on a page."""
+    return base64.urlsafe_b64encode(json.dumps([order_value, uuid]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        order_value, uuid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return str(order_value), str(uuid)
+
+
+class EpisodeTimeline:
+    """Paginated, time-ordered access to Episodic nodes."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def ensure_indexes(self):
+        """Create range indexes on the episode ordering properties."""
+        for field in EPISODE_ORDER_FIELDS:
+            await ensure_index(self.driver, "Episodic", field)
+
+    async def list_episodes(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        order_by: str = "created_at"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List episodes newest first.
+
+        Args:
+            limit: Page size
+            cursor: Cursor from the previous page, or None for the first page
+            order_by: 'created_at' (ingestion time) or 'valid_at' (reference time)
+
+        Returns:
+            The page of episodes and the cursor for the next page (None at the end)
+        """
+        if order_by not in EPISODE_ORDER_FIELDS:
+            raise ValueError(f"order_by must be one of {', '.join(EPISODE_ORDER_FIELDS)}")
+        await self.ensure_indexes()
+
+        if cursor:
+            upper, after_uuid = decode_cursor(cursor)
+        else:
+            upper, after_uuid = MAX_TIMESTAMP, ""
+
+        episodes: List[Dict[str, Any]] = []
+        window = INITIAL_WINDOW
+        if upper == MAX_TIMESTAMP:
+            lower = (utc_now() - window).isoformat()
+        else:
+            lower = _shift(upper, window)
+
+        # Fetch one extra row to know whether another page exists
+        while len(episodes) <= limit:
+            episodes.extend(await self._read_window(order_by, lower, upper, after_uuid, limit + 1 - len(episodes)))
+            if len(episodes) > limit or not await self._has_older(order_by, lower):
+                break
+            # Continue strictly below this window with a wider one
+            upper, after_uuid = lower, ""
+            window *= WINDOW_GROWTH
+            lower = _shift(lower, window)
+
+        next_cursor = None
+        if len(episodes) > limit:
+            episodes = episodes[:limit]
+            last = episodes[-1]
+            next_cursor = encode_cursor(last[order_by], last["uuid"])
+        return episodes, next_cursor
+
+    async def _read_window(
+        self,
+        order_by: str,
+        lower: str,
+        upper: str,
+        after_uuid: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Episodes in [lower, upper], excluding rows at or before the cursor."""
+        records, _, _ = await self.driver.execute_query(
+            f"""
+            MATCH (e:Episodic)
+            WHERE e.{order_by} >= $lower AND e.{order_by} <= $upper
+              AND (e.{order_by} < $upper OR e.uuid < $after_uuid)
+            WITH e ORDER BY e.{order_by} DESC, e.uuid DESC LIMIT {int(limit)}
+            OPTIONAL MATCH (e)-[:MENTIONS]->(n:Entity)
+            WITH e, count(DISTINCT n) AS entity_count
+            RETURN e.uuid AS uuid,
+                   e.name AS name,
+                   e.source AS source,
+                   e.source_description AS source_description,
+                   e.group_id AS group_id,
+                   e.created_at AS created_at,
+                   e.valid_at AS valid_at,
+                   entity_count,
+                   size(coalesce(e.entity_edges, [])) AS edge_count
+            ORDER BY e.{order_by} DESC, e.uuid DESC
+            """,
+            lower=lower,
+            upper=upper,
+            after_uuid=after_uuid
+        )
+        return records
+
+    async def _has_older(self, order_by: str, lower: str) -> bool:
+        records, _, _ = await self.driver.execute_query(
+            f"MATCH (e:Episodic) WHERE e.{order_by} < $lower RETURN e.uuid AS uuid LIMIT 1",
+            lower=lower
+        )
+        return bool(records)
+
+
+def _shift(timestamp: str, delta: timedelta) -> str:
+    """Move an ISO timestamp back by delta, keeping its format."""
+    return (datetime.fromisoformat(timestamp) - delta).isoformat()
@@ -0,0 +1,266 @@
+"""
+Columnar export of the knowledge graph as Arrow IPC or Parquet.
+
+Nodes and edges are read in pages ordered by their FalkorDB id and converted
+to Arrow record batches one page at a time, so an export streams at a steady
+memory cost regardless of graph size. Properties become typed columns:
+
+- The column types come from the first page (strings ending in `_at` that
+  parse as ISO timestamps become timestamp columns, `*_embedding` lists
+  become fixed-size float32 list columns)
+- Values in later pages that don't fit the inferred type, and properties
+  first seen after the first page, are kept as JSON in `extra_properties`
+- Properties named like a base column, such as the `source` property of
+  structured edges, are exported as `prop_<name>`
+
+pyarrow is an optional dependency (`pip install fwtx-wiki[export]`).
+"""
+
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+from src.config import settings
+from src.services.graphiti.ingest import EPISODE_HASH_LABEL
+
+logger = logging.getLogger(__name__)
+
+
+NODES = "nodes"
+EDGES = "edges"
+
+FORMAT_ARROW = "arrow"
+FORMAT_PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    FORMAT_ARROW: "application/vnd.apache.arrow.stream",
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+}
+
+EXTRA_COLUMN = "extra_properties"
+PROPERTY_PREFIX = "prop_"
+
+PAGE_QUERIES = {
+    NODES: f"""
+        MATCH (n)
+        WHERE id(n) > $after AND NOT n:{EPISODE_HASH_LABEL}
+        RETURN id(n) AS falkor_id, labels(n) AS labels, properties(n) AS props
+        ORDER BY id(n)
+        LIMIT $page_size
+    """,
+    EDGES: """
+        MATCH (a)-[r]->(b)
+        WHERE id(r) > $after
+        RETURN id(r) AS falkor_id, type(r) AS type, a.uuid AS source, b.uuid AS target,
+               properties(r) AS props
+        ORDER BY id(r)
+        LIMIT $page_size
+    """,
+}
+
+
+async def read_pages(driver, query: str, page_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Read a query in pages keyed on the FalkorDB id.
+
+    The query takes $after and $page_size, returns `falkor_id` and is
+    ordered by it.
+    """
+    after = -1
+    while True:
+        records, _, _ = await driver.execute_query(query, after=after, page_size=page_size)
+        if not records:
+            return
+        yield records
+        if len(records) < page_size:
+            return
+        after = records[-1]["falkor_id"]
+
+
+def export_available() -> bool:
+    return pa is not None
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def infer_type(key: str, value: Any) -> "pa.DataType":
+    """Arrow type for a property, based on a sample value."""
+    if isinstance(value, bool):
+        return pa.bool_()
+    if isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    if isinstance(value, str):
+        if key.endswith("_at") and _parse_timestamp(value):
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+    if isinstance(value, list):
+        if key.endswith("_embedding") and value and all(isinstance(v, (int, float)) for v in value):
+            return pa.list_(pa.float32(), len(value))
+        if all(isinstance(v, str) for v in value):
+            return pa.list_(pa.string())
+    # Maps and mixed lists
+    return pa.string()
+
+
+def _coerce(value: Any, arrow_type: "pa.DataType") -> Tuple[Any, bool]:
+    """Convert a value for a column; the flag is False when it doesn't fit."""
+    if value is None:
+        return None, True
+    if pa.types.is_boolean(arrow_type):
+        return value, isinstance(value, bool)
+    if pa.types.is_int64(arrow_type):
+        return value, isinstance(value, int) and not isinstance(value, bool)
+    if pa.types.is_float64(arrow_type):
+        return value, isinstance(value, (int, float)) and not isinstance(value, bool)
+    if pa.types.is_timestamp(arrow_type):
+        parsed = _parse_timestamp(value) if isinstance(value, str) else None
+        return parsed, parsed is not None
+    if pa.types.is_fixed_size_list(arrow_type):
+        fits = isinstance(value, list) and len(value) == arrow_type.list_size
+        return value, fits
+    if pa.types.is_list(arrow_type):
+        return value, isinstance(value, list) and all(isinstance(v, str) for v in value)
+    if isinstance(value, str):
+        return value, True
+    return json.dumps(value, default=str), True
+
+
+class GraphExporter:
+    """Streams nodes or edges as Arrow record batches, Arrow IPC or Parquet."""
+
+    def __init__(self, driver, page_size: Optional[int] = None):
+        if not export_available():
+            raise RuntimeError("Graph export requires pyarrow - install it with `pip install fwtx-wiki[export]`")
+        self.driver = driver
+        self.page_size = page_size or settings.GRAPH_EXPORT_PAGE_SIZE
+
+    def pages(self, kind: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        return read_pages(self.driver, PAGE_QUERIES[kind], self.page_size)
+
+    def base_fields(self, kind: str) -> List["pa.Field"]:
+        if kind == NODES:
+            return [
+                pa.field("id", pa.string()),
+                pa.field("falkor_id", pa.int64()),
+                pa.field("labels", pa.list_(pa.string())),
+            ]
+        return [
+            pa.field("id", pa.string()),
+            pa.field("falkor_id", pa.int64()),
+            pa.field("type", pa.string()),
+            pa.field("source", pa.string()),
+            pa.field("target", pa.string()),
+        ]
+
+    def properties(self, kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """A record's properties by column name, without the uuid."""
+        reserved = {field.name for field in self.base_fields(kind)} | {EXTRA_COLUMN}
+        props = dict(record.get("props") or {})
+        # uuid becomes the id column
+        props.pop("uuid", None)
+        return {PROPERTY_PREFIX + key if key in reserved else key: value for key, value in props.items()}
+
+    def infer_schema(self, kind: str, records: List[Dict[str, Any]]) -> "pa.Schema":
+        """Schema with one typed column per property seen in the records."""
+        samples: Dict[str, Any] = {}
+        for record in records:
+            for key, value in self.properties(kind, record).items():
+                if value is not None and key not in samples:
+                    samples[key] = value
+        property_fields = [pa.field(key, infer_type(key, samples[key])) for key in sorted(samples)]
+        return pa.schema(self.base_fields(kind) + property_fields + [pa.field(EXTRA_COLUMN, pa.string())])
+
+    def to_batch(self, kind: str, schema: "pa.Schema", records: List[Dict[str, Any]]) -> "pa.RecordBatch":
+        """Convert a page of records to a record batch of the given schema."""
+        base_names = [field.name for field in self.base_fields(kind)]
+        property_fields = [field for field in schema if field.name not in base_names and field.name != EXTRA_COLUMN]
+        columns: Dict[str, List[Any]] = {field.name: [] for field in schema}
+
+        for record in records:
+            props = self.properties(kind, record)
+            columns["id"].append(str((record.get("props") or {}).get("uuid", record["falkor_id"])))
+            columns["falkor_id"].append(record["falkor_id"])
+            if kind == NODES:
+                columns["labels"].append(list(record.get("labels") or []))
+            else:
+                columns["type"].append(record.get("type"))
+                columns["source"].append(record.get("source"))
+                columns["target"].append(record.get("target"))
+
+            for field in property_fields:
+                raw = props.pop(field.name, None)
+                value, fits = _coerce(raw, field.type)
+                if fits:
+                    columns[field.name].append(value)
+                else:
+                    columns[field.name].append(None)
+                    props[field.name] = raw
+            # Everything that didn't get a typed column
+            extra = {k: v for k, v in props.items() if v is not None}
+            columns[EXTRA_COLUMN].append(json.dumps(extra, default=str) if extra else None)
+
+        return pa.RecordBatch.from_arrays(
+            [pa.array(columns[field.name], type=field.type) for field in schema],
+            schema=schema
+        )
+
+    async def record_batches(self, kind: str) -> AsyncIterator["pa.RecordBatch"]:
+        """Yield one record batch per page, all sharing the first page's schema."""
+        schema = None
+        exported = 0
+        async for records in self.pages(kind):
+            if schema is None:
+                schema = self.infer_schema(kind, records)
+            batch = self.to_batch(kind, schema, records)
+            exported += batch.num_rows
+            yield batch
+        if schema is None:
+            yield pa.RecordBatch.from_pylist([], schema=self.infer_schema(kind, []))
+        logger.info(f"Exported {exported} {kind}")
+
+    async def stream(self, kind: str, fmt: str) -> AsyncIterator[bytes]:
+        """Encode the record batches as an Arrow IPC stream or a Parquet file."""
+        sink = io.BytesIO()
+        writer = None
+
+        def drain() -> bytes:
+            data = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            return data
+
+        async for batch in self.record_batches(kind):
+            if writer is None:
+                if fmt == FORMAT_PARQUET:
+                    writer = pq.ParquetWriter(sink, batch.schema, compression="zstd")
+                else:
+                    writer = pa.ipc.new_stream(sink, batch.schema)
+            if fmt == FORMAT_PARQUET:
+                # One row group per page
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            data = drain()
+            if data:
+                yield data
+
+        writer.close()
+        data = drain()
+        if data:
+            yield data
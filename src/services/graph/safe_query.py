@@ -0,0 +1,208 @@
+"""
+Bounded execution of user-supplied Cypher.
+
+Queries from the graph API run with a FalkorDB TIMEOUT, a row cap enforced
+through LIMIT, GRAPH.RO_QUERY in read-only mode, and a GRAPH.EXPLAIN check
+that rejects cartesian products whose estimated size exceeds a threshold.
+
+The row cap bounds the size of the response, not the memory used to produce
+it: FalkorDB may still process every match (for example to sort them) before
+the LIMIT applies, and the client receives the capped result set in one
+reply before rows are handed out.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from falkordb.execution_plan import ExecutionPlan, Operation
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+RETURN_PATTERN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+UNION_PATTERN = re.compile(r"\bUNION\b", re.IGNORECASE)
+TRAILING_LIMIT_PATTERN = re.compile(r"\bLIMIT\s+(\d+|\$\w+)\s*;?\s*$", re.IGNORECASE)
+LABEL_PATTERN = re.compile(r":`?(\w+)`?")
+
+CARTESIAN_PRODUCT = "Cartesian Product"
+ALL_NODE_SCAN = "All Node Scan"
+LABEL_SCAN = "Node By Label Scan"
+
+
+class QueryRejectedError(ValueError):
+    """The query was refused before execution."""
+
+
+class QueryTimeoutError(Exception):
+    """The query exceeded its time budget."""
+
+
+def apply_row_limit(query: str, row_limit: int, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cap the rows a RETURN query can produce.
+
+    One row beyond the cap is requested so truncation can be detected.
+    Queries without a RETURN clause are left unchanged.
+
+    Raises:
+        QueryRejectedError: UNION queries, where a trailing LIMIT would
+            only cap the last branch
+    """
+    query = query.strip().rstrip(";")
+    if not RETURN_PATTERN.search(query):
+        return query
+    if UNION_PATTERN.search(query):
+        raise QueryRejectedError("UNION queries can't be row-limited; run each branch as its own query")
+
+    match = TRAILING_LIMIT_PATTERN.search(query)
+    if match:
+        limit = match.group(1)
+        if limit.startswith("$"):
+            limit = (params or {}).get(limit[1:])
+        if isinstance(limit, (int, str)) and str(limit).isdigit() and int(limit) <= row_limit + 1:
+            return query
+        return f"{query[:match.start()]}LIMIT {row_limit + 1}"
+    return f"{query} LIMIT {row_limit + 1}"
+
+
+class SafeQueryExecutor:
+    """Runs user Cypher with time, size and cost limits."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def _graph(self):
+        return self.driver._get_graph(self.driver._database)
+
+    async def execute(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        read_only: Optional[bool] = None,
+        timeout_ms: Optional[int] = None,
+        row_limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Execute a query and return its rows as a list.
+
+        See execute_iter for the arguments and errors.
+        """
+        rows, truncated = await self.execute_iter(query, params, read_only, timeout_ms, row_limit)
+        return list(rows), truncated
+
+    async def execute_iter(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        read_only: Optional[bool] = None,
+        timeout_ms: Optional[int] = None,
+        row_limit: Optional[int] = None,
+        check_cost: bool = True
+    ) -> Tuple[Iterator[Dict[str, Any]], bool]:
+        """
+        Execute a query within the configured bounds.
+
+        Args:
+            query: Cypher query
+            params: Query parameters
+            read_only: Request read-only execution; writes are only allowed
+                when GRAPH_QUERY_READ_ONLY is disabled
+            timeout_ms: Requested timeout, capped at GRAPH_QUERY_TIMEOUT_MS
+            row_limit: Requested row cap, capped at GRAPH_QUERY_MAX_ROWS
+            check_cost: Run the EXPLAIN cost check; server-defined queries
+                may skip it
+
+        Returns:
+            A lazy iterator of result rows as dicts and whether they were truncated
+
+        Raises:
+            QueryRejectedError: Invalid query or cartesian product too large
+            QueryTimeoutError: Query exceeded its timeout
+        """
+        params = params or {}
+        read_only = settings.GRAPH_QUERY_READ_ONLY or read_only is not False
+        timeout_ms = min(timeout_ms or settings.GRAPH_QUERY_TIMEOUT_MS, settings.GRAPH_QUERY_TIMEOUT_MS)
+        row_limit = min(row_limit or settings.GRAPH_QUERY_MAX_ROWS, settings.GRAPH_QUERY_MAX_ROWS)
+
+        bounded_query = apply_row_limit(query, row_limit, params)
+        graph = self._graph()
+
+        if check_cost:
+            await self._check_cost(graph, bounded_query, params)
+
+        try:
+            if read_only:
+                result = await graph.ro_query(bounded_query, params, timeout=timeout_ms)
+            else:
+                result = await graph.query(bounded_query, params, timeout=timeout_ms)
+        except Exception as e:
+            if "timed out" in str(e).lower():
+                raise QueryTimeoutError(f"Query exceeded the {timeout_ms}ms timeout") from e
+            raise
+
+        header = [column[1] for column in result.header]
+        result_set = result.result_set
+        truncated = len(result_set) > row_limit
+        if truncated:
+            logger.info(f"Query result truncated to {row_limit} rows")
+        # result_set is already complete here; rows are only zipped on demand
+        # so callers can decode while they iterate
+        rows = (dict(zip(header, result_set[i])) for i in range(min(len(result_set), row_limit)))
+        return rows, truncated
+
+    async def _check_cost(self, graph, query: str, params: Dict[str, Any]):
+        """Reject queries whose cartesian products are estimated to be too large."""
+        try:
+            plan: ExecutionPlan = await graph.explain(query, params)
+        except Exception as e:
+            raise QueryRejectedError(f"Invalid query: {e}") from e
+
+        counts: Dict[Optional[str], int] = {}
+        products: List[int] = []
+        await self._estimate_rows(graph, plan.structured_plan, counts, products)
+        estimate = max(products, default=0)
+        if estimate > settings.GRAPH_QUERY_MAX_CARTESIAN_ROWS:
+            raise QueryRejectedError(
+                f"Query contains a cartesian product of an estimated {estimate:,} rows "
+                f"(limit {settings.GRAPH_QUERY_MAX_CARTESIAN_ROWS:,}); connect the patterns or filter them"
+            )
+
+    async def _estimate_rows(
+        self,
+        graph,
+        op: Operation,
+        counts: Dict[Optional[str], int],
+        products: List[int]
+    ) -> int:
+        """
+        Estimate the rows produced by a plan operation.
+
+        Cartesian products multiply their branches and are recorded in
+        products; label and full scans count their nodes; index scans and
+        seeks are assumed selective. Other operations pass through their
+        largest input.
+        """
+        if op.name == CARTESIAN_PRODUCT:
+            estimate = 1
+            for child in op.children:
+                estimate *= await self._estimate_rows(graph, child, counts, products)
+            products.append(estimate)
+            return estimate
+        if op.name == ALL_NODE_SCAN:
+            return await self._node_count(graph, None, counts)
+        if op.name == LABEL_SCAN:
+            match = LABEL_PATTERN.search(op.args or "")
+            return await self._node_count(graph, match.group(1) if match else None, counts)
+        if not op.children:
+            return 1
+        return max([await self._estimate_rows(graph, child, counts, products) for child in op.children])
+
+    async def _node_count(self, graph, label: Optional[str], counts: Dict[Optional[str], int]) -> int:
+        if label not in counts:
+            pattern = f"(n:`{label}`)" if label else "(n)"
+            result = await graph.ro_query(f"MATCH {pattern} RETURN count(n)")
+            counts[label] = result.result_set[0][0] if result.result_set else 0
+        return counts[label]
@@ -0,0 +1,241 @@
+"""
+Graph snapshots for provisioning without the LLM pipeline.
+
+A snapshot is a gzip-compressed JSON Lines file: a header line, then every
+node, then every edge, with all properties including embeddings. Restoring
+creates the nodes with batched UNWIND writes grouped by label set, maps the
+snapshot node ids to the new FalkorDB ids, and then creates the edges the
+same way. Embedding lists are written back as vecf32 vectors so vector
+search keeps working.
+"""
+
+import gzip
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.services.graph.export import read_pages
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_VERSION = 1
+
+NODE_PAGE_QUERY = """
+    MATCH (n)
+    WHERE id(n) > $after
+    RETURN id(n) AS falkor_id, labels(n) AS labels, properties(n) AS props
+    ORDER BY id(n)
+    LIMIT $page_size
+"""
+
+EDGE_PAGE_QUERY = """
+    MATCH (a)-[r]->(b)
+    WHERE id(r) > $after
+    RETURN id(r) AS falkor_id, type(r) AS type, id(a) AS source, id(b) AS target,
+           properties(r) AS props
+    ORDER BY id(r)
+    LIMIT $page_size
+"""
+
+
+class SnapshotError(Exception):
+    """The snapshot could not be restored."""
+
+
+def _quote(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _split_embeddings(props: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, List[float]]]:
+    """Separate vector properties, which need vecf32() on write, from the rest."""
+    plain, embeddings = {}, {}
+    for key, value in props.items():
+        if key.endswith("_embedding") and isinstance(value, list):
+            embeddings[key] = value
+        else:
+            plain[key] = value
+    return plain, embeddings
+
+
+async def create_snapshot(driver, path: Path, page_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Dump every node and edge to a gzip JSONL snapshot.
+
+    Args:
+        driver: FalkorDB driver
+        path: Snapshot file to write
+        page_size: Records read per query
+
+    Returns:
+        Counts of the nodes and edges written
+    """
+    page_size = page_size or settings.GRAPH_EXPORT_PAGE_SIZE
+    counts = {"nodes": 0, "edges": 0}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        header = {"kind": "header", "version": SNAPSHOT_VERSION, "created_at": datetime.now().isoformat()}
+        f.write(json.dumps(header) + "\n")
+
+        async for records in read_pages(driver, NODE_PAGE_QUERY, page_size):
+            for record in records:
+                line = {"kind": "node", "id": record["falkor_id"], "labels": record["labels"], "props": record["props"]}
+                f.write(json.dumps(line, default=str) + "\n")
+            counts["nodes"] += len(records)
+            logger.info(f"Snapshot: {counts['nodes']} nodes written")
+
+        async for records in read_pages(driver, EDGE_PAGE_QUERY, page_size):
+            for record in records:
+                line = {
+                    "kind": "edge",
+                    "id": record["falkor_id"],
+                    "type": record["type"],
+                    "source": record["source"],
+                    "target": record["target"],
+                    "props": record["props"],
+                }
+                f.write(json.dumps(line, default=str) + "\n")
+            counts["edges"] += len(records)
+            logger.info(f"Snapshot: {counts['edges']} edges written")
+
+    # Only replace an existing snapshot once the new one is complete
+    tmp_path.replace(path)
+    logger.info(f"Snapshot written to {path}: {counts['nodes']} nodes, {counts['edges']} edges")
+    return counts
+
+
+class SnapshotRestorer:
+    """Loads a snapshot into an empty graph with batched UNWIND writes."""
+
+    def __init__(self, driver, batch_size: Optional[int] = None):
+        self.driver = driver
+        self.batch_size = batch_size or settings.GRAPH_SNAPSHOT_BATCH_SIZE
+        # Snapshot node id -> FalkorDB id of the restored node
+        self.node_ids: Dict[int, int] = {}
+        self.counts = {"nodes": 0, "edges": 0, "skipped_edges": 0}
+        self._node_batches: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        self._edge_batches: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+
+    async def restore(self, path: Path) -> Dict[str, int]:
+        """Restore a snapshot file, returning node and edge counts."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("kind") != "header" or header.get("version") != SNAPSHOT_VERSION:
+                raise SnapshotError(f"{path} is not a version {SNAPSHOT_VERSION} graph snapshot")
+
+            nodes_done = False
+            for line in f:
+                item = json.loads(line)
+                if item["kind"] == "node":
+                    await self.add_node(item)
+                elif item["kind"] == "edge":
+                    if not nodes_done:
+                        # Edges need the ids of every restored node
+                        await self.flush_nodes()
+                        nodes_done = True
+                    await self.add_edge(item)
+
+        await self.flush_nodes()
+        await self.flush_edges()
+        if self.counts["skipped_edges"]:
+            logger.warning(f"Skipped {self.counts['skipped_edges']} edges whose endpoints were not in the snapshot")
+        logger.info(f"Restored {self.counts['nodes']} nodes and {self.counts['edges']} edges from {path}")
+        return self.counts
+
+    async def add_node(self, item: Dict[str, Any]):
+        props, embeddings = _split_embeddings(item["props"])
+        key = (tuple(item["labels"]), tuple(sorted(embeddings)))
+        batch = self._node_batches.setdefault(key, [])
+        batch.append({"id": item["id"], "props": props, "embeddings": embeddings})
+        if len(batch) >= self.batch_size:
+            await self._write_nodes(key, self._node_batches.pop(key))
+
+    async def add_edge(self, item: Dict[str, Any]):
+        source, target = self.node_ids.get(item["source"]), self.node_ids.get(item["target"])
+        if source is None or target is None:
+            self.counts["skipped_edges"] += 1
+            return
+        props, embeddings = _split_embeddings(item["props"])
+        key = (item["type"], tuple(sorted(embeddings)))
+        batch = self._edge_batches.setdefault(key, [])
+        batch.append({"source": source, "target": target, "props": props, "embeddings": embeddings})
+        if len(batch) >= self.batch_size:
+            await self._write_edges(key, self._edge_batches.pop(key))
+
+    async def flush_nodes(self):
+        for key in list(self._node_batches):
+            await self._write_nodes(key, self._node_batches.pop(key))
+
+    async def flush_edges(self):
+        for key in list(self._edge_batches):
+            await self._write_edges(key, self._edge_batches.pop(key))
+
+    async def _write_nodes(self, key, rows: List[Dict[str, Any]]):
+        labels, embedding_keys = key
+        label_clause = "".join(f":{_quote(label)}" for label in labels)
+        set_clause = "".join(
+            f", n.{_quote(name)} = vecf32(row.embeddings.{_quote(name)})" for name in embedding_keys
+        )
+        records, _, _ = await self.driver.execute_query(
+            f"""
+            UNWIND $rows AS row
+            CREATE (n{label_clause})
+            SET n = row.props{set_clause}
+            RETURN row.id AS snapshot_id, id(n) AS id
+            """,
+            rows=rows
+        )
+        for record in records:
+            self.node_ids[record["snapshot_id"]] = record["id"]
+        self.counts["nodes"] += len(rows)
+        logger.info(f"Restored {self.counts['nodes']} nodes")
+
+    async def _write_edges(self, key, rows: List[Dict[str, Any]]):
+        edge_type, embedding_keys = key
+        # id() equality is planned as a node-by-id seek, not a scan
+        set_clause = "".join(
+            f", r.{_quote(name)} = vecf32(row.embeddings.{_quote(name)})" for name in embedding_keys
+        )
+        await self.driver.execute_query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (a) WHERE id(a) = row.source
+            MATCH (b) WHERE id(b) = row.target
+            CREATE (a)-[r:{_quote(edge_type)}]->(b)
+            SET r = row.props{set_clause}
+            """,
+            rows=rows
+        )
+        self.counts["edges"] += len(rows)
+        logger.info(f"Restored {self.counts['edges']} edges")
+
+
+async def graph_is_empty(driver) -> bool:
+    records, _, _ = await driver.execute_query("MATCH (n) RETURN n LIMIT 1")
+    return not records
+
+
+async def restore_snapshot(driver, path: Path, clear: bool = False) -> Dict[str, int]:
+    """
+    Restore a snapshot into the graph.
+
+    Args:
+        driver: FalkorDB driver
+        path: Snapshot file to read
+        clear: Delete the existing graph first; otherwise the graph must be empty
+
+    Raises:
+        SnapshotError: The graph is not empty or the file is not a snapshot
+    """
+    if clear:
+        logger.info("Clearing the existing graph before restoring")
+        await driver.execute_query("MATCH (n) DETACH DELETE n")
+    elif not await graph_is_empty(driver):
+        raise SnapshotError("The graph is not empty - restore with clear=True to replace it")
+    return await SnapshotRestorer(driver).restore(Path(path))
@@ -0,0 +1,276 @@
+"""
+Named, parameterized graph queries.
+
+Dashboards call server-side templates by name instead of sending Cypher with
+literals embedded in it. Template text never changes between calls, so
+FalkorDB reuses its cached query plan, and responses are cached per
+(template, parameters) for the template's TTL.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ConfigDict, ValidationError, create_model
+
+from src.config import settings
+from src.services.graph.decoder import decode_all
+from src.services.graph.safe_query import QueryRejectedError, SafeQueryExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTemplate:
+    """
+    A named Cypher query with typed parameters.
+
+    The query must end with `LIMIT $limit`; the limit is supplied from the
+    template default or the request.
+
+    Args:
+        name: Name the template is invoked by
+        query: Cypher text using $parameters
+        params: Parameter name -> type, or (type, default) for optional ones
+        description: Shown in the template listing
+        limit: Default row limit
+        cache_ttl: Seconds a response stays cached; 0 disables caching
+    """
+
+    def __init__(
+        self,
+        name: str,
+        query: str,
+        params: Dict[str, Any],
+        description: str = "",
+        limit: int = 100,
+        cache_ttl: int = 60
+    ):
+        self.name = name
+        self.query = query.strip()
+        self.params = params
+        self.description = description
+        self.limit = limit
+        self.cache_ttl = cache_ttl
+
+        fields = {
+            key: spec if isinstance(spec, tuple) else (spec, ...)
+            for key, spec in params.items()
+        }
+        self._model = create_model(
+            f"{name}_params",
+            __config__=ConfigDict(extra="forbid"),
+            **fields
+        )
+
+    def bind(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and coerce request parameters into query parameters."""
+        try:
+            values = self._model(**params).model_dump()
+        except ValidationError as e:
+            raise QueryRejectedError(f"Invalid parameters for template '{self.name}': {e}") from e
+        # Graphiti stores timestamps as ISO strings
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in values.items()
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "params": {
+                key: getattr(spec[0] if isinstance(spec, tuple) else spec, "__name__", str(spec))
+                for key, spec in self.params.items()
+            },
+            "default_limit": self.limit,
+            "cache_ttl_seconds": self.cache_ttl,
+        }
+
+
+DEFAULT_TEMPLATES = [
+    QueryTemplate(
+        "entity_neighborhood",
+        """
+        MATCH (n:Entity {uuid: $uuid})
+        OPTIONAL MATCH (n)-[r:RELATES_TO]-(m:Entity)
+        RETURN n, r, m
+        LIMIT $limit
+        """,
+        {"uuid": str},
+        description="An entity and its directly related entities",
+        limit=50,
+        cache_ttl=300,
+    ),
+    QueryTemplate(
+        "entity_by_top_id",
+        """
+        MATCH (n:Entity {top_id: $top_id})
+        OPTIONAL MATCH (n)-[r:RELATES_TO]-(m:Entity)
+        RETURN n, r, m
+        LIMIT $limit
+        """,
+        {"top_id": str},
+        description="The entity with a TOP id and its directly related entities",
+        limit=50,
+        cache_ttl=300,
+    ),
+    QueryTemplate(
+        "entities_by_type",
+        """
+        MATCH (n:Entity)
+        WHERE $type IN labels(n)
+        RETURN n
+        ORDER BY n.name
+        LIMIT $limit
+        """,
+        {"type": str},
+        description="Entities with an ontology type label, e.g. Person or Department",
+        limit=100,
+        cache_ttl=300,
+    ),
+    QueryTemplate(
+        "current_facts",
+        """
+        MATCH (n:Entity {uuid: $uuid})-[r:RELATES_TO]-(m:Entity)
+        WHERE r.invalid_at IS NULL AND r.expired_at IS NULL
+        RETURN n, r, m
+        ORDER BY r.created_at DESC
+        LIMIT $limit
+        """,
+        {"uuid": str},
+        description="Facts about an entity that have not been invalidated",
+        limit=100,
+        cache_ttl=120,
+    ),
+    QueryTemplate(
+        "recent_facts",
+        """
+        MATCH (a:Entity)-[r:RELATES_TO]->(b:Entity)
+        WHERE r.created_at >= $since
+        RETURN a, r, b
+        ORDER BY r.created_at DESC
+        LIMIT $limit
+        """,
+        {"since": datetime},
+        description="Facts added to the graph since a timestamp",
+        limit=100,
+        cache_ttl=60,
+    ),
+    QueryTemplate(
+        "episode_mentions",
+        """
+        MATCH (e:Episodic {uuid: $uuid})-[r:MENTIONS]->(n:Entity)
+        RETURN e, r, n
+        LIMIT $limit
+        """,
+        {"uuid": str},
+        description="Entities mentioned by an episode",
+        limit=100,
+        cache_ttl=600,
+    ),
+]
+
+
+class TemplateCache:
+    """LRU cache of template responses with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], ttl: int):
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class QueryTemplateRegistry:
+    """Named templates executed read-only through the bounded query executor."""
+
+    def __init__(self, executor: SafeQueryExecutor, templates: Optional[List[QueryTemplate]] = None):
+        self.executor = executor
+        self.templates: Dict[str, QueryTemplate] = {}
+        self.cache = TemplateCache(settings.GRAPH_TEMPLATE_CACHE_SIZE)
+        for template in DEFAULT_TEMPLATES if templates is None else templates:
+            self.register(template)
+
+    def register(self, template: QueryTemplate):
+        self.templates[template.name] = template
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [template.describe() for template in self.templates.values()]
+
+    async def run(
+        self,
+        name: str,
+        params: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        include_raw_results: bool = True
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a template, serving repeated calls from the cache.
+
+        Args:
+            name: Template name
+            params: Template parameters
+            limit: Row limit, defaults to the template's and is capped at
+                GRAPH_QUERY_MAX_ROWS
+            include_raw_results: Include scalar result columns
+
+        Returns:
+            The nodes/edges/raw_results/truncated response and whether it
+            came from the cache
+
+        Raises:
+            KeyError: Unknown template
+            QueryRejectedError: Invalid parameters
+            QueryTimeoutError: Query exceeded its timeout
+        """
+        template = self.templates[name]
+        bound = template.bind(params or {})
+        row_limit = min(limit or template.limit, settings.GRAPH_QUERY_MAX_ROWS)
+
+        cache_key = json.dumps([name, bound, row_limit, include_raw_results], sort_keys=True, default=str)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        # One row past the limit tells whether the result was truncated
+        bound["limit"] = row_limit + 1
+        rows, truncated = await self.executor.execute_iter(
+            template.query,
+            bound,
+            read_only=True,
+            row_limit=row_limit,
+            check_cost=False
+        )
+        nodes, edges, raw_results = decode_all(rows, include_raw_results)
+        response = {
+            "nodes": nodes,
+            "edges": edges,
+            "raw_results": raw_results,
+            "truncated": truncated,
+        }
+        self.cache.put(cache_key, response, template.cache_ttl)
+        logger.info(f"Template '{name}' returned {len(nodes)} nodes and {len(edges)} edges")
+        return response, False
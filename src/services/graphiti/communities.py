@@ -0,0 +1,187 @@
+"""
+Incremental community maintenance.
+
+Instead of rebuilding every community after each sync, entities mentioned by
+newly ingested episodes are assigned to the community most of their
+neighbours belong to, and only communities whose membership changed past a
+threshold are re-summarized. A full `build_communities` rebuild runs only
+when none exists yet or the last one is older than
+SYNC_COMMUNITY_REBUILD_DAYS.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from graphiti_core.edges import CommunityEdge
+from graphiti_core.helpers import semaphore_gather
+from graphiti_core.nodes import CommunityNode, EntityNode
+from graphiti_core.utils.datetime_utils import utc_now
+from graphiti_core.utils.maintenance.community_operations import (
+    determine_entity_community,
+    generate_summary_description,
+    summarize_pair,
+)
+from graphiti_core.utils.maintenance.edge_operations import build_community_edges
+
+from src.config import settings
+from src.services.sync.state import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+COMMUNITY_STATE_FILE = "communities.json"
+
+
+class IncrementalCommunityUpdater:
+    """Keeps communities current in proportion to the size of each sync."""
+
+    def __init__(self, graphiti, state_dir=None):
+        self.graphiti = graphiti
+        self.driver = graphiti.driver
+        self.state = JsonStateFile(COMMUNITY_STATE_FILE, state_dir)
+        # Community uuid -> entity uuids added or changed since its last summary
+        self.pending: Dict[str, List[str]] = self.state.data.setdefault("pending", {})
+
+    def full_rebuild_due(self) -> bool:
+        last_rebuild = self.state.data.get("last_full_rebuild")
+        if not last_rebuild:
+            return True
+        age = datetime.now() - datetime.fromisoformat(last_rebuild)
+        return age >= timedelta(days=settings.SYNC_COMMUNITY_REBUILD_DAYS)
+
+    async def rebuild(self):
+        """Rebuild all communities from scratch."""
+        logger.info("Rebuilding all communities...")
+        await self.graphiti.build_communities()
+        self.pending.clear()
+        self.state.data["last_full_rebuild"] = datetime.now().isoformat()
+        self.state.save()
+        logger.info("Community rebuild completed")
+
+    async def update(self, since: datetime):
+        """
+        Update communities for entities mentioned by episodes created since a time.
+
+        Args:
+            since: Start of the sync whose changes should be applied
+        """
+        if self.full_rebuild_due() or not await self._has_communities():
+            await self.rebuild()
+            return
+
+        entity_uuids = await self._touched_entities(since)
+        if not entity_uuids:
+            logger.info("No entities changed - communities are up to date")
+            return
+
+        entities = await EntityNode.get_by_uuids(self.driver, entity_uuids)
+        assignments = await semaphore_gather(
+            *[determine_entity_community(self.driver, entity) for entity in entities],
+            max_coroutines=self.graphiti.max_coroutines,
+        )
+
+        new_edges: List[CommunityEdge] = []
+        unassigned = 0
+        for entity, (community, is_new) in zip(entities, assignments):
+            if community is None:
+                unassigned += 1
+                continue
+            if is_new:
+                new_edges.extend(build_community_edges([entity], community, utc_now()))
+            members = self.pending.setdefault(community.uuid, [])
+            if entity.uuid not in members:
+                members.append(entity.uuid)
+
+        await semaphore_gather(
+            *[edge.save(self.driver) for edge in new_edges],
+            max_coroutines=self.graphiti.max_coroutines,
+        )
+        logger.info(
+            f"Community update: {len(entities)} changed entities, {len(new_edges)} new memberships, "
+            f"{unassigned} without a neighbouring community"
+        )
+
+        stale = await self._stale_communities()
+        if stale:
+            communities = await CommunityNode.get_by_uuids(self.driver, stale)
+            await semaphore_gather(
+                *[self._resummarize(community) for community in communities],
+                max_coroutines=self.graphiti.max_coroutines,
+            )
+            logger.info(f"Re-summarized {len(communities)} communities")
+
+        self.state.save()
+
+    async def _has_communities(self) -> bool:
+        records, _, _ = await self.driver.execute_query(
+            "MATCH (c:Community) RETURN c.uuid AS uuid LIMIT 1"
+        )
+        return bool(records)
+
+    async def _touched_entities(self, since: datetime) -> List[str]:
+        records, _, _ = await self.driver.execute_query(
+            """
+            MATCH (e:Episodic)-[:MENTIONS]->(n:Entity)
+            WHERE e.created_at >= $since
+            RETURN DISTINCT n.uuid AS uuid
+            """,
+            since=since,
+        )
+        return [record["uuid"] for record in records]
+
+    async def _stale_communities(self) -> List[str]:
+        """Communities whose pending changes reached the re-summary threshold."""
+        if not self.pending:
+            return []
+        records, _, _ = await self.driver.execute_query(
+            """
+            UNWIND $uuids AS uuid
+            MATCH (c:Community {uuid: uuid})-[:HAS_MEMBER]->(m:Entity)
+            RETURN uuid, count(m) AS members
+            """,
+            uuids=list(self.pending),
+        )
+        member_counts = {record["uuid"]: record["members"] for record in records}
+
+        # Communities removed by an external rebuild no longer need updates
+        for uuid in set(self.pending) - set(member_counts):
+            del self.pending[uuid]
+
+        threshold = settings.SYNC_COMMUNITY_RESUMMARY_THRESHOLD
+        return [
+            uuid for uuid, changed in self.pending.items()
+            if len(changed) / max(member_counts[uuid], 1) >= threshold
+        ]
+
+    async def _resummarize(self, community: CommunityNode):
+        """Fold the changed members' summaries into the community summary."""
+        changed = await EntityNode.get_by_uuids(self.driver, self.pending.get(community.uuid, []))
+        summary = community.summary
+        ensure_ascii = self.graphiti.ensure_ascii
+        llm_client = self.graphiti.llm_client
+
+        for entity in changed:
+            if entity.summary:
+                summary = await summarize_pair(llm_client, (summary, entity.summary), ensure_ascii)
+
+        community.summary = summary
+        community.name = await generate_summary_description(llm_client, summary, ensure_ascii)
+        await community.generate_name_embedding(self.graphiti.embedder)
+        await community.save(self.driver)
+        self.pending.pop(community.uuid, None)
+
+
+async def update_communities(graphiti, since: Optional[datetime] = None):
+    """
+    Bring communities up to date after a sync.
+
+    Args:
+        graphiti: Graphiti instance
+        since: Start of the sync; a full rebuild is done when omitted
+    """
+    updater = IncrementalCommunityUpdater(graphiti)
+    if since is None:
+        await updater.rebuild()
+    else:
+        await updater.update(since)
@@ -1,24 +1,51 @@
 import logging
+from typing import Optional
+
 from graphiti_core import Graphiti
-from src.db.falkor import falkor_driver
+from graphiti_core.cross_encoder.openai_reranker_client import OpenAIRerankerClient
+from graphiti_core.embedder.openai import OpenAIEmbedder
+from graphiti_core.llm_client.openai_client import OpenAIClient
 from src.models.ontology import add_episode as add_ontology_episode
 from src.services.sync.fort_worth_data import initialize_live_research
 from src.services.graphiti.initial_sync import load_initial_data
+from src.services.graphiti.ingest import resume_ingestion
 from src.services.graphiti.search_config import top_search
+from src.services.llm.rate_limit import async_openai_client
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Validate API key configuration
-if not settings.OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY must be set for Graphiti")
+_graphiti: Optional[Graphiti] = None
+
+
+def get_graphiti() -> Graphiti:
+    """The process-wide Graphiti instance, built on first use."""
+    global _graphiti
+    if _graphiti is None:
+        # Validate API key configuration
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY must be set for Graphiti")
+        
+        from src.db.falkor import falkor_driver
+        
+        # Initialize Graphiti with the default OpenAI clients, sharing one rate-limited connection
+        openai_client = async_openai_client()
+        _graphiti = Graphiti(
+            graph_driver=falkor_driver,
+            llm_client=OpenAIClient(client=openai_client),
+            embedder=OpenAIEmbedder(client=openai_client),
+            cross_encoder=OpenAIRerankerClient(client=openai_client),
+        )
+        logger.info(f"Graphiti initialized with OpenAI model: {settings.OPENAI_MODEL}")
+    return _graphiti
+
 
-# Initialize Graphiti with OpenAI clients (default)
-graphiti = Graphiti(
-    graph_driver=falkor_driver,
-)
+def __getattr__(name: str):
+    # `from src.services.graphiti.index import graphiti` builds it on demand
+    if name == "graphiti":
+        return get_graphiti()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-logger.info(f"Graphiti initialized with OpenAI model: {settings.OPENAI_MODEL}")
 
 async def init(load_initial_data_flag: bool = False, sync_mode: str = "initial"):
     """
@@ -28,6 +55,7 @@ async def init(load_initial_data_flag: bool = False, sync_mode: str = "initial")
         load_initial_data_flag: Whether to load initial Fort Worth data
         sync_mode: Type of sync - 'initial' for structured data or 'live' for AI research
     """
+    graphiti = get_graphiti()
     try:
         # Skip building indices for FalkorDB to avoid SHOW INDEXES error
         # FalkorDB will create indices automatically as needed
@@ -37,6 +65,11 @@ async def init(load_initial_data_flag: bool = False, sync_mode: str = "initial")
         await add_ontology_episode(graphiti, episode_type="general")
         logger.info("Ontology episode added")
         
+        # Finish ingesting episodes left over from an interrupted sync
+        resumed = await resume_ingestion(graphiti)
+        if resumed:
+            logger.info(f"Resumed ingestion of {len(resumed)} checkpointed episodes")
+        
         # Load initial data if requested
         if load_initial_data_flag:
             if sync_mode == "initial":
@@ -80,6 +113,7 @@ async def query_knowledge_graph(
         limit = settings.SEARCH_RESULT_LIMIT
     
     try:
+        graphiti = get_graphiti()
         if use_custom_filter:
             results = await top_search(
                 graphiti,
@@ -190,6 +224,7 @@ async def multi_turn_search(
 # Export search helpers
 __all__ = [
     'graphiti',
+    'get_graphiti',
     'init',
     'query_knowledge_graph',
     'contextual_search',
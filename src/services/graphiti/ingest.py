@@ -0,0 +1,355 @@
+"""
+Idempotent, resumable episode ingestion.
+
+Every sync path sends its episodes through `ingest_episodes`, which hashes the
+normalized content of each episode and drops episodes whose hash is already
+recorded in the EpisodeHash index, so identical facts are never re-extracted
+and re-resolved by Graphiti.
+
+New episodes are checkpointed to disk before ingestion and sent to
+`add_episode_bulk` in chunks with retries; episodes holding structured TOP
+data are written directly by the structured writer instead. Chunks that still fail, or that
+were in flight when the process stopped, are picked up again by the next
+ingestion instead of being researched again, for up to SYNC_INGEST_MAX_ATTEMPTS
+ingestions.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid5
+
+from graphiti_core.nodes import EpisodeType
+from graphiti_core.utils.bulk_utils import RawEpisode
+
+from src.config import settings
+from src.db.indexes import ensure_index
+from src.models.top.structured import TOPEpisodeData
+from src.services.graphiti.structured_writer import StructuredGraphWriter, parse_structured_episode
+from src.services.sync.state import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+EPISODE_HASH_LABEL = "EpisodeHash"
+
+CHECKPOINT_FILE = "ingest_checkpoint.json"
+
+STATUS_PENDING = "pending"
+STATUS_FAILED = "failed"
+STATUS_INGESTED = "ingested"
+STATUS_DEAD_LETTER = "dead_letter"
+
+# Namespace of the Episodic uuids derived from episode hashes
+EPISODE_UUID_NAMESPACE = UUID("15991fdd-badf-41c6-8d11-1bc4da09150e")
+
+# Keys whose values change on every run without changing the facts
+VOLATILE_KEYS = {"timestamp", "retrieved_at", "extracted_at", "fetched_at"}
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def normalize_episode_content(episode: RawEpisode) -> str:
+    """
+    Normalize episode content so equivalent episodes hash identically.
+
+    JSON content is re-serialized with sorted keys and without volatile
+    fields; text content has its whitespace collapsed. Episode names and
+    reference times are ignored because they carry run timestamps.
+    """
+    content = episode.content
+    if episode.source == EpisodeType.json:
+        try:
+            data = _strip_volatile(json.loads(content))
+            return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        except (TypeError, ValueError):
+            pass
+    return " ".join(content.split())
+
+
+def episode_hash(episode: RawEpisode) -> str:
+    """Stable hash of an episode's source type and normalized content."""
+    normalized = f"{episode.source.value}\n{normalize_episode_content(episode)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def episode_uuid(content_hash: str) -> str:
+    """Stable Episodic uuid for an episode hash, so rewriting an episode updates its node."""
+    return str(uuid5(EPISODE_UUID_NAMESPACE, content_hash))
+
+
+class EpisodeHashIndex:
+    """EpisodeHash nodes recording which episode contents were ingested."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def existing(self, hashes: Iterable[str]) -> Set[str]:
+        """Return the subset of hashes that were already ingested."""
+        hashes = list(hashes)
+        if not hashes:
+            return set()
+        await ensure_index(self.driver, EPISODE_HASH_LABEL, "hash")
+        records, _, _ = await self.driver.execute_query(
+            f"""
+            UNWIND $hashes AS hash
+            MATCH (h:{EPISODE_HASH_LABEL} {{hash: hash}})
+            RETURN h.hash AS hash
+            """,
+            hashes=hashes
+        )
+        return {record["hash"] for record in records}
+
+    async def record(self, rows: List[Dict[str, str]]):
+        """Record ingested episode hashes ({hash, name} rows)."""
+        if not rows:
+            return
+        await ensure_index(self.driver, EPISODE_HASH_LABEL, "hash")
+        await self.driver.execute_query(
+            f"""
+            UNWIND $rows AS row
+            MERGE (h:{EPISODE_HASH_LABEL} {{hash: row.hash}})
+            SET h.name = row.name, h.ingested_at = $ingested_at
+            """,
+            rows=rows,
+            ingested_at=datetime.now().isoformat()
+        )
+
+
+_indexes: Dict[int, EpisodeHashIndex] = {}
+
+
+def get_episode_hash_index(graphiti) -> EpisodeHashIndex:
+    """Shared EpisodeHash index for a Graphiti instance's driver."""
+    driver = graphiti.driver
+    if id(driver) not in _indexes:
+        _indexes[id(driver)] = EpisodeHashIndex(driver)
+    return _indexes[id(driver)]
+
+
+class IngestCheckpoint:
+    """
+    On-disk record of episode hash -> ingestion status.
+
+    Each ingestion run that takes up an episode counts as an attempt. An
+    episode that fails SYNC_INGEST_MAX_ATTEMPTS times is parked as a dead
+    letter, keeping its content for inspection, and is no longer resumed.
+    Ingested entries are pruned after SYNC_INGEST_CHECKPOINT_RETENTION_DAYS;
+    the graph's EpisodeHash index still deduplicates them after that.
+    """
+
+    def __init__(self, state_dir=None):
+        self.state = JsonStateFile(CHECKPOINT_FILE, state_dir)
+        self.entries: Dict[str, Dict[str, Any]] = self.state.data.setdefault("episodes", {})
+
+    def ingested(self) -> Set[str]:
+        return {h for h, entry in self.entries.items() if entry["status"] == STATUS_INGESTED}
+
+    def dead_letters(self) -> Dict[str, RawEpisode]:
+        """Episodes given up on after too many failed attempts."""
+        return {
+            h: RawEpisode.model_validate(entry["episode"])
+            for h, entry in self.entries.items()
+            if entry["status"] == STATUS_DEAD_LETTER
+        }
+
+    def unfinished(self) -> Dict[str, RawEpisode]:
+        """Episodes that were checkpointed but neither ingested nor given up on."""
+        return {
+            h: RawEpisode.model_validate(entry["episode"])
+            for h, entry in self.entries.items()
+            if entry["status"] not in (STATUS_INGESTED, STATUS_DEAD_LETTER)
+        }
+
+    def mark(self, episodes: Dict[str, RawEpisode], status: str):
+        updated_at = datetime.now().isoformat()
+        for h, episode in episodes.items():
+            attempts = self.entries.get(h, {}).get("attempts", 0)
+            if status == STATUS_PENDING:
+                attempts += 1
+            entry_status = status
+            if status == STATUS_FAILED and attempts >= settings.SYNC_INGEST_MAX_ATTEMPTS:
+                logger.error(f"Giving up on episode {episode.name} after {attempts} attempts")
+                entry_status = STATUS_DEAD_LETTER
+            entry = {"status": entry_status, "updated_at": updated_at, "attempts": attempts}
+            # Ingested episodes only need their status, not their content
+            if status != STATUS_INGESTED:
+                entry["episode"] = episode.model_dump(mode="json")
+            self.entries[h] = entry
+        self.state.save()
+
+    def prune(self, now: Optional[datetime] = None):
+        """Drop ingested entries older than the retention period."""
+        cutoff = (now or datetime.now()) - timedelta(days=settings.SYNC_INGEST_CHECKPOINT_RETENTION_DAYS)
+        expired = [
+            h for h, entry in self.entries.items()
+            if entry["status"] == STATUS_INGESTED and datetime.fromisoformat(entry["updated_at"]) < cutoff
+        ]
+        for h in expired:
+            del self.entries[h]
+        if expired:
+            logger.info(f"Pruned {len(expired)} ingested entries from the ingest checkpoint")
+            self.state.save()
+
+
+# Serializes ingestion so concurrent syncs don't race on the checkpoint file
+_ingest_lock = asyncio.Lock()
+
+# Callbacks run after episodes were added to the graph (e.g. search index invalidation)
+_ingest_listeners: List[Callable[[List[RawEpisode]], None]] = []
+
+
+def add_ingest_listener(listener: Callable[[List[RawEpisode]], None]):
+    """Register a callback invoked with the episodes of every successful ingestion."""
+    _ingest_listeners.append(listener)
+
+
+def _chunks(episodes: Dict[str, RawEpisode], size: int) -> Iterable[Dict[str, RawEpisode]]:
+    items = list(episodes.items())
+    for start in range(0, len(items), size):
+        yield dict(items[start:start + size])
+
+
+async def _with_retry(operation: Callable[[], Awaitable[Any]], description: str):
+    """Run an operation, retrying with exponential backoff."""
+    attempts = settings.SYNC_INGEST_MAX_RETRIES + 1
+    for attempt in range(1, attempts + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            delay = settings.SYNC_INGEST_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            logger.warning(f"{description} failed (attempt {attempt}/{attempts}): {e} - retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+async def _add_with_retry(graphiti, episodes: Dict[str, RawEpisode], **kwargs):
+    """
+    Add a chunk of episodes (hash -> episode), retrying with exponential backoff.
+
+    Structured TOP episodes are written directly when SYNC_STRUCTURED_WRITES
+    is enabled; the rest go through add_episode_bulk and LLM extraction.
+    """
+    structured: Dict[str, Tuple[RawEpisode, TOPEpisodeData]] = {}
+    extracted: List[RawEpisode] = []
+    for h, episode in episodes.items():
+        data = parse_structured_episode(episode) if settings.SYNC_STRUCTURED_WRITES else None
+        if data is None:
+            extracted.append(episode)
+        else:
+            structured[h] = (episode, data)
+
+    if structured:
+        writer = StructuredGraphWriter(graphiti)
+        # One episode per retry, each with its hash-derived uuid, so a retry
+        # rewrites the failed episode instead of duplicating the ones before it
+        for h, (episode, data) in structured.items():
+            await _with_retry(
+                lambda: writer.write_episode(episode, data, kwargs.get("group_id"), episode_uuid(h)),
+                f"Writing structured episode {episode.name}"
+            )
+    if extracted:
+        await _with_retry(
+            lambda: graphiti.add_episode_bulk(extracted, **kwargs),
+            f"Ingesting {len(extracted)} episodes"
+        )
+
+
+async def ingest_episodes(graphiti, episodes: List[RawEpisode], **kwargs) -> List[RawEpisode]:
+    """
+    Add episodes to Graphiti, skipping ones whose content was already ingested.
+
+    Unfinished episodes from earlier runs are resumed along with the new
+    ones. Chunks that fail after all retries stay in the checkpoint for the
+    next run rather than failing the whole batch, until they have failed
+    SYNC_INGEST_MAX_ATTEMPTS runs.
+
+    Args:
+        graphiti: Graphiti instance
+        episodes: Episodes to ingest
+        **kwargs: Passed through to add_episode_bulk
+
+    Returns:
+        The episodes that were successfully sent to add_episode_bulk
+    """
+    async with _ingest_lock:
+        checkpoint = IngestCheckpoint()
+        checkpoint.prune()
+
+        batch = checkpoint.unfinished()
+        if batch:
+            logger.info(f"Resuming {len(batch)} unfinished episodes from the ingest checkpoint")
+
+        # Drop duplicates within the batch, keeping the first occurrence
+        for episode in episodes:
+            batch.setdefault(episode_hash(episode), episode)
+
+        if not batch:
+            return []
+
+        index = None
+        if settings.SYNC_DEDUPLICATE_EPISODES:
+            known = checkpoint.ingested()
+            try:
+                index = get_episode_hash_index(graphiti)
+                known |= await index.existing(batch.keys())
+            except Exception as e:
+                # Deduplication is an optimization - never block ingestion on it
+                logger.warning(f"EpisodeHash lookup failed, deduplicating against the local checkpoint only: {e}")
+                index = None
+
+            skipped = {h: episode for h, episode in batch.items() if h in known}
+            if skipped:
+                logger.info(f"Skipping {len(skipped)} duplicate episodes already in the graph")
+                checkpoint.mark(skipped, STATUS_INGESTED)
+            batch = {h: episode for h, episode in batch.items() if h not in known}
+
+        if not batch:
+            return []
+
+        # Persist the episodes before spending any LLM calls on them
+        checkpoint.mark(batch, STATUS_PENDING)
+
+        ingested: List[RawEpisode] = []
+        failed = 0
+        for chunk in _chunks(batch, settings.SYNC_INGEST_CHUNK_SIZE):
+            try:
+                await _add_with_retry(graphiti, chunk, **kwargs)
+            except Exception as e:
+                logger.error(f"Failed to ingest {len(chunk)} episodes, keeping them for the next run: {e}")
+                checkpoint.mark(chunk, STATUS_FAILED)
+                failed += len(chunk)
+                continue
+
+            if index:
+                try:
+                    await index.record([{"hash": h, "name": e.name} for h, e in chunk.items()])
+                except Exception as e:
+                    logger.warning(f"Failed to record EpisodeHash entries: {e}")
+            checkpoint.mark(chunk, STATUS_INGESTED)
+            ingested.extend(chunk.values())
+            logger.info(f"Ingested {len(ingested)}/{len(batch)} episodes")
+
+        if failed:
+            logger.warning(f"{failed} episodes failed to ingest and will be retried on the next sync")
+
+        if ingested:
+            for listener in _ingest_listeners:
+                listener(ingested)
+
+        return ingested
+
+
+async def resume_ingestion(graphiti) -> List[RawEpisode]:
+    """Ingest episodes left unfinished by an earlier run."""
+    return await ingest_episodes(graphiti, [])
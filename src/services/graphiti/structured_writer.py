@@ -0,0 +1,272 @@
+"""
+Direct graph writes for structured TOP episodes.
+
+Episodes whose content is already a validated TOPEpisodeData don't need
+Graphiti's LLM extraction to find their entities - the top_ids, types and
+relationships are given. This writer upserts them in Graphiti's own node and
+edge format with batched UNWIND ... MERGE keyed on top_id, embeds names and
+facts with one batch call each, and links the entities to an Episodic node
+through MENTIONS, so search, the episode timeline and community updates see
+them exactly like extracted data.
+"""
+
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from graphiti_core.helpers import get_default_group_id
+from graphiti_core.nodes import EpisodeType, EpisodicNode
+from graphiti_core.utils.bulk_utils import RawEpisode
+from graphiti_core.utils.datetime_utils import utc_now
+from pydantic import ValidationError
+
+from src.db.indexes import ensure_index
+from src.models.top.structured import StructuredEntity, StructuredRelationship, TOPEpisodeData
+
+logger = logging.getLogger(__name__)
+
+
+WORD_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+# StructuredEntity fields stored on the node alongside its properties
+ENTITY_METADATA = ("source", "confidence", "valid_from", "valid_until")
+
+
+def parse_structured_episode(episode: RawEpisode) -> Optional[TOPEpisodeData]:
+    """Return the TOPEpisodeData in a JSON episode, or None for other content."""
+    if episode.source != EpisodeType.json:
+        return None
+    try:
+        data = json.loads(episode.content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or not data.get("entities"):
+        return None
+    try:
+        return TOPEpisodeData.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def _graph_value(value: Any) -> Any:
+    """FalkorDB properties hold scalars and lists of scalars; encode the rest as JSON."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, list) and all(isinstance(v, (str, int, float, bool)) for v in value):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def relationship_phrase(relationship_type: str) -> str:
+    """'HasJurisdictionOver' -> 'has jurisdiction over'."""
+    return WORD_BOUNDARY.sub(" ", relationship_type).lower()
+
+
+class StructuredGraphWriter:
+    """Upserts TOPEpisodeData entities and relationships without LLM extraction."""
+
+    def __init__(self, graphiti):
+        self.graphiti = graphiti
+        self.driver = graphiti.driver
+        self.embedder = graphiti.embedder
+
+    async def write_episode(
+        self,
+        episode: RawEpisode,
+        data: TOPEpisodeData,
+        group_id: Optional[str] = None,
+        episode_uuid: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Write one structured episode to the graph.
+
+        Writing an episode again with the same episode_uuid updates its
+        Episodic node, mentions and edge episode lists instead of adding new ones.
+
+        Args:
+            episode: The episode the data came from
+            data: Its parsed TOPEpisodeData
+            group_id: Graph partition, defaults to Graphiti's default group
+            episode_uuid: Uuid of the Episodic node, a new one when omitted
+
+        Returns:
+            Counts of the entities and relationships written
+        """
+        await ensure_index(self.driver, "Entity", "top_id")
+        group_id = group_id or get_default_group_id(self.driver.provider)
+        now = utc_now()
+
+        entities = list({entity.top_id: entity for entity in data.entities}.values())
+        entity_uuids = await self._merge_entities(entities, group_id, now)
+
+        names = {entity.top_id: entity.properties["entity_name"] for entity in entities}
+        relationships = [
+            rel for rel in data.relationships
+            if rel.source_entity in entity_uuids and rel.target_entity in entity_uuids
+        ]
+        if len(relationships) < len(data.relationships):
+            logger.warning(
+                f"{episode.name}: skipped {len(data.relationships) - len(relationships)} "
+                f"relationships to entities outside the episode"
+            )
+
+        episode_uuid = episode_uuid or str(uuid4())
+        edge_uuids = await self._merge_relationships(relationships, names, episode_uuid, group_id, now)
+
+        episodic = EpisodicNode(
+            uuid=episode_uuid,
+            name=episode.name,
+            group_id=group_id,
+            labels=[],
+            source=episode.source,
+            content=episode.content,
+            source_description=episode.source_description,
+            created_at=now,
+            valid_at=episode.reference_time,
+            entity_edges=edge_uuids,
+        )
+        # Merged on the uuid, so a rewrite replaces the node
+        await episodic.save(self.driver)
+        await self._link_mentions(episode_uuid, list(entity_uuids.values()), group_id, now)
+
+        logger.info(f"Wrote {episode.name} directly: {len(entities)} entities, {len(edge_uuids)} relationships")
+        return {"entities": len(entities), "relationships": len(edge_uuids)}
+
+    async def _merge_entities(
+        self,
+        entities: List[StructuredEntity],
+        group_id: str,
+        now: datetime
+    ) -> Dict[str, str]:
+        """Upsert entities by top_id, returning top_id -> uuid."""
+        if not entities:
+            return {}
+        names = [entity.properties["entity_name"] for entity in entities]
+        embeddings = await self.embedder.create_batch([name.replace("\n", " ") for name in names])
+
+        # Node labels can't be parameters, so write one UNWIND per entity type
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for entity, name, embedding in zip(entities, names, embeddings):
+            attributes = {key: _graph_value(value) for key, value in entity.properties.items()}
+            for key in ENTITY_METADATA:
+                value = getattr(entity, key)
+                if value is not None:
+                    attributes[key] = _graph_value(getattr(value, "value", value))
+            attributes.pop("uuid", None)
+            by_type.setdefault(entity.entity_type.value, []).append({
+                "top_id": entity.top_id,
+                "uuid": str(uuid4()),
+                "name": name,
+                "summary": str(entity.properties.get("description", "")),
+                "name_embedding": embedding,
+                "attributes": attributes,
+            })
+
+        uuids: Dict[str, str] = {}
+        for label, rows in by_type.items():
+            records, _, _ = await self.driver.execute_query(
+                f"""
+                UNWIND $rows AS row
+                MERGE (n:Entity {{top_id: row.top_id}})
+                ON CREATE SET n.uuid = row.uuid, n.created_at = $now, n.summary = row.summary
+                SET n:`{label}`
+                SET n += row.attributes
+                SET n.name = row.name,
+                    n.group_id = $group_id,
+                    n.name_embedding = vecf32(row.name_embedding)
+                RETURN row.top_id AS top_id, n.uuid AS uuid
+                """,
+                rows=rows,
+                now=now,
+                group_id=group_id
+            )
+            uuids.update({record["top_id"]: record["uuid"] for record in records})
+        return uuids
+
+    async def _merge_relationships(
+        self,
+        relationships: List[StructuredRelationship],
+        names: Dict[str, str],
+        episode_uuid: str,
+        group_id: str,
+        now: datetime
+    ) -> List[str]:
+        """Upsert RELATES_TO edges keyed on (source, target, type), returning their uuids."""
+        if not relationships:
+            return []
+        facts = [
+            f"{names[rel.source_entity]} {relationship_phrase(rel.relationship_type.value)} {names[rel.target_entity]}"
+            for rel in relationships
+        ]
+        embeddings = await self.embedder.create_batch(facts)
+
+        rows = []
+        for rel, fact, embedding in zip(relationships, facts, embeddings):
+            attributes = {key: _graph_value(value) for key, value in rel.properties.items()}
+            attributes.update({"source": rel.source, "confidence": rel.confidence.value})
+            rows.append({
+                "source": rel.source_entity,
+                "target": rel.target_entity,
+                "name": rel.relationship_type.value,
+                "uuid": str(uuid4()),
+                "fact": fact,
+                "fact_embedding": embedding,
+                "valid_at": _parse_date(rel.valid_from),
+                "invalid_at": _parse_date(rel.valid_until),
+                "attributes": attributes,
+            })
+
+        records, _, _ = await self.driver.execute_query(
+            """
+            UNWIND $rows AS row
+            MATCH (a:Entity {top_id: row.source})
+            MATCH (b:Entity {top_id: row.target})
+            MERGE (a)-[e:RELATES_TO {name: row.name}]->(b)
+            ON CREATE SET e.uuid = row.uuid, e.created_at = $now, e.episodes = []
+            SET e += row.attributes
+            SET e.fact = row.fact,
+                e.fact_embedding = vecf32(row.fact_embedding),
+                e.group_id = $group_id,
+                e.source_node_uuid = a.uuid,
+                e.target_node_uuid = b.uuid,
+                e.valid_at = row.valid_at,
+                e.invalid_at = row.invalid_at,
+                e.episodes = CASE WHEN $episode_uuid IN e.episodes THEN e.episodes ELSE e.episodes + [$episode_uuid] END
+            RETURN e.uuid AS uuid
+            """,
+            rows=rows,
+            now=now,
+            group_id=group_id,
+            episode_uuid=episode_uuid
+        )
+        return [record["uuid"] for record in records]
+
+    async def _link_mentions(self, episode_uuid: str, entity_uuids: List[str], group_id: str, now: datetime):
+        if not entity_uuids:
+            return
+        await self.driver.execute_query(
+            """
+            MATCH (episode:Episodic {uuid: $episode_uuid})
+            UNWIND $rows AS row
+            MATCH (n:Entity {uuid: row.entity_uuid})
+            MERGE (episode)-[m:MENTIONS]->(n)
+            ON CREATE SET m.uuid = row.uuid, m.group_id = $group_id, m.created_at = $now
+            """,
+            episode_uuid=episode_uuid,
+            rows=[{"entity_uuid": uuid, "uuid": str(uuid4())} for uuid in entity_uuids],
+            group_id=group_id,
+            now=now
+        )
+
@@ -0,0 +1,298 @@
+"""
+Job queue for sync and research runs.
+
+Endpoints submit a job and return its id straight away; a small pool of
+worker tasks runs the jobs in submission order. Work reports progress by
+entering named stages with job_stage(), which finds the running job through a
+context variable, so services such as the data loader report stages without
+knowing whether a job is running them. Job state is mirrored to Redis so
+whichever API worker serves a poll can answer it, and a cancel request for a
+job running in another worker is picked up at its next stage.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from src.config import settings
+from src.services.llm.rate_limit import set_background_priority
+
+logger = logging.getLogger(__name__)
+
+
+STAGE_RESEARCH = "research"
+STAGE_EXTRACT = "extract"
+STAGE_INGEST = "ingest"
+STAGE_COMMUNITIES = "communities"
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATUSES = {JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED}
+
+KEY_PREFIX = "fwtx:job:"
+
+JobFunction = Callable[[], Awaitable[Any]]
+
+_current_job: ContextVar[Optional["Job"]] = ContextVar("current_job", default=None)
+
+
+def _elapsed(start: datetime, end: datetime) -> float:
+    return round((end - start).total_seconds(), 3)
+
+
+class Job:
+    """One queued unit of work with its stage progress and outcome."""
+
+    def __init__(self, kind: str, function: JobFunction, params: Optional[Dict[str, Any]] = None):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = JOB_PENDING
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.function = function
+        self.queue: Optional["JobQueue"] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start_stage(self, name: str):
+        self.stages[name] = {"status": JOB_RUNNING, "started_at": datetime.now(), "finished_at": None}
+
+    def finish_stage(self, name: str, status: str):
+        stage = self.stages[name]
+        stage["status"] = status
+        stage["finished_at"] = datetime.now()
+
+    def finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = datetime.now()
+        # A cancelled or failed job leaves its current stage unfinished
+        for name, stage in self.stages.items():
+            if stage["finished_at"] is None:
+                self.finish_stage(name, status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = datetime.now()
+        stages = {}
+        for name, stage in self.stages.items():
+            stages[name] = {
+                "status": stage["status"],
+                "started_at": stage["started_at"].isoformat(),
+                "finished_at": stage["finished_at"].isoformat() if stage["finished_at"] else None,
+                "duration_seconds": _elapsed(stage["started_at"], stage["finished_at"] or now),
+            }
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": _elapsed(self.started_at, self.finished_at or now) if self.started_at else None,
+            "current_stage": next((n for n, s in self.stages.items() if s["finished_at"] is None), None),
+            "stages": stages,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+@asynccontextmanager
+async def job_stage(name: str):
+    """Record a stage of the running job; does nothing outside a job."""
+    job = _current_job.get()
+    if job is None:
+        yield
+        return
+
+    if await job.queue.cancel_requested(job.id):
+        raise asyncio.CancelledError()
+    job.start_stage(name)
+    await job.queue.publish(job)
+    try:
+        yield
+    except asyncio.CancelledError:
+        job.finish_stage(name, JOB_CANCELLED)
+        raise
+    except Exception:
+        job.finish_stage(name, JOB_FAILED)
+        raise
+    job.finish_stage(name, JOB_SUCCEEDED)
+    await job.queue.publish(job)
+
+
+class JobQueue:
+    """Runs submitted jobs on a pool of worker tasks."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        redis=None,
+        history_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        self.worker_count = workers or settings.JOB_WORKERS
+        self.redis = redis
+        self.history_size = history_size or settings.JOB_HISTORY_SIZE
+        self.ttl_seconds = ttl_seconds or settings.JOB_TTL_SECONDS
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, kind: str, function: JobFunction, params: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue a coroutine function as a job and return it without waiting."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+        job = Job(kind, function, params)
+        job.queue = self
+        self.jobs[job.id] = job
+        self._trim_history()
+        await self.publish(job)
+        self._queue.put_nowait(job)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(self.jobs) - self.history_size)]:
+            del self.jobs[job_id]
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's state, from this worker or from the Redis mirror."""
+        if job_id in self.jobs:
+            return self.jobs[job_id].to_dict()
+        if self.redis is None:
+            return None
+        try:
+            stored = await self.redis.get(KEY_PREFIX + job_id)
+        except Exception as e:
+            logger.warning(f"Failed to read job {job_id} from Redis: {e}")
+            return None
+        return json.loads(stored) if stored else None
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job.
+
+        Pending jobs are dropped and running jobs in this worker are cancelled
+        at once; a job running in another worker is flagged and stops at its
+        next stage. Team runs in worker threads can't be interrupted, so a
+        cancelled job's research stops at the team's next streamed response
+        and the model call in flight still spends its tokens.
+
+        Returns:
+            The job's state, or None if it is unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            state = await self.get(job_id)
+            if state and state["status"] not in FINISHED_STATUSES:
+                await self.redis.set(KEY_PREFIX + job_id + ":cancel", "1", ex=self.ttl_seconds)
+                state["cancel_requested"] = True
+            return state
+
+        if job.status == JOB_PENDING:
+            job.finish(JOB_CANCELLED)
+            await self.publish(job)
+            logger.info(f"Cancelled queued job {job_id}")
+        elif job.status == JOB_RUNNING and job.task:
+            job.task.cancel()
+            try:
+                await job.task
+            except BaseException:
+                pass
+        return job.to_dict()
+
+    async def cancel_requested(self, job_id: str) -> bool:
+        if self.redis is None:
+            return False
+        try:
+            return bool(await self.redis.exists(KEY_PREFIX + job_id + ":cancel"))
+        except Exception as e:
+            logger.warning(f"Failed to check job {job_id} for cancellation: {e}")
+            return False
+
+    async def publish(self, job: Job):
+        """Mirror a job's state to Redis for the other API workers."""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(KEY_PREFIX + job.id, json.dumps(job.to_dict(), default=str), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to publish job {job.id}: {e}")
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.status != JOB_PENDING:
+                continue
+            # A separate task, so cancelling the job leaves the worker running
+            job.task = asyncio.create_task(self._run(job))
+            try:
+                await job.task
+            except BaseException:
+                pass
+
+    async def _run(self, job: Job):
+        _current_job.set(job)
+        # Jobs yield OpenAI capacity to interactive requests
+        set_background_priority()
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now()
+        await self.publish(job)
+        logger.info(f"Started {job.kind} job {job.id}")
+        try:
+            result = await job.function()
+            job.finish(JOB_SUCCEEDED, result=result)
+            logger.info(f"{job.kind} job {job.id} succeeded")
+        except asyncio.CancelledError:
+            job.finish(JOB_CANCELLED)
+            logger.info(f"{job.kind} job {job.id} cancelled")
+        except Exception as e:
+            job.finish(JOB_FAILED, error=str(e))
+            logger.error(f"{job.kind} job {job.id} failed: {e}")
+        await self.publish(job)
+
+    async def stop(self):
+        """Cancel running jobs and stop the workers."""
+        for job in self.jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """The process-wide job queue, mirrored to the FalkorDB Redis instance."""
+    global _job_queue
+    if _job_queue is None:
+        from src.db.falkor import falkor_driver
+        _job_queue = JobQueue(redis=falkor_driver.client.connection)
+    return _job_queue
+
+
+async def stop_job_queue():
+    if _job_queue is not None:
+        await _job_queue.stop()
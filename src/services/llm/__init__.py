@@ -0,0 +1 @@
+"""Shared access to the OpenAI API for Graphiti and the research agents."""
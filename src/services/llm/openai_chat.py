@@ -0,0 +1,19 @@
+"""Agno's OpenAI model, sending its requests through the shared rate limiter."""
+
+from agno.models.openai import OpenAIChat
+from openai import AsyncOpenAI
+
+from src.services.llm.rate_limit import async_http_client, sync_http_client
+
+
+class RateLimitedOpenAIChat(OpenAIChat):
+    """OpenAIChat whose requests go through the shared OpenAI rate limiter."""
+    
+    def get_client(self):
+        if self.http_client is None:
+            self.http_client = sync_http_client()
+        return super().get_client()
+    
+    def get_async_client(self):
+        # The sync http_client can't serve the async client
+        return AsyncOpenAI(**self._get_client_params(), http_client=async_http_client())
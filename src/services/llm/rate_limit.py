@@ -0,0 +1,322 @@
+"""
+Process-wide rate limiting and retries for OpenAI calls.
+
+Graphiti's LLM client, its embedder and reranker, and the agno research
+agents all send their requests through httpx transports that share one
+RateLimiter. The limiter holds token buckets for requests and tokens per
+minute, charged the way OpenAI counts them (prompt size plus the requested
+completion allowance), and hands out capacity by priority: interactive
+calls such as query embeddings go ahead of background sync and research
+work. A 429 pauses every caller for the retry delay instead of letting each
+component retry on its own, and retries use jittered exponential backoff.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Completion allowance charged for chat requests that don't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+
+# Longest a waiter sleeps before checking the limiter again
+MAX_POLL_SECONDS = 0.25
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+def set_background_priority():
+    """Mark the rest of the current task's OpenAI calls as background work."""
+    _priority.set(PRIORITY_BACKGROUND)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+@contextmanager
+def background_priority():
+    """Run OpenAI calls inside the block as background work."""
+    token = _priority.set(PRIORITY_BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """Tokens OpenAI charges a request against the limit: prompt plus completion allowance."""
+    content = request.content
+    # Roughly four bytes of JSON per token
+    prompt_tokens = len(content) // 4
+    try:
+        body = json.loads(content) if content else {}
+    except ValueError:
+        return prompt_tokens
+    if not isinstance(body, dict) or "input" in body:
+        return prompt_tokens
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt_tokens + int(completion)
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """The server's requested retry delay in seconds, if it sent one."""
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                continue
+    return None
+
+
+class TokenBucket:
+    """A bucket refilled continuously up to a per-minute capacity."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return 0.0 if self.available >= amount else (amount - self.available) / self.rate
+
+
+class RateLimiter:
+    """Request and token buckets shared by every OpenAI client in the process."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute or settings.OPENAI_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(tokens_per_minute or settings.OPENAI_TOKENS_PER_MINUTE)
+        self.max_retries = settings.AGENT_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Callers hold threads and event loops alike, so state is guarded by a thread lock
+        self._lock = threading.Lock()
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._warned_loop_thread = False
+        self.throttled = 0
+
+    def _enqueue(self, priority: int) -> Tuple[int, int]:
+        ticket = (priority, next(self._sequence))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: Tuple[int, int]):
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+
+    def _try_acquire(self, ticket: Tuple[int, int], tokens: int) -> float:
+        """Take capacity if this ticket is next in line; otherwise how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self._waiting[0] != ticket:
+                return MAX_POLL_SECONDS
+            if self._paused_until > now:
+                return self._paused_until - now
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            # A request larger than the whole bucket waits for a full one
+            tokens = min(tokens, self.tokens.capacity)
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+            self.requests.available -= 1
+            self.tokens.available -= tokens
+            heapq.heappop(self._waiting)
+            return 0.0
+
+    async def acquire(self, tokens: int, priority: Optional[int] = None):
+        """Wait until a request of this many tokens may be sent."""
+        ticket = self._enqueue(_priority.get() if priority is None else priority)
+        try:
+            while (wait := self._try_acquire(ticket, tokens)) > 0:
+                await asyncio.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            self._dequeue(ticket)
+
+    def acquire_sync(self, tokens: int, priority: Optional[int] = None):
+        """Blocking acquire for clients running in worker threads."""
+        if _running_loop() is not None and not self._warned_loop_thread:
+            # Sleeping here would stall every task on the loop, lease renewals included
+            logger.warning(
+                "Blocking OpenAI call on the event loop thread - run sync clients such as "
+                "agent team runs in a worker thread"
+            )
+            self._warned_loop_thread = True
+        ticket = self._enqueue(_priority.get() if priority is None else priority)
+        try:
+            while (wait := self._try_acquire(ticket, tokens)) > 0:
+                time.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            self._dequeue(ticket)
+
+    def backoff(self, attempt: int, server_delay: Optional[float] = None) -> float:
+        """Jittered exponential backoff, never shorter than the server asked for."""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        return max(delay, server_delay or 0.0)
+
+    def pause(self, seconds: float):
+        """Hold every caller, e.g. after a 429, so they don't all retry at once."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.throttled += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "requests_available": int(self.requests.available),
+                "tokens_available": int(self.tokens.available),
+                "waiting": len(self._waiting),
+                "paused_seconds": round(max(0.0, self._paused_until - now), 2),
+                "throttled": self.throttled,
+            }
+
+
+class RateLimitedAsyncTransport(httpx.AsyncBaseTransport):
+    """Sends async requests through the rate limiter, retrying 429s and server errors."""
+
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_tokens(request)
+        for attempt in range(self.limiter.max_retries + 1):
+            await self.limiter.acquire(tokens)
+            last_attempt = attempt == self.limiter.max_retries
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                delay = self.limiter.backoff(attempt)
+                logger.warning(f"OpenAI request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            await response.aclose()
+            delay = self.limiter.backoff(attempt, retry_after(response))
+            logger.warning(f"OpenAI returned {response.status_code}, retrying in {delay:.1f}s")
+            if response.status_code == 429:
+                self.limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Blocking counterpart of RateLimitedAsyncTransport for the agno agents."""
+
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.BaseTransport] = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_tokens(request)
+        for attempt in range(self.limiter.max_retries + 1):
+            self.limiter.acquire_sync(tokens)
+            last_attempt = attempt == self.limiter.max_retries
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                delay = self.limiter.backoff(attempt)
+                logger.warning(f"OpenAI request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            response.close()
+            delay = self.limiter.backoff(attempt, retry_after(response))
+            logger.warning(f"OpenAI returned {response.status_code}, retrying in {delay:.1f}s")
+            if response.status_code == 429:
+                self.limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+    def close(self):
+        self.transport.close()
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The limiter shared by every OpenAI client in the process."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def async_openai_client():
+    """An AsyncOpenAI client governed by the shared limiter, for Graphiti."""
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    http_client = DefaultAsyncHttpxClient(transport=RateLimitedAsyncTransport(get_rate_limiter()))
+    # The transport retries; SDK retries would multiply them
+    return AsyncOpenAI(http_client=http_client, max_retries=0)
+
+
+def sync_http_client() -> httpx.Client:
+    """A blocking HTTP client governed by the shared limiter, for the agno agents."""
+    from openai import DefaultHttpxClient
+
+    return DefaultHttpxClient(transport=RateLimitedTransport(get_rate_limiter()))
+
+
+def async_http_client() -> httpx.AsyncClient:
+    from openai import DefaultAsyncHttpxClient
+
+    return DefaultAsyncHttpxClient(transport=RateLimitedAsyncTransport(get_rate_limiter()))
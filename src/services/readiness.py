@@ -0,0 +1,238 @@
+"""
+Worker readiness for the load balancer's probe.
+
+/health only says the process is up. /ready also reports the work a worker
+does before it serves traffic well: loading the graph when this worker runs
+the Graphiti initialization, building the entity search index, and
+optionally warming up the most frequent chat queries recorded in the query
+log. Each piece of work is a named check that the worker expects at startup
+and runs with readiness.check(). The worker is ready once every expected
+check has finished. A check that failed is reported but doesn't hold the
+worker back, because it serves requests either way.
+
+The query log is a Redis sorted set of chat queries and their counts, shared
+by all workers so a new worker warms up with the whole deployment's queries.
+Chat requests record their query in the background, and each worker trims
+the set to QUERY_LOG_MAX_ENTRIES every QUERY_LOG_TRIM_EVERY records.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+CHECK_GRAPH = "graph"
+CHECK_INDEX = "entity_index"
+CHECK_WARMUP = "warmup"
+
+CHECK_PENDING = "pending"
+CHECK_RUNNING = "running"
+CHECK_READY = "ready"
+CHECK_FAILED = "failed"
+
+QUERY_LOG_KEY = "fwtx:query-log"
+
+# Longer queries are one-off questions, not worth warming up
+MAX_LOGGED_QUERY_CHARS = 500
+
+# Trimming ranks the whole set, so it runs once per this many records
+QUERY_LOG_TRIM_EVERY = 100
+
+
+class ReadinessTracker:
+    """The startup checks a worker runs before it reports ready."""
+
+    def __init__(self):
+        self.checks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._done: Dict[str, asyncio.Event] = {}
+
+    def expect(self, name: str):
+        """Hold readiness until the named check has run."""
+        if name not in self.checks:
+            self.checks[name] = {"status": CHECK_PENDING, "started_at": None, "finished_at": None, "error": None, "detail": None}
+            self._done[name] = asyncio.Event()
+
+    @asynccontextmanager
+    async def check(self, name: str):
+        """Run an expected check; yields its state so the caller can add a detail."""
+        self.expect(name)
+        check = self.checks[name]
+        check.update(status=CHECK_RUNNING, started_at=datetime.now(), finished_at=None, error=None)
+        try:
+            yield check
+        except BaseException as e:
+            check.update(status=CHECK_FAILED, error=str(e) or type(e).__name__)
+            raise
+        else:
+            check["status"] = CHECK_READY
+        finally:
+            check["finished_at"] = datetime.now()
+            self._done[name].set()
+            logger.info(f"Readiness check {name}: {check['status']}")
+
+    async def wait(self, name: str):
+        """Wait for a check to finish; returns at once if it isn't expected."""
+        if name in self._done:
+            await self._done[name].wait()
+
+    @property
+    def ready(self) -> bool:
+        return all(check["status"] in (CHECK_READY, CHECK_FAILED) for check in self.checks.values())
+
+    def status(self) -> Dict[str, Any]:
+        now = datetime.now()
+        checks = {}
+        for name, check in self.checks.items():
+            started, finished = check["started_at"], check["finished_at"]
+            checks[name] = {
+                "status": check["status"],
+                "started_at": started.isoformat() if started else None,
+                "finished_at": finished.isoformat() if finished else None,
+                "duration_seconds": round(((finished or now) - started).total_seconds(), 3) if started else None,
+                "error": check["error"],
+                "detail": check["detail"],
+            }
+        return {"ready": self.ready, "checks": checks}
+
+
+class QueryLog:
+    """Counts of chat queries across all workers, kept in a Redis sorted set."""
+
+    def __init__(
+        self,
+        redis,
+        key: str = QUERY_LOG_KEY,
+        max_entries: Optional[int] = None,
+        trim_every: int = QUERY_LOG_TRIM_EVERY
+    ):
+        self.redis = redis
+        self.key = key
+        self.max_entries = max_entries or settings.QUERY_LOG_MAX_ENTRIES
+        self.trim_every = trim_every
+        self._recorded = 0
+        # Background records, referenced until they finish
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def record(self, query: str):
+        query = " ".join(query.split())
+        if not query or len(query) > MAX_LOGGED_QUERY_CHARS:
+            return
+        try:
+            await self.redis.zincrby(self.key, 1, query)
+            self._recorded += 1
+            if self._recorded % self.trim_every == 0:
+                # Keep only the most frequent queries
+                await self.redis.zremrangebyrank(self.key, 0, -self.max_entries - 1)
+        except Exception as e:
+            logger.warning(f"Failed to record query: {e}")
+
+    def record_in_background(self, query: str):
+        """Record a query without making the caller wait for Redis."""
+        task = asyncio.create_task(self.record(query))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def top(self, count: int) -> List[str]:
+        """The most frequent queries, most frequent first."""
+        if count <= 0:
+            return []
+        queries = await self.redis.zrevrange(self.key, 0, count - 1)
+        return [query.decode() if isinstance(query, bytes) else query for query in queries]
+
+
+async def warm_up(
+    queries: List[str],
+    search: Callable[[str], Awaitable[Any]],
+    timeout: Optional[float] = None
+) -> int:
+    """
+    Run queries one at a time to warm the database and connection pools.
+
+    Returns:
+        How many queries ran before the timeout
+    """
+    warmed = 0
+
+    async def run_queries():
+        nonlocal warmed
+        for query in queries:
+            try:
+                await search(query)
+            except Exception as e:
+                logger.warning(f"Warm-up query failed: {e}")
+            warmed += 1
+
+    try:
+        await asyncio.wait_for(run_queries(), timeout or settings.READINESS_WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up stopped at the timeout after {warmed} of {len(queries)} queries")
+    return warmed
+
+
+async def prepare_worker(
+    readiness: ReadinessTracker,
+    build_index: Callable[[], Awaitable[Any]],
+    search: Callable[[str], Awaitable[Any]],
+    leadership_decided: Optional[Callable[[], Awaitable[Any]]] = None,
+    warmup_queries: Optional[int] = None
+):
+    """
+    Build the entity index and warm up frequent queries, after the graph load.
+
+    With leader election, whether this worker loads the graph is only known
+    once the election has settled, so that is awaited before the graph check.
+    """
+    warmup_queries = settings.READINESS_WARMUP_QUERIES if warmup_queries is None else warmup_queries
+
+    # Index and warm up the loaded graph, not a half-loaded one
+    if leadership_decided is not None:
+        await leadership_decided()
+    await readiness.wait(CHECK_GRAPH)
+
+    async with readiness.check(CHECK_INDEX):
+        while True:
+            try:
+                await build_index()
+                break
+            except Exception as e:
+                logger.warning(f"Entity index build failed, retrying in {settings.READINESS_RETRY_SECONDS}s: {e}")
+                await asyncio.sleep(settings.READINESS_RETRY_SECONDS)
+
+    if warmup_queries:
+        try:
+            async with readiness.check(CHECK_WARMUP) as check:
+                queries = await get_query_log().top(warmup_queries)
+                warmed = await warm_up(queries, search)
+                check["detail"] = f"{warmed} of {len(queries)} logged queries"
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+
+    logger.info("Worker ready")
+
+
+_readiness: Optional[ReadinessTracker] = None
+_query_log: Optional[QueryLog] = None
+
+
+def get_readiness() -> ReadinessTracker:
+    """This worker's readiness tracker."""
+    global _readiness
+    if _readiness is None:
+        _readiness = ReadinessTracker()
+    return _readiness
+
+
+def get_query_log() -> QueryLog:
+    """The query log shared through the FalkorDB Redis instance."""
+    global _query_log
+    if _query_log is None:
+        from src.db.falkor import falkor_driver
+        _query_log = QueryLog(falkor_driver.client.connection)
+    return _query_log
@@ -0,0 +1,195 @@
+"""
+Cheap change detection for the sources the research sync covers.
+
+The hourly check fetches each watched page with a conditional GET
+(If-None-Match / If-Modified-Since), so unchanged pages usually cost a 304
+and no body. Pages that do come back are reduced to their visible text and
+hashed, so a new ETag on identical content is not reported as a change.
+Validators and hashes are only stored once the targeted research for a
+changed source succeeded, so a failed refresh is retried on the next check.
+"""
+
+import asyncio
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from src.config import settings
+from src.services.sync.fwtx_parser import URL_KEYS, humanize_key
+from src.services.sync.manifest import content_hash
+from src.services.sync.state import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+WATCH_STATE_FILE = "source_watch.json"
+
+PRIORITIES = ("high", "medium", "low")
+DEFAULT_PRIORITY = "medium"
+
+SCRIPT_OR_STYLE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG = re.compile(r"<[^>]+>")
+WHITESPACE = re.compile(r"\s+")
+
+
+class WatchedSource:
+    """A page whose changes trigger targeted research."""
+
+    def __init__(self, name: str, url: str, priority: str = DEFAULT_PRIORITY, description: str = ""):
+        self.name = name
+        self.url = url
+        self.priority = priority if priority in PRIORITIES else DEFAULT_PRIORITY
+        self.description = description
+
+    def research_task(self) -> Dict[str, Any]:
+        """A research task that refreshes what the graph knows from this source."""
+        return {
+            "name": f"Update: {self.name}",
+            "config": {
+                "search_queries": [f"{self.name} Fort Worth Texas latest changes"],
+                "fetch_url": self.url,
+                "data_needed": [
+                    "what changed on this page",
+                    "updated contact information",
+                    "updated services, fees or deadlines",
+                ],
+            },
+        }
+
+
+def load_watched_sources(base_urls: Dict[str, str], fwtx_path: Optional[Path] = None) -> List[WatchedSource]:
+    """
+    Collect the sources to watch: the research base URLs plus every URL in fwtx.json.
+
+    A URL listed more than once keeps its highest crawl_priority.
+    """
+    sources: Dict[str, WatchedSource] = {}
+
+    def add(source: WatchedSource):
+        existing = sources.get(source.url)
+        if existing is None or PRIORITIES.index(source.priority) < PRIORITIES.index(existing.priority):
+            sources[source.url] = source
+
+    for key, url in base_urls.items():
+        add(WatchedSource(f"Fort Worth {humanize_key(key)}", url, priority="high"))
+
+    fwtx_path = fwtx_path or Path(settings.BASE_DIR) / "data" / "fwtx.json"
+    try:
+        with open(fwtx_path) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Not watching {fwtx_path}: {e}")
+        data = {}
+
+    def walk(node: Dict[str, Any], key: str):
+        for url_key in URL_KEYS:
+            if isinstance(node.get(url_key), str):
+                add(WatchedSource(
+                    humanize_key(key),
+                    node[url_key],
+                    priority=node.get("crawl_priority", DEFAULT_PRIORITY),
+                    description=node.get("description", ""),
+                ))
+        for child_key, value in node.items():
+            if isinstance(value, dict):
+                walk(value, child_key)
+
+    for key, value in data.items():
+        if key != "metadata" and isinstance(value, dict):
+            walk(value, key)
+
+    return list(sources.values())
+
+
+def visible_text(html: str) -> str:
+    """Reduce a page to its text so markup-only changes don't count."""
+    return WHITESPACE.sub(" ", TAG.sub(" ", SCRIPT_OR_STYLE.sub(" ", html))).strip()
+
+
+class SourceChange:
+    """A source whose content changed, with the validators to store once it is refreshed."""
+
+    def __init__(self, source: WatchedSource, entry: Dict[str, Any]):
+        self.source = source
+        self.entry = entry
+
+
+class SourceChangeDetector:
+    """Conditional fetches and content hashes for watched sources."""
+
+    def __init__(
+        self,
+        state_dir: Optional[Path] = None,
+        timeout: Optional[float] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.state = JsonStateFile(WATCH_STATE_FILE, state_dir)
+        self.entries: Dict[str, Dict[str, Any]] = self.state.data.setdefault("sources", {})
+        self.timeout = timeout or settings.URGENT_CHECK_TIMEOUT_SECONDS
+        self.concurrency = concurrency or settings.URGENT_CHECK_CONCURRENCY
+
+    async def check(self, sources: Iterable[WatchedSource]) -> List[SourceChange]:
+        """
+        Fetch every source and return the ones whose content changed.
+
+        Sources seen for the first time are recorded as a baseline rather
+        than reported, so the first check doesn't research everything.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {"User-Agent": "fwtx-wiki-change-detector"}
+
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True, headers=headers) as client:
+            async def check_one(source: WatchedSource) -> Optional[SourceChange]:
+                async with semaphore:
+                    try:
+                        return await self._check_source(client, source)
+                    except httpx.HTTPError as e:
+                        logger.warning(f"Change check failed for {source.url}: {e}")
+                        return None
+
+            results = await asyncio.gather(*(check_one(source) for source in sources))
+
+        # Baselines are stored right away; changes wait for commit()
+        self.state.save()
+        changes = [change for change in results if change]
+        logger.info(f"Change check: {len(changes)} of {len(results)} sources changed")
+        return changes
+
+    async def _check_source(self, client: httpx.AsyncClient, source: WatchedSource) -> Optional[SourceChange]:
+        entry = self.entries.get(source.url)
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = await client.get(source.url, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        new_entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "hash": content_hash(visible_text(response.text)),
+            "checked_at": datetime.now().isoformat(),
+        }
+        if entry is None:
+            self.entries[source.url] = new_entry
+            return None
+        if new_entry["hash"] == entry.get("hash"):
+            # Same content behind new validators; keep them to get 304s next time
+            entry.update({k: new_entry[k] for k in ("etag", "last_modified", "checked_at")})
+            return None
+        return SourceChange(source, new_entry)
+
+    def commit(self, changes: Iterable[SourceChange]):
+        """Store the new validators and hashes of sources that were refreshed."""
+        for change in changes:
+            self.entries[change.source.url] = {**change.entry, "changed_at": change.entry["checked_at"]}
+        self.state.save()
@@ -0,0 +1,191 @@
+"""
+Coordination of sync runs.
+
+Each sync type runs at most once at a time, with at most one run queued
+behind it; further requests for a type that is already queued share that
+queued run instead of starting another. A sync type can supersede others:
+it never runs at the same time as them, and when it starts it absorbs their
+queued runs, which then complete with its result.
+
+With a SyncLock, a run also waits for conflicting runs on other workers
+before it starts.
+"""
+
+import asyncio
+import contextvars
+import logging
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+SyncFunction = Callable[[Set[str]], Awaitable[Any]]
+
+
+def _copy_result(source: asyncio.Future, target: asyncio.Future):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class SyncRun:
+    """One execution of a sync type, shared by every request merged into it."""
+
+    def __init__(self, sync_type: str):
+        self.sync_type = sync_type
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.requested_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.requests = 1
+        # Sync types whose queued runs this run took over
+        self.absorbed: Set[str] = set()
+        # The run that absorbed this one
+        self.merged_into: Optional["SyncRun"] = None
+        # Context of the first request, so e.g. its job sees the run's progress
+        self.context = contextvars.copy_context()
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requested_at": self.requested_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "requests": self.requests,
+            "absorbed": sorted(self.absorbed),
+        }
+
+
+class SyncCoordinator:
+    """Runs registered sync types without overlap, merging duplicate requests."""
+
+    def __init__(self, lock=None):
+        # Optional SyncLock shared with the other workers
+        self.lock = lock
+        self._functions: Dict[str, SyncFunction] = {}
+        self._supersedes: Dict[str, Set[str]] = {}
+        self._running: Dict[str, SyncRun] = {}
+        self._pending: Dict[str, SyncRun] = {}
+
+    def register(self, sync_type: str, function: SyncFunction, supersedes: Iterable[str] = ()):
+        """
+        Register a sync type.
+
+        Args:
+            sync_type: Name requests refer to
+            function: Coroutine function called with the set of sync types
+                the run absorbed, so it can include their work
+            supersedes: Sync types this one covers
+        """
+        self._functions[sync_type] = function
+        self._supersedes[sync_type] = set(supersedes)
+
+    def _superseded_by(self, sync_type: str) -> List[str]:
+        return [other for other, covered in self._supersedes.items() if sync_type in covered]
+
+    def _conflicts(self, sync_type: str) -> Set[str]:
+        return {sync_type} | self._supersedes[sync_type] | set(self._superseded_by(sync_type))
+
+    async def request(self, sync_type: str) -> Dict[str, Any]:
+        """
+        Request a sync and wait for the run that handles it.
+
+        Returns:
+            The handling run's result with the sync type that actually ran
+            and whether the request was merged into another run
+        """
+        if sync_type not in self._functions:
+            raise ValueError(f"Unknown sync type: {sync_type}")
+
+        run = self._merge_target(sync_type)
+        merged = run is not None
+        if run is None:
+            run = SyncRun(sync_type)
+            self._pending[sync_type] = run
+            self._dispatch()
+        else:
+            run.requests += 1
+            logger.info(f"{sync_type} sync request merged into the queued {run.sync_type} sync")
+
+        try:
+            result = await asyncio.shield(run.future)
+        except asyncio.CancelledError:
+            self._withdraw(run)
+            raise
+        return {"handled_by": run.sync_type, "merged": merged, "result": result}
+
+    def _merge_target(self, sync_type: str) -> Optional[SyncRun]:
+        """A queued run that will cover this request, if any."""
+        if sync_type in self._pending:
+            return self._pending[sync_type]
+        for other in self._superseded_by(sync_type):
+            if other in self._pending:
+                self._pending[other].absorbed.add(sync_type)
+                return self._pending[other]
+        return None
+
+    def _withdraw(self, run: SyncRun):
+        """Drop a cancelled request, cancelling its run once nobody else waits on it."""
+        while run.merged_into:
+            run = run.merged_into
+        run.requests -= 1
+        if run.requests > 0 or run.future.done():
+            return
+        if self._pending.get(run.sync_type) is run:
+            del self._pending[run.sync_type]
+            run.future.cancel()
+            logger.info(f"Queued {run.sync_type} sync cancelled")
+        elif run.task:
+            run.task.cancel()
+
+    def _dispatch(self):
+        """Start every queued run whose sync type has no conflicting run in progress."""
+        # Superseding types first, so they absorb what they cover
+        for sync_type in sorted(self._pending, key=lambda t: -len(self._supersedes[t])):
+            run = self._pending.get(sync_type)
+            if run is None or self._conflicts(sync_type) & set(self._running):
+                continue
+            del self._pending[sync_type]
+            for covered in self._supersedes[sync_type]:
+                absorbed = self._pending.pop(covered, None)
+                if absorbed:
+                    run.absorbed.add(covered)
+                    run.absorbed |= absorbed.absorbed
+                    run.requests += absorbed.requests
+                    # Requests waiting on the absorbed run get this run's result
+                    absorbed.sync_type = sync_type
+                    absorbed.merged_into = run
+                    run.future.add_done_callback(lambda done, target=absorbed.future: _copy_result(done, target))
+                    logger.info(f"{sync_type} sync absorbed the queued {covered} sync")
+            self._running[sync_type] = run
+            run.task = asyncio.create_task(self._execute(run), context=run.context)
+
+    async def _execute(self, run: SyncRun):
+        lock = self.lock.hold(self._conflicts(run.sync_type)) if self.lock else nullcontext()
+        try:
+            async with lock:
+                run.started_at = datetime.now()
+                logger.info(f"Starting {run.sync_type} sync ({run.requests} requests)")
+                result = await self._functions[run.sync_type](run.absorbed)
+            run.future.set_result(result)
+        except asyncio.CancelledError:
+            logger.warning(f"{run.sync_type} sync cancelled")
+            run.future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"{run.sync_type} sync failed: {e}")
+            run.future.set_exception(e)
+        finally:
+            del self._running[run.sync_type]
+            self._dispatch()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": {sync_type: run.to_dict() for sync_type, run in self._running.items()},
+            "pending": {sync_type: run.to_dict() for sync_type, run in self._pending.items()},
+        }
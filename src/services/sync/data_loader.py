@@ -7,102 +7,272 @@ to TOP-compliant structured entities.
 
 import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from datetime import datetime
 from pathlib import Path
 
 from graphiti_core.nodes import EpisodeType
 from graphiti_core.utils.bulk_utils import RawEpisode
+from graphiti_core.utils.datetime_utils import utc_now
 
 from src.services.agent.researcher import FortWorthResearchWorkflow
+from src.services.sync.document_chunker import (
+    DocumentChunk,
+    chunk_markdown,
+    chunk_sections,
+    page_sections
+)
+from src.services.graphiti.communities import update_communities
+from src.services.graphiti.ingest import ingest_episodes
+from src.services.jobs.queue import STAGE_COMMUNITIES, STAGE_EXTRACT, STAGE_INGEST, job_stage
+from src.services.sync.manifest import FileSyncPlan, SyncManifest, content_hash
+from src.services.sync.pdf_extractor import PDFTextExtractor, file_sha256
+from src.services.sync.fwtx_parser import FWTXServicesParser
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Long markdown documents that are chunked by section before AI processing
+DOCUMENT_SPECS: Dict[str, Dict[str, Any]] = {
+    "governance.md": {
+        "title": "Fort Worth Governance Structure",
+        "data_needed": [
+            "Extract all city leadership positions (Mayor, City Manager, Assistant City Managers)",
+            "Extract all council members and their districts",
+            "Extract department heads and organizational structure",
+            "Extract leadership transitions and dates",
+            "Create temporal relationships showing succession (e.g., David Cooke -> Jay Chapa)"
+        ],
+        "instructions": """
+Process this section of the governance document ({section}) and extract all entities and relationships following TOP structure.
+Pay special attention to:
+- Jesus "Jay" Chapa becoming City Manager on January 28, 2025
+- David Cooke retiring in February 2025 after 10+ years
+- All council members and their districts
+- All department heads and Assistant City Managers
+
+Return structured JSON with entities and relationships following the Texas Ontology Protocol.
+"""
+    },
+    "fwtx-charter.md": {
+        "title": "Fort Worth City Charter",
+        "data_needed": [
+            "Extract the charter provisions in this section as Charter/LegalDocument entities",
+            "Extract offices, bodies and departments the section creates or empowers",
+            "Extract powers, duties, terms and qualifications defined by the section",
+            "Create relationships between the charter section and the entities it governs"
+        ],
+        "instructions": """
+This is one section of the {title} ({section}).
+Model the section as a Charter entity with top_id "fwtx:charter:<chapter>-<section>" that is PartOf "fwtx:charter:fort-worth",
+and link it to the government entities it establishes or governs (e.g. "fwtx:city:fort-worth", "fwtx:city-council:fort-worth").
+Only extract what this section states; other sections are processed separately.
+
+Return structured JSON with entities and relationships following the Texas Ontology Protocol.
+"""
+    },
+}
+
+# Research task template for text extracted from PDFs
+PDF_DOCUMENT_SPEC: Dict[str, Any] = {
+    "data_needed": [
+        "Extract all officials, positions and offices listed on these pages",
+        "Extract districts, precincts and jurisdictions they represent",
+        "Extract terms, election dates and contact information",
+        "Create relationships between officials, positions and jurisdictions"
+    ],
+    "instructions": """
+This is text extracted from the PDF document "{title}" ({section}).
+Extract the entities and relationships stated in this text following TOP structure.
+Only extract what this text states; other pages are processed separately.
+
+Return structured JSON with entities and relationships following the Texas Ontology Protocol.
+"""
+}
+
+
 class DataLoader:
     """Loads Fort Worth data from local files using AI processing."""
     
-    def __init__(self, graphiti):
+    def __init__(self, graphiti, force: bool = False):
         self.graphiti = graphiti
         self.data_dir = Path(settings.BASE_DIR) / "data"
         self.workflow = FortWorthResearchWorkflow(graphiti)
+        self.pdf_extractor = PDFTextExtractor()
+        self.force = force
+        self.manifest = SyncManifest()
+        self.sync_plans: Dict[str, FileSyncPlan] = {}
         
     def glob_data_files(self, pattern: str) -> List[Path]:
         """Get all files matching pattern in data directory."""
         return list(self.data_dir.glob(pattern))
     
+    def create_structured_entities(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert services directory JSON into TOP entities and relationships."""
+        return FWTXServicesParser(json_data).parse().model_dump(mode="json")
+    
+    def plan_file(self, path: Path) -> Optional[FileSyncPlan]:
+        """
+        Decide whether a data file needs processing.
+        
+        Returns None when the file is unchanged since its last complete sync,
+        otherwise a plan listing the chunks that were already ingested.
+        """
+        file_hash = file_sha256(path)
+        if not self.force and self.manifest.file_unchanged(path.name, file_hash):
+            logger.info(f"Skipping unchanged file: {path.name}")
+            return None
+        
+        known_chunks = set() if self.force else self.manifest.known_chunks(path.name)
+        plan = FileSyncPlan(path.name, file_hash, known_chunks)
+        self.sync_plans[path.name] = plan
+        return plan
+    
+    def build_document_tasks(
+        self,
+        document_path: Path,
+        document_spec: Dict[str, Any],
+        plan: FileSyncPlan
+    ) -> Iterator[Dict[str, Any]]:
+        """Split a markdown document into per-section research tasks."""
+        chunks = chunk_markdown(document_path.read_text(), document_path.name)
+        logger.info(f"Split {document_path.name} into {len(chunks)} section chunks")
+        return self.build_chunk_tasks(chunks, document_spec, plan)
+    
+    def build_pdf_tasks(self, pdf_path: Path, plan: FileSyncPlan) -> Iterator[Dict[str, Any]]:
+        """Stream page text from a PDF into per-chunk research tasks."""
+        title = pdf_path.stem.replace('-', ' ').replace('_', ' ').title()
+        document_spec = {**PDF_DOCUMENT_SPEC, "title": f"Fort Worth {title}"}
+        pages = self.pdf_extractor.iter_pages(pdf_path, plan.file_hash)
+        chunks = chunk_sections(page_sections(pages, document_spec["title"]), pdf_path.name)
+        return self.build_chunk_tasks(chunks, document_spec, plan)
+    
+    def build_chunk_tasks(
+        self,
+        chunks: Iterable[DocumentChunk],
+        document_spec: Dict[str, Any],
+        plan: FileSyncPlan
+    ) -> Iterator[Dict[str, Any]]:
+        """Create one research task per new or changed document chunk."""
+        for chunk in chunks:
+            chunk_hash = chunk.content_hash
+            if not plan.is_new(chunk_hash):
+                continue
+            yield {
+                "name": f"{document_spec['title']} [{chunk.index + 1}] - {chunk.section}",
+                "source_file": plan.file_name,
+                "chunk_hash": chunk_hash,
+                "config": {
+                    "data_content": chunk.text,
+                    "data_needed": document_spec["data_needed"],
+                    "instructions": document_spec["instructions"].format(
+                        title=document_spec["title"],
+                        section=chunk.section
+                    )
+                }
+            }
+    
+    async def research_task_stream(self, tasks: Iterable[Dict[str, Any]]) -> List[RawEpisode]:
+        """Research a stream of chunk tasks in bounded windows of concurrent runs."""
+        episodes = []
+        window_size = settings.SYNC_RESEARCH_BATCH_SIZE * 4
+        task_iter = iter(tasks)
+        
+        while True:
+            # Pulling the next window may extract PDF pages, so keep it off the event loop
+            window = await asyncio.to_thread(lambda: list(islice(task_iter, window_size)))
+            if not window:
+                break
+            logger.info(f"Processing {len(window)} new or changed document chunks with AI agents")
+            
+            results = await self.workflow.research_each_task(window)
+            for task, task_episodes in zip(window, results):
+                if task_episodes is None:
+                    continue
+                episodes.extend(task_episodes)
+                self.sync_plans[task["source_file"]].mark_completed(task["chunk_hash"])
+        
+        return episodes
+    
     async def process_data_files(self) -> List[RawEpisode]:
-        """Process all data files using AI agents."""
+        """Process new or changed data files using AI agents."""
         episodes = []
         
         # Define research tasks for each data file type
         research_tasks = []
         
-        # Process governance.md
-        governance_file = self.data_dir / "governance.md"
-        if governance_file.exists():
-            content = governance_file.read_text()
-            research_tasks.append({
-                "name": "Process Governance Structure",
-                "config": {
-                    "data_content": content,
-                    "data_needed": [
-                        "Extract all city leadership positions (Mayor, City Manager, Assistant City Managers)",
-                        "Extract all council members and their districts",
-                        "Extract department heads and organizational structure",
-                        "Extract leadership transitions and dates",
-                        "Create temporal relationships showing succession (e.g., David Cooke -> Jay Chapa)"
-                    ],
-                    "instructions": f"""
-Process this governance document and extract all entities and relationships following TOP structure.
-Pay special attention to:
-- Jesus "Jay" Chapa becoming City Manager on January 28, 2025
-- David Cooke retiring in February 2025 after 10+ years
-- All council members and their districts
-- All department heads and Assistant City Managers
-
-Content to process:
-{content}
-
-Return structured JSON with entities and relationships following the Texas Ontology Protocol.
-"""
-                }
-            })
+        # Chunk long documents by section and research the chunks in parallel
+        document_tasks: List[Iterable[Dict[str, Any]]] = []
+        for file_name, document_spec in DOCUMENT_SPECS.items():
+            document_path = self.data_dir / file_name
+            if document_path.exists():
+                plan = self.plan_file(document_path)
+                if plan:
+                    document_tasks.append(self.build_document_tasks(document_path, document_spec, plan))
         
-        # Process fwtx.json
+        # Process fwtx.json directly - the structure is already in the JSON
         json_file = self.data_dir / "fwtx.json"
-        if json_file.exists():
-            with open(json_file) as f:
-                json_data = json.load(f)
-            research_tasks.append({
-                "name": "Process City Services Data",
-                "config": {
-                    "data_content": json.dumps(json_data, indent=2),
-                    "data_needed": [
-                        "Extract all city services and their details",
-                        "Extract all department information",
-                        "Extract URLs and contact information",
-                        "Create relationships between services and departments"
-                    ],
-                    "instructions": f"""
+        plan = self.plan_file(json_file) if json_file.exists() else None
+        if plan:
+            parser = FWTXServicesParser.from_file(json_file)
+            json_episodes = []
+            for episode in parser.to_episodes():
+                episode_hash = content_hash(episode.content)
+                if plan.is_new(episode_hash):
+                    json_episodes.append(episode)
+                    # Safe before ingestion: the manifest is only saved after
+                    # ingest_episodes returns, and episodes that fail there stay
+                    # in the ingest checkpoint and are resumed by the next sync
+                    plan.mark_completed(episode_hash)
+            episodes.extend(json_episodes)
+            logger.info(f"Parsed {len(json_episodes)} new or changed episodes from {json_file.name}")
+            
+            # Optional LLM enrichment on top of the deterministic parse
+            if settings.SYNC_JSON_LLM_ENRICHMENT:
+                json_content = json.dumps(parser.json_data, indent=2)
+                research_tasks.append({
+                    "name": "Process City Services Data",
+                    "config": {
+                        "data_content": json_content,
+                        "data_needed": [
+                            "Extract all city services and their details",
+                            "Extract all department information",
+                            "Extract URLs and contact information",
+                            "Create relationships between services and departments"
+                        ],
+                        "instructions": f"""
 Process this JSON file containing Fort Worth city services and extract entities following TOP structure.
 
 Content to process:
-{json.dumps(json_data, indent=2)}
+{json_content}
 
 Return structured JSON with entities and relationships.
 """
-                }
-            })
+                    }
+                })
         
-        # Process PDFs if needed (requires PDF processing in research agent)
+        # Extract PDF text page by page, or fall back to web research
         pdf_files = self.glob_data_files("*.pdf")
         for pdf_path in pdf_files:
-            logger.info(f"Found PDF: {pdf_path.name} - AI agents will need web access to process PDFs")
+            plan = self.plan_file(pdf_path)
+            if not plan:
+                continue
+            
+            if settings.SYNC_PDF_EXTRACTION:
+                logger.info(f"Found PDF: {pdf_path.name} - extracting text for chunked processing")
+                document_tasks.append(self.build_pdf_tasks(pdf_path, plan))
+                continue
+            
+            logger.info(f"Found PDF: {pdf_path.name} - PDF extraction disabled, AI agents will research it on the web")
+            plan.register(plan.file_hash)
             research_tasks.append({
                 "name": f"Research {pdf_path.stem} Information",
+                "source_file": plan.file_name,
+                "chunk_hash": plan.file_hash,
                 "config": {
                     "search_queries": [
                         f"Fort Worth {pdf_path.stem.replace('-', ' ').replace('_', ' ')} 2024 2025",
@@ -116,35 +286,62 @@ Return structured JSON with entities and relationships.
                 }
             })
         
+        if document_tasks:
+            document_episodes = await self.research_task_stream(chain.from_iterable(document_tasks))
+            episodes.extend(document_episodes)
+            logger.info(f"AI agents created {len(document_episodes)} episodes from document chunks")
+        
         # Process all tasks with AI agents
         if research_tasks:
             logger.info(f"Processing {len(research_tasks)} data files with AI agents")
-            research_episodes = await self.workflow.research_all_tasks(research_tasks)
+            research_episodes = []
+            results = await self.workflow.research_each_task(research_tasks)
+            for task, task_episodes in zip(research_tasks, results):
+                # Failed or over-budget tasks are retried next sync
+                if task_episodes is None:
+                    continue
+                research_episodes.extend(task_episodes)
+                if "source_file" in task:
+                    self.sync_plans[task["source_file"]].mark_completed(task["chunk_hash"])
             episodes.extend(research_episodes)
             logger.info(f"AI agents created {len(research_episodes)} episodes from data files")
         
         return episodes
     
+    def commit_manifest(self):
+        """Record the chunks ingested by this run in the sync manifest."""
+        for plan in self.sync_plans.values():
+            self.manifest.record(plan.file_name, plan.file_hash, plan.ingested_chunks, plan.complete)
+            if not plan.complete:
+                logger.warning(f"{plan.file_name} was only partially ingested and will be retried next sync")
+        self.manifest.save()
+    
     async def sync_to_graphiti(self):
-        """Sync all data to Graphiti using AI processing."""
+        """Sync new or changed data to Graphiti using AI processing."""
         logger.info("Starting AI-powered data sync...")
         
-        episodes = await self.process_data_files()
+        async with job_stage(STAGE_EXTRACT):
+            episodes = await self.process_data_files()
+        
+        sync_started = utc_now()
+        async with job_stage(STAGE_INGEST):
+            ingested = await ingest_episodes(self.graphiti, episodes)
+            self.commit_manifest()
         
-        if episodes:
-            await self.graphiti.add_episode_bulk(episodes)
-            logger.info(f"Successfully synced {len(episodes)} episodes to Graphiti")
+        if ingested:
+            logger.info(f"Successfully synced {len(ingested)} episodes to Graphiti")
             
-            # Build communities
-            logger.info("Building communities...")
-            await self.graphiti.build_communities()
-            logger.info("Community building completed")
+            # Update communities for the entities this sync touched
+            logger.info("Updating communities...")
+            async with job_stage(STAGE_COMMUNITIES):
+                await update_communities(self.graphiti, since=sync_started)
+            logger.info("Community update completed")
         else:
-            logger.warning("No episodes created for sync")
+            logger.info("No new or changed data - nothing to sync")
 
 
 # Convenience function for compatibility
-async def load_and_sync_all_data(graphiti):
-    """Load and sync all Fort Worth data using AI processing."""
-    loader = DataLoader(graphiti)
+async def load_and_sync_all_data(graphiti, force: bool = False):
+    """Load and sync new or changed Fort Worth data using AI processing."""
+    loader = DataLoader(graphiti, force=force)
     await loader.sync_to_graphiti()
\ No newline at end of file
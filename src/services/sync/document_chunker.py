@@ -0,0 +1,236 @@
+"""
+Section-aware chunking for long documents.
+
+This module splits markdown documents (such as the city charter) by their
+headings, chapters and sections, and packs the sections into chunks that fit
+a token budget so every part of a document can be sent to the AI agents.
+"""
+
+import hashlib
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from src.config import settings
+
+
+# Rough token estimate used for budgeting prompts
+CHARS_PER_TOKEN = 4
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+# Headings that start a new top-level division of a legal document
+STRUCTURAL_HEADING_PATTERN = re.compile(r"^(PART|CHAPTER|ARTICLE|TITLE)\b", re.IGNORECASE)
+
+SECTION_SEPARATOR = " > "
+
+Section = Tuple[Tuple[str, ...], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class DocumentChunk(BaseModel):
+    """A token-bounded piece of a document with its section context."""
+    source: str = Field(..., description="Name of the source document")
+    index: int = Field(..., description="Position of the chunk in the document")
+    section: str = Field(..., description="Heading path of the first section in the chunk")
+    top_level: str = Field("", description="Top-level division (e.g. chapter) of the chunk")
+    text: str = Field(..., description="Chunk text including any overlap")
+
+    @property
+    def token_estimate(self) -> int:
+        return estimate_tokens(self.text)
+
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the chunk content."""
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+def split_markdown_sections(text: str) -> Iterator[Section]:
+    """
+    Split markdown into (heading path, body) sections.
+
+    Documents with chapter/article headings are treated as legal documents:
+    those headings form the top level and any other level-1 headings are
+    assumed to be running page headers left over from PDF conversion.
+    """
+    lines = text.splitlines()
+    has_structure = any(
+        (match := HEADING_PATTERN.match(line)) and STRUCTURAL_HEADING_PATTERN.match(match.group(2))
+        for line in lines
+    )
+
+    path: List[Tuple[int, str]] = []
+    body: List[str] = []
+
+    def flush() -> Optional[Section]:
+        content = "\n".join(body).strip()
+        body.clear()
+        if not content and not path:
+            return None
+        heading_text = "\n".join(f"{'#' * level} {title}" for level, title in path[-1:])
+        section_text = f"{heading_text}\n\n{content}".strip() if content else heading_text
+        return tuple(title for _, title in path), section_text
+
+    for line in lines:
+        match = HEADING_PATTERN.match(line)
+        if not match:
+            body.append(line)
+            continue
+
+        level, title = len(match.group(1)), match.group(2)
+        if has_structure:
+            if STRUCTURAL_HEADING_PATTERN.match(title):
+                level = 1
+            elif level == 1:
+                # Running page header - drop it but keep the surrounding text
+                continue
+
+        section = flush()
+        if section and section[1]:
+            yield section
+
+        while path and path[-1][0] >= level:
+            path.pop()
+        path.append((level, title))
+
+    section = flush()
+    if section and section[1]:
+        yield section
+
+
+def page_sections(pages: Iterable[Tuple[int, str]], title: str) -> Iterator[Section]:
+    """Turn extracted (page_number, text) pairs into sections under one title."""
+    for page_number, text in pages:
+        text = text.strip()
+        if text:
+            yield (title, f"Page {page_number}"), text
+
+
+def _split_oversized(text: str, max_chars: int) -> Iterator[str]:
+    """Split a section larger than the budget at paragraph boundaries."""
+    window: List[str] = []
+    size = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        # Hard split paragraphs that exceed the budget on their own
+        while len(paragraph) > max_chars:
+            if window:
+                yield "\n\n".join(window)
+                window, size = [], 0
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            yield paragraph[:cut].strip()
+            paragraph = paragraph[cut:].strip()
+        if size + len(paragraph) + 2 > max_chars and window:
+            yield "\n\n".join(window)
+            window, size = [], 0
+        window.append(paragraph)
+        size += len(paragraph) + 2
+    if window:
+        yield "\n\n".join(window)
+
+
+def _overlap_tail(text: str, overlap_chars: int) -> str:
+    """Take the trailing overlap from a chunk, starting at a word boundary."""
+    if overlap_chars <= 0 or not text:
+        return ""
+    if len(text) <= overlap_chars:
+        return text
+    tail = text[-overlap_chars:]
+    space = tail.find(" ")
+    return tail[space + 1:] if 0 <= space < len(tail) // 2 else tail
+
+
+def chunk_sections(
+    sections: Iterable[Section],
+    source: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None
+) -> Iterator[DocumentChunk]:
+    """
+    Pack sections into token-bounded chunks.
+
+    Consecutive sections under the same top-level heading are packed together
+    up to the budget. Sections larger than the budget are split at paragraph
+    boundaries. Chunks continuing the same top-level division start with the
+    tail of the previous chunk as overlap.
+    """
+    max_tokens = max_tokens or settings.SYNC_CHUNK_MAX_TOKENS
+    overlap_tokens = settings.SYNC_CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    overlap_tokens = min(overlap_tokens, max_tokens // 4)
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+    body_chars = max_chars - overlap_chars
+
+    index = 0
+    parts: List[str] = []
+    size = 0
+    first_section = ""
+    top_level = ""
+    previous_tail = ""
+    previous_top_level = None
+
+    def emit() -> Optional[DocumentChunk]:
+        nonlocal index, parts, size, previous_tail, previous_top_level
+        if not parts:
+            return None
+        body = "\n\n".join(parts)
+        overlap = previous_tail if previous_top_level == top_level else ""
+        text = f"{overlap}\n\n{body}" if overlap else body
+        chunk = DocumentChunk(
+            source=source,
+            index=index,
+            section=first_section,
+            top_level=top_level,
+            text=text
+        )
+        index += 1
+        previous_tail = _overlap_tail(body, overlap_chars)
+        previous_top_level = top_level
+        parts, size = [], 0
+        return chunk
+
+    for path, text in sections:
+        section_name = SECTION_SEPARATOR.join(path) if path else source
+        section_top = path[0] if path else ""
+
+        # Never pack across top-level divisions
+        if parts and section_top != top_level:
+            chunk = emit()
+            if chunk:
+                yield chunk
+
+        pieces = [text] if len(text) <= body_chars else list(_split_oversized(text, body_chars))
+        for piece in pieces:
+            if parts and size + len(piece) + 2 > body_chars:
+                chunk = emit()
+                if chunk:
+                    yield chunk
+            if not parts:
+                first_section = section_name
+                top_level = section_top
+            parts.append(piece)
+            size += len(piece) + 2
+
+    chunk = emit()
+    if chunk:
+        yield chunk
+
+
+def chunk_markdown(
+    text: str,
+    source: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None
+) -> List[DocumentChunk]:
+    """Split a markdown document into section-aware, token-bounded chunks."""
+    return list(chunk_sections(split_markdown_sections(text), source, max_tokens, overlap_tokens))
@@ -13,6 +13,7 @@ from typing import List, Dict, Any, Optional
 from graphiti_core.nodes import EpisodeType
 from graphiti_core.utils.bulk_utils import RawEpisode
 
+from src.services.graphiti.ingest import ingest_episodes
 from src.models.top.structured import (
     TOPEpisodeData,
     StructuredEntity,
@@ -260,8 +261,8 @@ async def initialize_live_research(graphiti):
         
         if initial_episodes:
             logger.info(f"Research completed - adding {len(initial_episodes)} episodes to graph")
-            await graphiti.add_episode_bulk(initial_episodes)
-            logger.info(f"Successfully added {len(initial_episodes)} research episodes")
+            ingested = await ingest_episodes(graphiti, initial_episodes)
+            logger.info(f"Successfully added {len(ingested)} new research episodes")
         else:
             logger.warning("No episodes created from research")
     except Exception as e:
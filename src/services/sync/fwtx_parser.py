@@ -0,0 +1,381 @@
+"""
+Deterministic parser for the Fort Worth services directory (data/fwtx.json).
+
+This module walks the JSON categories and services directly and converts them
+to TOP-compliant structured entities and relationships, without an LLM.
+"""
+
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from graphiti_core.nodes import EpisodeType
+from graphiti_core.utils.bulk_utils import RawEpisode
+
+from src.models.top.base import ConfidenceLevel
+from src.models.top.structured import (
+    TOPEpisodeData,
+    StructuredEntity,
+    StructuredRelationship,
+    TOPEntityType,
+    TOPRelationshipType
+)
+
+logger = logging.getLogger(__name__)
+
+
+SOURCE_FILE = "data/fwtx.json"
+
+CITY_TOP_ID = "fwtx:city:fort-worth"
+COUNTY_TOP_ID = "fwtx:county:tarrant"
+DEPT_311_TOP_ID = "fwtx:dept:fort-worth-311"
+
+# Jurisdiction entities that category entries hang off
+ROOT_ENTITIES = {
+    CITY_TOP_ID: (TOPEntityType.HOME_RULE_CITY, "City of Fort Worth"),
+    COUNTY_TOP_ID: (TOPEntityType.COUNTY, "Tarrant County"),
+    DEPT_311_TOP_ID: (TOPEntityType.DEPARTMENT, "Fort Worth 311"),
+}
+
+ROOT_RELATIONSHIPS = {
+    CITY_TOP_ID: (TOPRelationshipType.LOCATED_IN, COUNTY_TOP_ID),
+    DEPT_311_TOP_ID: (TOPRelationshipType.PART_OF, CITY_TOP_ID),
+}
+
+# How each top-level category maps onto TOP entities
+CATEGORY_SPECS: Dict[str, Dict[str, Any]] = {
+    "fort_worth_city_services": {
+        "parent": CITY_TOP_ID,
+        "entity_type": TOPEntityType.DEPARTMENT,
+        "relationship": TOPRelationshipType.PART_OF,
+        "name_prefix": "Fort Worth",
+    },
+    "fort_worth_311_services": {
+        "parent": DEPT_311_TOP_ID,
+        "entity_type": TOPEntityType.DIVISION,
+        "relationship": TOPRelationshipType.PART_OF,
+        "name_prefix": "Fort Worth 311",
+    },
+    "tarrant_county_services": {
+        "parent": COUNTY_TOP_ID,
+        "entity_type": TOPEntityType.DEPARTMENT,
+        "relationship": TOPRelationshipType.PART_OF,
+        "name_prefix": "Tarrant County",
+    },
+    "transportation_public_transit": {
+        "parent": CITY_TOP_ID,
+        "entity_type": TOPEntityType.AUTHORITY,
+        "relationship": TOPRelationshipType.SERVES,
+        "name_prefix": None,
+    },
+    "public_safety_emergency": {
+        "parent": CITY_TOP_ID,
+        "entity_type": TOPEntityType.DEPARTMENT,
+        "relationship": TOPRelationshipType.PART_OF,
+        "name_prefix": None,
+    },
+    "community_resources": {
+        "parent": CITY_TOP_ID,
+        "entity_type": TOPEntityType.AUTHORITY,
+        "relationship": TOPRelationshipType.SERVES,
+        "name_prefix": None,
+    },
+}
+
+# Top-level keys that deliberately produce no entities
+EXCLUDED_CATEGORIES = {
+    # Parsed into every episode's metadata
+    "metadata",
+    # FAQ topics with a free-text pointer to where the answers live, guidance
+    # for the research agents rather than organizations; the departments they
+    # point at are entities of the service categories
+    "key_faq_resources",
+    # Crawl priorities and frequencies, read by the priority schedule
+    "crawling_configuration",
+}
+
+# Entries that belong to a different jurisdiction than their category
+PARENT_OVERRIDES = {
+    "tarrant_county_sheriff": COUNTY_TOP_ID,
+}
+
+# Entries describing the parent itself rather than a separate entity
+MERGE_INTO_PARENT_KEYS = {"main_website", "main_portal"}
+
+# Nested objects that are attributes of an entity rather than entities
+NESTED_PROPERTY_KEYS = {"components", "fares"}
+
+TOP_ID_TYPE_SLUGS = {
+    TOPEntityType.DEPARTMENT: "dept",
+    TOPEntityType.DIVISION: "division",
+    TOPEntityType.AUTHORITY: "authority",
+}
+
+NAME_OVERRIDES = {
+    "gis": "GIS",
+    "ems": "EMS",
+    "myfw": "MyFW",
+    "wic": "WIC",
+    "hud": "HUD",
+    "mhmr": "MHMR",
+    "cert": "CERT",
+    "icare": "iCARE",
+}
+
+URL_KEYS = ("url", "data_portal")
+
+
+def humanize_key(key: str) -> str:
+    """Convert a snake_case JSON key into a display name."""
+    return " ".join(NAME_OVERRIDES.get(part, part.capitalize()) for part in key.split("_"))
+
+
+def slugify(value: str) -> str:
+    """Convert a display name into a TOP identifier slug."""
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+class FWTXServicesParser:
+    """Converts the fwtx.json services directory into TOP episode data."""
+
+    def __init__(self, json_data: Dict[str, Any]):
+        self.json_data = json_data
+        self.metadata = json_data.get("metadata", {})
+        self.valid_from = self.metadata.get("last_updated")
+
+    @classmethod
+    def from_file(cls, path: Path) -> "FWTXServicesParser":
+        """Create a parser from a JSON file on disk."""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def parse_category(self, category_key: str) -> Optional[TOPEpisodeData]:
+        """Parse a single top-level category into episode data."""
+        spec = CATEGORY_SPECS.get(category_key)
+        category = self.json_data.get(category_key)
+        if spec is None or not isinstance(category, dict):
+            return None
+
+        episode_data = TOPEpisodeData(metadata={
+            "source_file": SOURCE_FILE,
+            "category": category_key,
+            "category_description": category.get("category_description"),
+            "last_updated": self.valid_from,
+        })
+        self._walk(episode_data, category, spec, spec["parent"], spec["entity_type"], category_key)
+        self._add_referenced_roots(episode_data)
+        return episode_data
+
+    def parse(self) -> TOPEpisodeData:
+        """Parse every known category into a single episode data object."""
+        merged = TOPEpisodeData(metadata={"source_file": SOURCE_FILE, **self.metadata})
+        seen_entities = set()
+        seen_relationships = set()
+
+        for category_key in CATEGORY_SPECS:
+            episode_data = self.parse_category(category_key)
+            if episode_data is None:
+                continue
+            for entity in episode_data.entities:
+                if entity.top_id not in seen_entities:
+                    seen_entities.add(entity.top_id)
+                    merged.entities.append(entity)
+            for rel in episode_data.relationships:
+                key = (rel.relationship_type, rel.source_entity, rel.target_entity)
+                if key not in seen_relationships:
+                    seen_relationships.add(key)
+                    merged.relationships.append(rel)
+
+        return merged
+
+    def to_episodes(self) -> List[RawEpisode]:
+        """Create one Graphiti episode per category."""
+        episodes = []
+        reference_time = self._reference_time()
+
+        unmapped = set(self.json_data) - set(CATEGORY_SPECS) - EXCLUDED_CATEGORIES
+        if unmapped:
+            logger.warning(f"Skipping categories in {SOURCE_FILE} without a TOP mapping: {sorted(unmapped)}")
+
+        for category_key in CATEGORY_SPECS:
+            episode_data = self.parse_category(category_key)
+            if episode_data is None or not episode_data.entities:
+                continue
+
+            missing_ids = episode_data.validate_entity_references()
+            if missing_ids:
+                logger.warning(f"Missing entity references in {category_key}: {missing_ids}")
+
+            episodes.append(RawEpisode(
+                name=f"City Services Data - {humanize_key(category_key)}",
+                content=episode_data.to_episode_content(),
+                source=EpisodeType.json,
+                source_description=f"Parsed from {SOURCE_FILE} - {category_key}",
+                reference_time=reference_time
+            ))
+
+        return episodes
+
+    def _walk(
+        self,
+        episode_data: TOPEpisodeData,
+        node: Dict[str, Any],
+        spec: Dict[str, Any],
+        parent_id: str,
+        entity_type: TOPEntityType,
+        category_key: str
+    ):
+        """Walk child objects, creating entities and linking them to the parent."""
+        for key, value in node.items():
+            if not isinstance(value, dict) or key in NESTED_PROPERTY_KEYS:
+                continue
+
+            if key in MERGE_INTO_PARENT_KEYS:
+                self._merge_into_parent(episode_data, parent_id, value)
+                continue
+
+            target_parent = PARENT_OVERRIDES.get(key, parent_id)
+
+            if self._is_grouping(value):
+                # Pure grouping objects (e.g. "additional_departments") are transparent
+                self._walk(episode_data, value, spec, target_parent, entity_type, category_key)
+                continue
+
+            entity = self._create_entity(episode_data, key, value, spec, entity_type, category_key)
+            relationship = spec["relationship"] if entity_type == spec["entity_type"] else TOPRelationshipType.PART_OF
+            episode_data.relationships.append(StructuredRelationship(
+                relationship_type=relationship,
+                source_entity=entity.top_id,
+                target_entity=target_parent,
+                source=entity.source,
+                confidence=ConfidenceLevel.HIGH,
+                valid_from=self.valid_from
+            ))
+
+            # Nested objects below an entity are its divisions
+            self._walk(episode_data, value, spec, entity.top_id, TOPEntityType.DIVISION, category_key)
+
+    def _create_entity(
+        self,
+        episode_data: TOPEpisodeData,
+        key: str,
+        value: Dict[str, Any],
+        spec: Dict[str, Any],
+        entity_type: TOPEntityType,
+        category_key: str
+    ) -> StructuredEntity:
+        """Create a structured entity from a JSON object."""
+        entity_name = humanize_key(key)
+        prefix = spec.get("name_prefix")
+        if prefix and not entity_name.startswith(prefix.split()[0]):
+            # Avoid "Tarrant County County Clerk"
+            if prefix.split()[-1] == entity_name.split()[0]:
+                entity_name = entity_name.split(" ", 1)[-1]
+            entity_name = f"{prefix} {entity_name}"
+
+        properties: Dict[str, Any] = {"entity_name": entity_name, "category": category_key}
+        for prop_key, prop_value in value.items():
+            if isinstance(prop_value, dict) and prop_key not in NESTED_PROPERTY_KEYS:
+                continue
+            if prop_key == "category_description":
+                properties.setdefault("description", prop_value)
+            else:
+                properties[prop_key] = prop_value
+
+        top_id = self._unique_top_id(episode_data, entity_type, entity_name)
+        source = next((value[k] for k in URL_KEYS if isinstance(value.get(k), str)), SOURCE_FILE)
+
+        entity = StructuredEntity(
+            entity_type=entity_type,
+            top_id=top_id,
+            properties=properties,
+            source=source,
+            confidence=ConfidenceLevel.HIGH,
+            valid_from=self.valid_from
+        )
+        episode_data.entities.append(entity)
+        return entity
+
+    def _merge_into_parent(self, episode_data: TOPEpisodeData, parent_id: str, value: Dict[str, Any]):
+        """Attach website/portal details to the parent entity's properties."""
+        parent = episode_data.get_entity_by_id(parent_id) or self._add_root(episode_data, parent_id)
+        if parent is None:
+            return
+        for prop_key, prop_value in value.items():
+            if prop_key == "url":
+                parent.properties["website"] = prop_value
+            else:
+                parent.properties.setdefault(prop_key, prop_value)
+        if isinstance(value.get("url"), str):
+            parent.source = value["url"]
+
+    def _add_referenced_roots(self, episode_data: TOPEpisodeData):
+        """Add jurisdiction entities referenced by the episode's relationships."""
+        # Roots can reference other roots (311 -> city -> county), so repeat until closed
+        missing_roots = True
+        while missing_roots:
+            missing_roots = [
+                top_id for top_id in episode_data.validate_entity_references()
+                if top_id in ROOT_ENTITIES
+            ]
+            for top_id in sorted(missing_roots):
+                self._add_root(episode_data, top_id)
+
+    def _add_root(self, episode_data: TOPEpisodeData, top_id: str) -> Optional[StructuredEntity]:
+        """Add a jurisdiction entity (and its own parent link) to the episode."""
+        if top_id not in ROOT_ENTITIES:
+            return None
+        existing = episode_data.get_entity_by_id(top_id)
+        if existing:
+            return existing
+
+        entity_type, entity_name = ROOT_ENTITIES[top_id]
+        entity = StructuredEntity(
+            entity_type=entity_type,
+            top_id=top_id,
+            properties={"entity_name": entity_name},
+            source=SOURCE_FILE,
+            confidence=ConfidenceLevel.HIGH,
+            valid_from=self.valid_from
+        )
+        episode_data.entities.insert(0, entity)
+
+        if top_id in ROOT_RELATIONSHIPS:
+            relationship_type, target_id = ROOT_RELATIONSHIPS[top_id]
+            episode_data.relationships.append(StructuredRelationship(
+                relationship_type=relationship_type,
+                source_entity=top_id,
+                target_entity=target_id,
+                source=SOURCE_FILE,
+                confidence=ConfidenceLevel.HIGH,
+                valid_from=self.valid_from
+            ))
+        return entity
+
+    def _unique_top_id(self, episode_data: TOPEpisodeData, entity_type: TOPEntityType, entity_name: str) -> str:
+        """Build a TOP ID for the entity, suffixing on collisions."""
+        type_slug = TOP_ID_TYPE_SLUGS.get(entity_type, slugify(entity_type.value))
+        base_id = f"fwtx:{type_slug}:{slugify(entity_name)}"
+        top_id = base_id
+        suffix = 2
+        while episode_data.get_entity_by_id(top_id):
+            top_id = f"{base_id}-{suffix}"
+            suffix += 1
+        return top_id
+
+    def _reference_time(self) -> datetime:
+        """Use the directory's last_updated date as the episode reference time."""
+        if self.valid_from:
+            try:
+                return datetime.fromisoformat(self.valid_from)
+            except ValueError:
+                logger.warning(f"Invalid last_updated date in {SOURCE_FILE}: {self.valid_from}")
+        return datetime.now()
+
+    @staticmethod
+    def _is_grouping(value: Dict[str, Any]) -> bool:
+        """A grouping object only contains other objects and no attributes."""
+        return bool(value) and all(isinstance(v, dict) for v in value.values())
@@ -0,0 +1,174 @@
+"""
+Lease-based leader election across API workers.
+
+Every worker competes for a Redis key in the FalkorDB instance with
+`SET key id NX PX ttl`. The holder renews the lease every third of its TTL
+and runs the singleton work (scheduler, startup data load); the others keep
+retrying at the same interval. If the leader dies its lease expires and a
+follower takes over within LEADER_LEASE_SECONDS plus one retry interval.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import uuid4
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Extend or delete the lease only while we still hold it
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class LeaderElection:
+    """Holds or competes for the leader lease and reports leadership changes."""
+
+    def __init__(
+        self,
+        redis,
+        key: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        on_elected: Optional[Callback] = None,
+        on_demoted: Optional[Callback] = None
+    ):
+        self.redis = redis
+        self.key = key or settings.LEADER_LOCK_KEY
+        self.lease_seconds = lease_seconds or settings.LEADER_LEASE_SECONDS
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        # Set once the first attempt has settled whether this worker leads
+        self.decided = asyncio.Event()
+        self._renewed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def interval(self) -> float:
+        return self.lease_seconds / 3
+
+    async def try_acquire(self) -> bool:
+        ttl_ms = int(self.lease_seconds * 1000)
+        return bool(await self.redis.set(self.key, self.identity, nx=True, px=ttl_ms))
+
+    async def renew(self) -> bool:
+        ttl_ms = int(self.lease_seconds * 1000)
+        return bool(await self.redis.eval(RENEW_SCRIPT, 1, self.key, self.identity, ttl_ms))
+
+    async def release(self):
+        await self.redis.eval(RELEASE_SCRIPT, 1, self.key, self.identity)
+
+    async def step(self):
+        """Renew or compete for the lease once."""
+        try:
+            held = await self.renew() if self.is_leader else await self.try_acquire()
+        except Exception as e:
+            logger.warning(f"Leader lease check failed: {e}")
+            # Without Redis we can't renew; step down once the lease may have lapsed
+            held = self.is_leader and time.monotonic() - self._renewed_at < self.lease_seconds
+
+        if held:
+            self._renewed_at = time.monotonic()
+            if not self.is_leader:
+                self.is_leader = True
+                logger.info(f"Elected sync leader ({self.identity})")
+                await self._notify(self.on_elected)
+        elif self.is_leader:
+            self.is_leader = False
+            logger.warning(f"Lost sync leadership ({self.identity})")
+            await self._notify(self.on_demoted)
+        self.decided.set()
+
+    async def _notify(self, callback: Optional[Callback]):
+        if callback:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Leadership callback failed: {e}")
+
+    async def _run(self):
+        while True:
+            await self.step()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop competing and hand the lease over immediately."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            await self._notify(self.on_demoted)
+            try:
+                await self.release()
+            except Exception as e:
+                logger.warning(f"Failed to release the leader lease: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "identity": self.identity,
+            "is_leader": self.is_leader,
+            "lease_seconds": self.lease_seconds,
+        }
+
+
+# Election for this worker, set once the app starts competing
+sync_leader: Optional[LeaderElection] = None
+
+
+def start_sync_leader(on_elected: Callback, on_demoted: Callback) -> LeaderElection:
+    """Compete for sync leadership over the FalkorDB connection."""
+    global sync_leader
+    from src.db.falkor import falkor_driver
+
+    sync_leader = LeaderElection(falkor_driver.client.connection, on_elected=on_elected, on_demoted=on_demoted)
+    sync_leader.start()
+    return sync_leader
+
+
+async def stop_sync_leader():
+    """Stop competing, releasing the lease if this worker holds it."""
+    if sync_leader:
+        await sync_leader.stop()
+
+
+def sync_leader_decided() -> bool:
+    """Whether this worker's first election attempt has settled."""
+    return sync_leader is not None and sync_leader.decided.is_set()
+
+
+async def wait_for_leadership_decision():
+    """Wait until this worker knows whether it leads; returns at once without an election."""
+    if sync_leader:
+        await sync_leader.decided.wait()
+
+
+def get_leader_status() -> Optional[Dict[str, Any]]:
+    return sync_leader.status() if sync_leader else None
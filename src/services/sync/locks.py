@@ -0,0 +1,99 @@
+"""
+Cross-worker sync locks.
+
+The SyncCoordinator keeps sync types from overlapping within one worker, but
+a manual sync triggered on a follower runs on that follower's own
+coordinator while the leader may be running a scheduled one. Before a run
+starts, the coordinator takes a Redis lease for each sync type it conflicts
+with, so conflicting runs on different workers wait for each other. Leases
+are renewed while the run lasts and expire on their own if the worker dies.
+
+Renewal runs on the event loop, so sync functions must keep blocking work
+such as agent team runs in worker threads; a loop blocked for longer than
+the lease lets the lock lapse and another worker's run start.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Iterable, List, Optional
+from uuid import uuid4
+
+from src.config import settings
+from src.services.sync.leader import RELEASE_SCRIPT, RENEW_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+
+SYNC_LOCK_PREFIX = "fwtx:sync-lock"
+
+
+class SyncLock:
+    """Redis leases on sync types, held for the length of a sync run."""
+
+    def __init__(self, redis, prefix: str = SYNC_LOCK_PREFIX, lease_seconds: Optional[float] = None):
+        self.redis = redis
+        self.prefix = prefix
+        self.lease_seconds = lease_seconds or settings.LEADER_LEASE_SECONDS
+
+    @property
+    def interval(self) -> float:
+        return self.lease_seconds / 3
+
+    def _keys(self, sync_types: Iterable[str]) -> List[str]:
+        # A fixed order, and all-or-nothing acquisition, so workers never deadlock
+        return [f"{self.prefix}:{sync_type}" for sync_type in sorted(set(sync_types))]
+
+    async def _acquire(self, keys: List[str], token: str) -> bool:
+        ttl_ms = int(self.lease_seconds * 1000)
+        acquired = []
+        for key in keys:
+            if not await self.redis.set(key, token, nx=True, px=ttl_ms):
+                await self._release(acquired, token)
+                return False
+            acquired.append(key)
+        return True
+
+    async def _release(self, keys: List[str], token: str):
+        for key in keys:
+            await self.redis.eval(RELEASE_SCRIPT, 1, key, token)
+
+    async def _renew(self, keys: List[str], token: str):
+        ttl_ms = int(self.lease_seconds * 1000)
+        while True:
+            await asyncio.sleep(self.interval)
+            for key in keys:
+                try:
+                    if not await self.redis.eval(RENEW_SCRIPT, 1, key, token, ttl_ms):
+                        logger.warning(f"Lost the sync lock {key}")
+                except Exception as e:
+                    logger.warning(f"Failed to renew the sync lock {key}: {e}")
+
+    @asynccontextmanager
+    async def hold(self, sync_types: Iterable[str]):
+        """Wait until no other worker holds any of the sync types, then hold them all."""
+        keys = self._keys(sync_types)
+        token = uuid4().hex
+        waiting = False
+        while not await self._acquire(keys, token):
+            if not waiting:
+                logger.info(f"Waiting for another worker's sync to release {', '.join(keys)}")
+                waiting = True
+            await asyncio.sleep(self.interval)
+
+        renewal = asyncio.create_task(self._renew(keys, token))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            try:
+                await self._release(keys, token)
+            except Exception as e:
+                logger.warning(f"Failed to release sync locks, they expire in {self.lease_seconds}s: {e}")
+
+
+def create_sync_lock() -> SyncLock:
+    """A sync lock over the FalkorDB connection shared by all workers."""
+    from src.db.falkor import falkor_driver
+
+    return SyncLock(falkor_driver.client.connection)
@@ -0,0 +1,89 @@
+"""
+Content-hash manifest for incremental file sync.
+
+The manifest records, per data file, the hash of the file and the hashes of
+the chunks that were successfully ingested, so later syncs only re-extract
+and re-ingest new or changed content.
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.services.sync.state import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def content_hash(content: str) -> str:
+    """Hash a piece of text content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class SyncManifest:
+    """Tracks which files and chunks have already been ingested."""
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        self.state = JsonStateFile(MANIFEST_FILE, state_dir)
+        self.files: Dict[str, Dict] = self.state.data.setdefault("files", {})
+
+    def file_unchanged(self, file_name: str, file_hash: str) -> bool:
+        """True if the file was fully ingested with this exact content."""
+        entry = self.files.get(file_name)
+        return bool(entry) and entry.get("hash") == file_hash
+
+    def known_chunks(self, file_name: str) -> Set[str]:
+        """Hashes of chunks of this file that were already ingested."""
+        return set(self.files.get(file_name, {}).get("chunks", []))
+
+    def record(self, file_name: str, file_hash: str, chunk_hashes: Iterable[str], complete: bool):
+        """
+        Record ingested chunks for a file.
+
+        The file hash is only stored when every current chunk was ingested,
+        so partially failed files are retried on the next sync.
+        """
+        entry = self.files.setdefault(file_name, {})
+        entry["chunks"] = sorted(set(chunk_hashes))
+        entry["hash"] = file_hash if complete else None
+        entry["synced_at"] = datetime.now().isoformat()
+
+    def save(self):
+        self.state.save()
+
+
+class FileSyncPlan:
+    """Bookkeeping for one file during a sync run."""
+
+    def __init__(self, file_name: str, file_hash: str, known_chunks: Set[str]):
+        self.file_name = file_name
+        self.file_hash = file_hash
+        self.known_chunks = known_chunks
+        self.current_chunks: List[str] = []
+        self.completed_chunks: Set[str] = set()
+
+    def register(self, chunk_hash: str):
+        """Record a chunk as part of the file's current content."""
+        self.current_chunks.append(chunk_hash)
+
+    def is_new(self, chunk_hash: str) -> bool:
+        """Register a current chunk and report whether it still needs ingesting."""
+        self.register(chunk_hash)
+        return chunk_hash not in self.known_chunks
+
+    def mark_completed(self, chunk_hash: str):
+        self.completed_chunks.add(chunk_hash)
+
+    @property
+    def ingested_chunks(self) -> Set[str]:
+        """Current chunks that are in the graph after this run."""
+        return {h for h in self.current_chunks if h in self.known_chunks or h in self.completed_chunks}
+
+    @property
+    def complete(self) -> bool:
+        return len(self.ingested_chunks) == len(set(self.current_chunks))
@@ -0,0 +1,138 @@
+"""
+Streaming PDF text extraction for Fort Worth data files.
+
+Pages are read lazily in batches, extracted in a process pool and written to
+an on-disk cache keyed by the file's content hash, so unchanged PDFs are never
+extracted twice and large PDFs are never held in memory all at once.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+HASH_BLOCK_SIZE = 1 << 20
+
+PDF_CACHE_SUBDIR = "pdf_text"
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file's content without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract text for pages [start, end). Runs in a worker process."""
+    reader = PdfReader(path)
+    pages = []
+    for page_number in range(start, end):
+        try:
+            text = reader.pages[page_number].extract_text() or ""
+        except Exception as e:
+            logger.warning(f"Failed to extract page {page_number + 1} of {path}: {e}")
+            text = ""
+        pages.append((page_number + 1, text))
+    return pages
+
+
+class PDFTextExtractor:
+    """Extracts PDF text page by page with a content-hash cache."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        batch_pages: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.cache_dir = Path(cache_dir or Path(settings.SYNC_STATE_DIR) / PDF_CACHE_SUBDIR)
+        self.batch_pages = batch_pages or settings.SYNC_PDF_PAGE_BATCH
+        self.max_workers = max_workers or settings.SYNC_PDF_WORKERS
+
+    def cache_path(self, file_hash: str) -> Path:
+        """Location of the cached text for a PDF with the given hash."""
+        return self.cache_dir / f"{file_hash}.jsonl.gz"
+
+    def extract(self, path: Path, file_hash: Optional[str] = None) -> Path:
+        """
+        Ensure the PDF's text is cached and return the cache file path.
+
+        Extraction is skipped entirely when a cache entry for the file's
+        content hash already exists.
+        """
+        file_hash = file_hash or file_sha256(path)
+        cache_path = self.cache_path(file_hash)
+        if cache_path.exists():
+            logger.info(f"Using cached text for {path.name} ({file_hash[:12]})")
+            return cache_path
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        page_count = len(PdfReader(str(path)).pages)
+        logger.info(f"Extracting {page_count} pages from {path.name}")
+
+        # Write to a temporary file so interrupted extractions are never cached
+        tmp_path = cache_path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as cache_file:
+            for page_number, text in self._extract_pages(path, page_count):
+                cache_file.write(json.dumps({"page": page_number, "text": text}) + "\n")
+        os.replace(tmp_path, cache_path)
+
+        logger.info(f"Cached extracted text for {path.name} at {cache_path.name}")
+        return cache_path
+
+    def iter_pages(self, path: Path, file_hash: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (page_number, text) for every page, extracting if needed."""
+        yield from self.iter_cached_pages(self.extract(path, file_hash))
+
+    @staticmethod
+    def iter_cached_pages(cache_path: Path) -> Iterator[Tuple[int, str]]:
+        """Stream pages back from a cache file."""
+        with gzip.open(cache_path, "rt", encoding="utf-8") as cache_file:
+            for line in cache_file:
+                page = json.loads(line)
+                yield page["page"], page["text"]
+
+    def _extract_pages(self, path: Path, page_count: int) -> Iterator[Tuple[int, str]]:
+        """Extract pages in order, using a process pool for multi-batch PDFs."""
+        batches = [
+            (start, min(start + self.batch_pages, page_count))
+            for start in range(0, page_count, self.batch_pages)
+        ]
+
+        # Small PDFs are not worth the process start-up cost
+        if len(batches) <= 1 or self.max_workers <= 1:
+            for start, end in batches:
+                yield from _extract_page_range(str(path), start, end)
+            return
+
+        # Keep a bounded number of batches in flight so memory stays flat
+        max_in_flight = self.max_workers * 2
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as pool:
+            pending = deque()
+            batch_iter = iter(batches)
+            for start, end in batch_iter:
+                pending.append(pool.submit(_extract_page_range, str(path), start, end))
+                if len(pending) >= max_in_flight:
+                    break
+            while pending:
+                yield from pending.popleft().result()
+                next_batch = next(batch_iter, None)
+                if next_batch:
+                    pending.append(pool.submit(_extract_page_range, str(path), *next_batch))
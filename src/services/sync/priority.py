@@ -0,0 +1,198 @@
+"""
+Priority-driven refresh of watched sources.
+
+fwtx.json tags sources with a crawl_priority and recommends a refresh
+frequency per priority. Each hour, sources whose interval has elapsed are
+picked in priority order: high-priority sources at any hour, medium-priority
+ones during the off-peak window, and low-priority ones only in their own
+off-peak hour, so they spread across nights instead of landing together.
+Every research task is charged an estimate against a global tokens-per-hour
+budget up front, and the estimate is replaced by the tokens the refresh
+actually spent once it finishes, so refresh cost stays bounded however many
+sources fall due.
+"""
+
+import hashlib
+import json
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from src.config import settings
+from src.services.sync.change_detector import PRIORITIES, WatchedSource
+from src.services.sync.state import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_STATE_FILE = "priority_schedule.json"
+
+FREQUENCY_DAYS = {"daily": 1, "weekly": 7, "bi-weekly": 14, "biweekly": 14, "monthly": 30}
+DEFAULT_INTERVAL_DAYS = {"high": 7, "medium": 14, "low": 30}
+
+
+def refresh_intervals(fwtx_path: Optional[Path] = None) -> Dict[str, timedelta]:
+    """Refresh interval per priority from fwtx.json's recommended_crawl_frequency."""
+    fwtx_path = fwtx_path or Path(settings.BASE_DIR) / "data" / "fwtx.json"
+    try:
+        with open(fwtx_path) as f:
+            recommended = json.load(f).get("crawling_configuration", {}).get("recommended_crawl_frequency", {})
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Using default refresh intervals: {e}")
+        recommended = {}
+
+    intervals = {}
+    for priority in PRIORITIES:
+        frequency = str(recommended.get(f"{priority}_priority", "")).lower()
+        intervals[priority] = timedelta(days=FREQUENCY_DAYS.get(frequency, DEFAULT_INTERVAL_DAYS[priority]))
+    return intervals
+
+
+def parse_hours(spec: str) -> List[int]:
+    """'22-6' -> [22, 23, 0, ..., 5]; ranges are end-exclusive and may be comma separated."""
+    hours: List[int] = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        if "-" in part:
+            start, end = (int(v) % 24 for v in part.split("-", 1))
+            hour = start
+            while True:
+                hours.append(hour)
+                hour = (hour + 1) % 24
+                if hour == end:
+                    break
+        else:
+            hours.append(int(part) % 24)
+    return sorted(set(hours))
+
+
+class HourlyTokenBudget:
+    """Tokens spent over the last hour against a fixed allowance."""
+
+    def __init__(self, tokens_per_hour: int):
+        self.tokens_per_hour = tokens_per_hour
+        # [recorded at, tokens] entries; a reservation's tokens change when it is settled
+        self._spent: Deque[List[Any]] = deque()
+
+    def spent(self, now: Optional[datetime] = None) -> int:
+        cutoff = (now or datetime.now()) - timedelta(hours=1)
+        while self._spent and self._spent[0][0] <= cutoff:
+            self._spent.popleft()
+        return sum(tokens for _, tokens in self._spent)
+
+    def remaining(self, now: Optional[datetime] = None) -> int:
+        return max(0, self.tokens_per_hour - self.spent(now))
+
+    def record(self, tokens: int, now: Optional[datetime] = None) -> List[Any]:
+        entry = [now or datetime.now(), tokens]
+        self._spent.append(entry)
+        return entry
+
+    def settle(self, entry: List[Any], tokens: int):
+        """Replace a recorded estimate with the tokens actually spent, keeping its time."""
+        entry[1] = tokens
+
+
+class PrioritySchedule:
+    """Decides which watched sources to refresh each hour."""
+
+    def __init__(
+        self,
+        intervals: Optional[Dict[str, timedelta]] = None,
+        off_peak_hours: Optional[List[int]] = None,
+        budget: Optional[HourlyTokenBudget] = None,
+        task_tokens: Optional[int] = None,
+        state_dir: Optional[Path] = None
+    ):
+        self.intervals = intervals or refresh_intervals()
+        self.off_peak_hours = off_peak_hours if off_peak_hours is not None else parse_hours(settings.SYNC_OFF_PEAK_HOURS)
+        self.budget = budget or HourlyTokenBudget(settings.SYNC_TOKENS_PER_HOUR)
+        self.task_tokens = task_tokens or settings.SYNC_RESEARCH_TASK_TOKENS
+        self.state = JsonStateFile(PRIORITY_STATE_FILE, state_dir)
+        self.refreshed: Dict[str, str] = self.state.data.setdefault("refreshed", {})
+        # Source URL -> the budget entry its research was reserved in
+        self._reservations: Dict[str, List[Any]] = {}
+
+    def off_peak_slot(self, source: WatchedSource) -> Optional[int]:
+        """The off-peak hour a low-priority source is refreshed in, stable per URL."""
+        if not self.off_peak_hours:
+            return None
+        digest = int(hashlib.sha256(source.url.encode("utf-8")).hexdigest(), 16)
+        return self.off_peak_hours[digest % len(self.off_peak_hours)]
+
+    def in_window(self, source: WatchedSource, now: datetime) -> bool:
+        if source.priority == "high" or not self.off_peak_hours:
+            return True
+        if source.priority == "medium":
+            return now.hour in self.off_peak_hours
+        return now.hour == self.off_peak_slot(source)
+
+    def overdue(self, source: WatchedSource, now: datetime) -> Optional[float]:
+        """How many intervals have passed since the last refresh, or None if not due."""
+        last = self.refreshed.get(source.url)
+        if last is None:
+            return float("inf")
+        ratio = (now - datetime.fromisoformat(last)) / self.intervals[source.priority]
+        return ratio if ratio >= 1 else None
+
+    def select(self, sources: Iterable[WatchedSource], now: Optional[datetime] = None) -> List[WatchedSource]:
+        """Due sources in their window, most important and most overdue first, within budget."""
+        now = now or datetime.now()
+        due = []
+        for source in sources:
+            overdue = self.overdue(source, now)
+            if overdue is not None and self.in_window(source, now):
+                due.append((PRIORITIES.index(source.priority), -overdue, source))
+        due.sort(key=lambda item: item[:2])
+        return self.reserve([source for _, _, source in due], now)
+
+    def reserve(self, sources: List[WatchedSource], now: Optional[datetime] = None) -> List[WatchedSource]:
+        """
+        Charge research for as many sources as the hourly budget allows.
+
+        Sources are taken in the given order; the rest wait for a later hour.
+        """
+        affordable = self.budget.remaining(now) // self.task_tokens
+        selected = sources[:affordable]
+        if len(selected) < len(sources):
+            logger.info(f"Token budget covers {len(selected)} of {len(sources)} due sources this hour")
+        if selected:
+            entry = self.budget.record(len(selected) * self.task_tokens, now)
+            for source in selected:
+                self._reservations[source.url] = entry
+        return selected
+
+    def settle(self, sources: Iterable[WatchedSource], tokens: int, now: Optional[datetime] = None):
+        """
+        Charge the tokens a refresh actually spent in place of its reservation.
+
+        Sources refreshed together were reserved together, so their reservation
+        takes the whole spend; sources reserved separately are settled to zero.
+        """
+        entries = []
+        for source in sources:
+            entry = self._reservations.pop(source.url, None)
+            if entry is not None and not any(entry is seen for seen in entries):
+                entries.append(entry)
+        if not entries:
+            self.budget.record(tokens, now)
+            return
+        self.budget.settle(entries[0], tokens)
+        for entry in entries[1:]:
+            self.budget.settle(entry, 0)
+
+    def mark_refreshed(self, sources: Iterable[WatchedSource], now: Optional[datetime] = None):
+        timestamp = (now or datetime.now()).isoformat()
+        for source in sources:
+            self.refreshed[source.url] = timestamp
+        self.state.save()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "tokens_per_hour": self.budget.tokens_per_hour,
+            "tokens_spent_last_hour": self.budget.spent(),
+            "off_peak_hours": self.off_peak_hours,
+            "interval_days": {priority: interval.days for priority, interval in self.intervals.items()},
+            "sources_refreshed": len(self.refreshed),
+        }
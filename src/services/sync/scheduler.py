@@ -11,25 +11,85 @@ from datetime import datetime, timedelta
 from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from graphiti_core.utils.datetime_utils import utc_now
 
-from src.services.graphiti.index import graphiti
+from src.config import settings
+from src.services.graphiti.index import get_graphiti
+from src.services.graphiti.communities import update_communities
+from src.services.graphiti.ingest import ingest_episodes
+from src.services.jobs.queue import (
+    FINISHED_STATUSES,
+    STAGE_COMMUNITIES,
+    STAGE_INGEST,
+    STAGE_RESEARCH,
+    get_job_queue,
+    job_stage
+)
+from src.services.sync.change_detector import PRIORITIES, SourceChangeDetector, load_watched_sources
+from src.services.sync.priority import PrioritySchedule
+from src.services.sync.coordinator import SyncCoordinator
+from src.services.sync.locks import create_sync_lock
+from src.services.sync.leader import get_leader_status
 from src.services.sync.fort_worth_data import FortWorthDataSync
 from src.services.sync.data_loader import DataLoader, load_and_sync_all_data
 from src.services.sync.top_loader import TOPDataLoader
+from src.services.agent.budget import get_budget_manager
+from src.services.llm.rate_limit import background_priority, get_rate_limiter
 from src.services.agent.researcher import FortWorthResearchWorkflow
 
 logger = logging.getLogger(__name__)
 
 
+SYNC_INCREMENTAL = "incremental"
+SYNC_DAILY = "daily"
+SYNC_FULL = "full"
+
+# Manual sync types and the coordinated sync that performs them
+MANUAL_SYNC_TYPES = {
+    "full": SYNC_FULL,
+    "incremental": SYNC_INCREMENTAL,
+    "services": SYNC_INCREMENTAL,
+    "governance": SYNC_INCREMENTAL,
+}
+
+# Scheduled jobs never overlap themselves; runs missed while the app was
+# down or busy collapse into one run within the grace period
+JOB_DEFAULTS = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 3600}
+
+
 class DataSyncScheduler:
     """Manages scheduled data synchronization tasks."""
     
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
-        self.sync_service = FortWorthDataSync(graphiti)
-        self.research_workflow = FortWorthResearchWorkflow(graphiti)
+        self.graphiti = get_graphiti()
+        self.sync_service = FortWorthDataSync(self.graphiti)
+        self.research_workflow = FortWorthResearchWorkflow(self.graphiti)
+        self.change_detector = SourceChangeDetector()
+        self.priority_schedule = PrioritySchedule()
+        self.urgent_update_job = None
+        self.priority_refresh_job = None
         self.is_running = False
         
+        # Incremental < daily < full: each covers the work of the ones before it.
+        # With several workers, a manual sync on a follower waits for the leader's syncs
+        self.coordinator = SyncCoordinator(lock=create_sync_lock() if settings.LEADER_ELECTION_ENABLED else None)
+        self.coordinator.register(SYNC_INCREMENTAL, self._budgeted(SYNC_INCREMENTAL, self._incremental_sync))
+        self.coordinator.register(SYNC_DAILY, self._budgeted(SYNC_DAILY, self._daily_sync), supersedes=[SYNC_INCREMENTAL])
+        self.coordinator.register(
+            SYNC_FULL,
+            self._budgeted(SYNC_FULL, self._full_sync),
+            supersedes=[SYNC_DAILY, SYNC_INCREMENTAL]
+        )
+    
+    @staticmethod
+    def _budgeted(sync_type, sync_function):
+        """Account the LLM usage of a sync to its own budget run."""
+        async def run(absorbed):
+            with get_budget_manager().track_run(f"{sync_type} sync"), background_priority():
+                return await sync_function(absorbed)
+        return run
+        
     def start(self):
         """Start the scheduler with configured jobs."""
         if self.is_running:
@@ -43,7 +103,8 @@ class DataSyncScheduler:
                 CronTrigger(hour=2, minute=0),
                 id='daily_sync',
                 name='Daily Fort Worth Data Sync',
-                replace_existing=True
+                replace_existing=True,
+                **JOB_DEFAULTS
             )
             
             # Weekly full sync on Sundays at 3 AM
@@ -52,7 +113,8 @@ class DataSyncScheduler:
                 CronTrigger(day_of_week='sun', hour=3, minute=0),
                 id='weekly_full_sync',
                 name='Weekly Full Data Sync',
-                replace_existing=True
+                replace_existing=True,
+                **JOB_DEFAULTS
             )
             
             # Hourly check for urgent updates
@@ -61,7 +123,18 @@ class DataSyncScheduler:
                 CronTrigger(minute=0),  # Every hour
                 id='hourly_check',
                 name='Hourly Urgent Update Check',
-                replace_existing=True
+                replace_existing=True,
+                **JOB_DEFAULTS
+            )
+            
+            # Hourly refresh of sources due by crawl_priority, offset from the urgent check
+            self.scheduler.add_job(
+                self._run_priority_refresh,
+                CronTrigger(minute=30),
+                id='priority_refresh',
+                name='Hourly Priority Source Refresh',
+                replace_existing=True,
+                **JOB_DEFAULTS
             )
             
             self.scheduler.start()
@@ -80,99 +153,203 @@ class DataSyncScheduler:
             logger.info("Data sync scheduler stopped")
     
     async def _run_daily_sync(self):
-        """Run daily incremental sync with live data."""
-        logger.info("Starting daily live data sync...")
+        """Scheduled daily sync."""
         try:
-            # First ensure TOP base data is present
-            top_loader = TOPDataLoader(graphiti)
-            await top_loader.sync_to_graphiti()
-            
-            # Then sync from all sources
-            await load_and_sync_all_data(graphiti)
-                    
-            logger.info("Daily sync completed successfully")
+            await self.coordinator.request(SYNC_DAILY)
         except Exception as e:
             logger.error(f"Daily sync failed: {e}")
     
     async def _run_weekly_full_sync(self):
+        """Scheduled weekly full sync."""
+        try:
+            await self.coordinator.request(SYNC_FULL)
+        except Exception as e:
+            logger.error(f"Weekly full sync failed: {e}")
+    
+    async def _incremental_sync(self, absorbed):
+        """Sync changed files from the data directory."""
+        await load_and_sync_all_data(self.graphiti)
+    
+    async def _daily_sync(self, absorbed):
+        """Run daily incremental sync with live data."""
+        logger.info("Starting daily live data sync...")
+        # First ensure TOP base data is present
+        top_loader = TOPDataLoader(self.graphiti)
+        await top_loader.sync_to_graphiti()
+        
+        # Then sync from all sources
+        await load_and_sync_all_data(self.graphiti)
+        
+        logger.info("Daily sync completed successfully")
+    
+    async def _full_sync(self, absorbed):
         """Run weekly full sync with comprehensive research."""
         logger.info("Starting weekly full sync...")
-        try:
-            # Get all data fetch tasks
-            fetch_tasks = await self.sync_service.run_live_data_fetch()
-            
-            # Add additional comprehensive research tasks
-            comprehensive_tasks = [
-                {
-                    "name": "Recent City Council Meetings",
-                    "config": {
-                        "search_queries": [
-                            "Fort Worth city council meeting minutes 2024",
-                            "Fort Worth city council agenda recent",
-                            "Fort Worth city council decisions ordinances"
-                        ],
-                        "data_needed": [
-                            "recent_decisions",
-                            "new_ordinances",
-                            "policy_changes",
-                            "budget_amendments"
-                        ]
-                    }
-                },
-                {
-                    "name": "City Projects and Initiatives",
-                    "config": {
-                        "search_queries": [
-                            "Fort Worth capital projects 2024",
-                            "Fort Worth city initiatives programs",
-                            "Fort Worth infrastructure improvements"
-                        ],
-                        "data_needed": [
-                            "project_names",
-                            "project_budgets",
-                            "timelines",
-                            "responsible_departments"
-                        ]
-                    }
+        
+        # Cover the queued syncs this run replaced
+        if SYNC_DAILY in absorbed:
+            await self._daily_sync(absorbed)
+        elif SYNC_INCREMENTAL in absorbed:
+            await self._incremental_sync(absorbed)
+        
+        # Get all data fetch tasks
+        fetch_tasks = await self.sync_service.run_live_data_fetch()
+        
+        # Add additional comprehensive research tasks
+        comprehensive_tasks = [
+            {
+                "name": "Recent City Council Meetings",
+                "config": {
+                    "search_queries": [
+                        "Fort Worth city council meeting minutes 2024",
+                        "Fort Worth city council agenda recent",
+                        "Fort Worth city council decisions ordinances"
+                    ],
+                    "data_needed": [
+                        "recent_decisions",
+                        "new_ordinances",
+                        "policy_changes",
+                        "budget_amendments"
+                    ]
                 }
-            ]
-            
-            all_tasks = fetch_tasks + comprehensive_tasks
-            
-            # Process all tasks with research workflow
+            },
+            {
+                "name": "City Projects and Initiatives",
+                "config": {
+                    "search_queries": [
+                        "Fort Worth capital projects 2024",
+                        "Fort Worth city initiatives programs",
+                        "Fort Worth infrastructure improvements"
+                    ],
+                    "data_needed": [
+                        "project_names",
+                        "project_budgets",
+                        "timelines",
+                        "responsible_departments"
+                    ]
+                }
+            }
+        ]
+        
+        all_tasks = fetch_tasks + comprehensive_tasks
+        
+        # Process all tasks with research workflow
+        async with job_stage(STAGE_RESEARCH):
             episodes = await self.research_workflow.research_all_tasks(all_tasks)
+        
+        if episodes:
+            sync_started = utc_now()
+            async with job_stage(STAGE_INGEST):
+                ingested = await ingest_episodes(self.graphiti, episodes)
+            logger.info(f"Added {len(ingested)} new episodes from comprehensive research")
             
-            if episodes:
-                await self.graphiti.add_episode_bulk(episodes)
-                logger.info(f"Added {len(episodes)} episodes from comprehensive research")
-                    
-            logger.info("Weekly full sync completed successfully")
-        except Exception as e:
-            logger.error(f"Weekly full sync failed: {e}")
+            # Also performs the periodic full community rebuild when it is due
+            async with job_stage(STAGE_COMMUNITIES):
+                await update_communities(self.graphiti, since=sync_started)
+                
+        logger.info("Weekly full sync completed successfully")
     
     async def _check_urgent_updates(self):
-        """Check for urgent updates that need immediate sync."""
-        # This would check for critical updates like emergency ordinances
-        # For now, it's a placeholder
+        """Queue targeted research for watched sources whose content changed."""
+        if self.urgent_update_job and self.urgent_update_job.status not in FINISHED_STATUSES:
+            logger.info("Previous urgent update is still running - skipping this check")
+            return
+        
         logger.debug("Checking for urgent updates...")
+        sources = load_watched_sources(self.sync_service.base_urls)
+        changes = await self.change_detector.check(sources)
+        
+        # Changed sources share the refresh token budget, most important first;
+        # the ones it doesn't cover stay changed and are picked up next hour
+        changes.sort(key=lambda change: PRIORITIES.index(change.source.priority))
+        affordable = {source.url for source in self.priority_schedule.reserve([c.source for c in changes])}
+        changes = [change for change in changes if change.source.url in affordable]
+        if not changes:
+            return
+        
+        logger.info(f"Changed sources: {', '.join(change.source.name for change in changes)}")
+        self.urgent_update_job = await get_job_queue().submit(
+            "urgent_update",
+            lambda: self._refresh_changed_sources(changes),
+            params={"sources": [change.source.url for change in changes]}
+        )
+    
+    async def _refresh_changed_sources(self, changes):
+        """Refresh changed sources, then record their new content as seen."""
+        result = await self._refresh_sources([change.source for change in changes], "urgent update")
+        # Sources whose research failed stay changed and are retried next hour
+        self.change_detector.commit(change for change in changes if change.source.url in result["refreshed"])
+        return result
+    
+    async def _run_priority_refresh(self):
+        """Queue research for the sources due by crawl_priority this hour."""
+        if self.priority_refresh_job and self.priority_refresh_job.status not in FINISHED_STATUSES:
+            logger.info("Previous priority refresh is still running - skipping this hour")
+            return
+        
+        sources = self.priority_schedule.select(load_watched_sources(self.sync_service.base_urls))
+        if not sources:
+            return
+        
+        logger.info(f"Refreshing {len(sources)} sources due by priority")
+        self.priority_refresh_job = await get_job_queue().submit(
+            "priority_refresh",
+            lambda: self._refresh_sources(sources, "priority refresh"),
+            params={"sources": [source.url for source in sources]}
+        )
+    
+    async def _refresh_sources(self, sources, run_name: str):
+        """Refresh watched sources, charging what they spent to the hourly budget."""
+        with get_budget_manager().track_run(run_name) as run:
+            try:
+                return await self._research_and_ingest(sources)
+            finally:
+                self.priority_schedule.settle(sources, run.totals["input_tokens"] + run.totals["output_tokens"])
+    
+    async def _research_and_ingest(self, sources):
+        """Research and ingest watched sources, recording the ones refreshed."""
+        async with job_stage(STAGE_RESEARCH):
+            results = await self.research_workflow.research_each_task(
+                [source.research_task() for source in sources]
+            )
+        
+        refreshed = [source for source, episodes in zip(sources, results) if episodes is not None]
+        episodes = [episode for result in results if result for episode in result]
+        
+        ingested = []
+        if episodes:
+            sync_started = utc_now()
+            async with job_stage(STAGE_INGEST):
+                ingested = await ingest_episodes(self.graphiti, episodes)
+            async with job_stage(STAGE_COMMUNITIES):
+                await update_communities(self.graphiti, since=sync_started)
+        
+        self.priority_schedule.mark_refreshed(refreshed)
+        return {
+            "refreshed": [source.url for source in refreshed],
+            "failed": [source.url for source in sources if source not in refreshed],
+            "episodes_created": len(ingested),
+        }
     
     async def trigger_manual_sync(self, sync_type: str = "incremental"):
-        """Manually trigger a sync operation."""
+        """
+        Manually trigger a sync operation.
+        
+        The request waits for the coordinated run that handles it, which may
+        be an already queued run of the same type or a full sync that covers it.
+        """
         logger.info(f"Manual {sync_type} sync triggered")
         
         try:
-            if sync_type == "full":
-                await self._run_weekly_full_sync()
-            elif sync_type == "services":
-                await load_and_sync_all_data(graphiti)
-            elif sync_type == "governance":
-                await load_and_sync_all_data(graphiti)
-            else:
-                # Default incremental sync
-                await load_and_sync_all_data(graphiti)
-                
+            outcome = await self.coordinator.request(MANUAL_SYNC_TYPES.get(sync_type, SYNC_INCREMENTAL))
             logger.info(f"Manual {sync_type} sync completed")
-            return {"status": "success", "sync_type": sync_type, "timestamp": datetime.now().isoformat()}
+            return {
+                "status": "success",
+                "sync_type": sync_type,
+                "handled_by": outcome["handled_by"],
+                "merged": outcome["merged"],
+                "timestamp": datetime.now().isoformat()
+            }
             
         except Exception as e:
             logger.error(f"Manual sync failed: {e}")
@@ -191,29 +368,42 @@ class DataSyncScheduler:
         
         return {
             "scheduler_running": self.is_running,
-            "jobs": jobs
+            "jobs": jobs,
+            "syncs": self.coordinator.status(),
+            "leader": get_leader_status(),
+            "priority": self.priority_schedule.status(),
+            "budget": get_budget_manager().status(),
+            "openai_rate_limit": get_rate_limiter().status()
         }
 
 
-# Global scheduler instance
-scheduler = DataSyncScheduler()
+# Global scheduler instance, built on first use
+_scheduler: Optional[DataSyncScheduler] = None
+
+
+def get_sync_scheduler() -> DataSyncScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = DataSyncScheduler()
+    return _scheduler
 
 
 def start_sync_scheduler():
     """Start the global sync scheduler."""
-    scheduler.start()
+    get_sync_scheduler().start()
 
 
 def stop_sync_scheduler():
     """Stop the global sync scheduler."""
-    scheduler.stop()
+    if _scheduler is not None:
+        _scheduler.stop()
 
 
 async def manual_sync(sync_type: str = "incremental"):
     """Trigger a manual sync."""
-    return await scheduler.trigger_manual_sync(sync_type)
+    return await get_sync_scheduler().trigger_manual_sync(sync_type)
 
 
 def get_scheduler_status():
     """Get scheduler status."""
-    return scheduler.get_job_status()
\ No newline at end of file
+    return get_sync_scheduler().get_job_status()
\ No newline at end of file
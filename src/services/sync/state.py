@@ -0,0 +1,43 @@
+"""
+Local JSON state files for the sync pipeline.
+
+Sync bookkeeping (manifests, checkpoints, timestamps) is kept in small JSON
+files under SYNC_STATE_DIR and written atomically so a crash mid-write never
+leaves a corrupt state file behind.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JsonStateFile:
+    """A JSON document persisted atomically on disk."""
+
+    def __init__(self, name: str, state_dir: Optional[Path] = None):
+        self.path = Path(state_dir or settings.SYNC_STATE_DIR) / name
+        self.data: Dict[str, Any] = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable state file {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Write the state to disk via a temporary file and atomic rename."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -11,6 +11,7 @@ from datetime import datetime
 
 from graphiti_core.nodes import EpisodeType
 from graphiti_core.utils.bulk_utils import RawEpisode
+from graphiti_core.utils.datetime_utils import utc_now
 
 from src.models.top.structured import (
     TOPEpisodeData,
@@ -22,6 +23,8 @@ from src.models.top.structured import (
 )
 from src.models.ontology import add_episode as add_ontology_episode
 from src.services.agent.researcher import FortWorthResearchWorkflow
+from src.services.graphiti.communities import update_communities
+from src.services.graphiti.ingest import ingest_episodes
 
 logger = logging.getLogger(__name__)
 
@@ -159,16 +162,21 @@ class TOPDataLoader:
         
         episodes = await self.load_all_top_data()
         
-        if episodes:
-            await self.graphiti.add_episode_bulk(episodes)
-            logger.info(f"Successfully synced {len(episodes)} episodes to Graphiti")
+        if not episodes:
+            logger.warning("No episodes created for sync")
+            return
+        
+        sync_started = utc_now()
+        ingested = await ingest_episodes(self.graphiti, episodes)
+        if ingested:
+            logger.info(f"Successfully synced {len(ingested)} new episodes to Graphiti")
             
-            # Build communities
-            logger.info("Building communities...")
-            await self.graphiti.build_communities()
-            logger.info("Community building completed")
+            # Update communities for the entities this sync touched
+            logger.info("Updating communities...")
+            await update_communities(self.graphiti, since=sync_started)
+            logger.info("Community update completed")
         else:
-            logger.warning("No episodes created for sync")
+            logger.info("All episodes were already in the graph - nothing to sync")
 
 
 # Convenience function
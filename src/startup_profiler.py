@@ -0,0 +1,199 @@
+"""
+Startup profiling for the API process.
+
+With STARTUP_PROFILE=true, wiki.py calls start_profiling() before importing
+anything heavy. Every module imported by an import statement from then on is
+timed, both cumulatively and by its own time excluding the modules it pulls
+in (as python -X importtime reports it), and lifespan phases are timed with
+startup_phase(). Once startup has finished the report is logged: import time
+per top-level package, the slowest imports and the phase timings. Phases
+that end after the report, such as a Graphiti load still running, are logged
+as they finish.
+
+This module is imported before the settings are, so it reads its flags from
+the environment itself and only uses the standard library and dotenv.
+"""
+
+import asyncio
+import builtins
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+# Packages and modules listed in the report
+REPORT_TOP = 15
+
+
+def _enabled(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("1", "true", "yes")
+
+
+def _module_name(name: str, globals: Optional[Dict[str, Any]], level: int) -> str:
+    """The absolute name of the module an import statement loads."""
+    if level == 0 or not globals:
+        return name
+    package = globals.get("__package__") or globals.get("__name__", "")
+    try:
+        return importlib.util.resolve_name("." * level + name, package)
+    except (ImportError, ValueError):
+        return name
+
+
+class StartupProfiler:
+    """Times module imports and named startup phases."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.self_seconds: Dict[str, float] = {}
+        self.cumulative_seconds: Dict[str, float] = {}
+        self.import_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+        self.running: Set[str] = set()
+        self.startup_finished = False
+        self.reported = False
+        self._thread = threading.get_ident()
+        # Time spent in nested imports, one entry per import in progress
+        self._children: List[float] = []
+        self._original_import = None
+
+    def install(self):
+        """Start timing imports made by import statements on this thread."""
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None and builtins.__import__ == self._import:
+            builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = _module_name(name, globals, level)
+        if module in sys.modules or threading.get_ident() != self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            self.self_seconds[module] = self.self_seconds.get(module, 0.0) + elapsed - children
+            self.cumulative_seconds[module] = self.cumulative_seconds.get(module, 0.0) + elapsed
+            if self._children:
+                self._children[-1] += elapsed
+            else:
+                self.import_seconds += elapsed
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named startup phase."""
+        start = time.perf_counter()
+        self.running.add(name)
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+            self.running.discard(name)
+            if self.reported:
+                logger.info(f"Startup phase {name} took {self.phases[name]:.3f}s")
+            else:
+                self.maybe_report()
+
+    def finish_startup(self):
+        """Mark the lifespan's startup done; the report follows once running phases end."""
+        self.startup_finished = True
+        self.uninstall()
+        try:
+            # Let background tasks created during startup enter their phases first
+            asyncio.get_running_loop().call_soon(self.maybe_report)
+        except RuntimeError:
+            self.maybe_report()
+
+    def maybe_report(self):
+        if self.reported or not self.startup_finished or self.running:
+            return
+        self.reported = True
+        self.log_report()
+        path = os.getenv("STARTUP_PROFILE_PATH")
+        if path:
+            try:
+                with open(path, "w") as f:
+                    json.dump(self.report(), f, indent=2)
+            except OSError as e:
+                logger.warning(f"Failed to write startup profile to {path}: {e}")
+
+    def report(self) -> Dict[str, Any]:
+        packages: Dict[str, float] = {}
+        for module, seconds in self.self_seconds.items():
+            package = module.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + seconds
+        slowest_packages = sorted(packages.items(), key=lambda item: -item[1])[:REPORT_TOP]
+        slowest_modules = sorted(self.cumulative_seconds.items(), key=lambda item: -item[1])[:REPORT_TOP]
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "import_seconds": round(self.import_seconds, 3),
+            "modules_imported": len(self.self_seconds),
+            "packages": {package: round(seconds, 3) for package, seconds in slowest_packages},
+            "slowest_imports": {module: round(seconds, 3) for module, seconds in slowest_modules},
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        }
+
+    def log_report(self):
+        report = self.report()
+        lines = [
+            f"Startup profile: {report['total_seconds']:.3f}s total, "
+            f"{report['import_seconds']:.3f}s importing {report['modules_imported']} modules",
+            "  Phases: " + (", ".join(f"{name} {seconds:.3f}s" for name, seconds in report["phases"].items()) or "none"),
+            "  Import time by package: " + ", ".join(
+                f"{package} {seconds:.3f}s" for package, seconds in report["packages"].items()
+            ),
+            "  Slowest imports (with dependencies): " + ", ".join(
+                f"{module} {seconds:.3f}s" for module, seconds in report["slowest_imports"].items()
+            ),
+        ]
+        for line in lines:
+            logger.info(line)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def start_profiling():
+    """Start profiling if STARTUP_PROFILE is set; call before the heavy imports."""
+    global _profiler
+    # The settings haven't loaded .env yet
+    load_dotenv()
+    if _profiler is None and _enabled("STARTUP_PROFILE"):
+        _profiler = StartupProfiler()
+        _profiler.install()
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Time a startup phase; does nothing unless profiling."""
+    if _profiler is None:
+        yield
+        return
+    with _profiler.phase(name):
+        yield
+
+
+def finish_startup():
+    if _profiler is not None:
+        _profiler.finish_startup()
+
+
+def get_startup_report() -> Optional[Dict[str, Any]]:
+    return _profiler.report() if _profiler is not None else None
@@ -2,7 +2,13 @@ import asyncio
 import logging
 from logging import INFO
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
+
+from src.startup_profiler import finish_startup, start_profiling, startup_phase
+
+# With STARTUP_PROFILE set, time the imports below
+start_profiling()
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,9 +18,14 @@ from src.config import settings
 from src.api.chat import router
 from src.api.sync import router as sync_router
 from src.api.research import router as research_router
-from src.api.graph import router as graph_router
-from src.services.graphiti.index import init as graphiti_init
+from src.api.graph import entity_index, router as graph_router
+from src.api.jobs import router as jobs_router
+from src.services.graphiti.index import init as graphiti_init, query_knowledge_graph
 from src.services.sync.scheduler import start_sync_scheduler, stop_sync_scheduler
+from src.services.sync.leader import start_sync_leader, stop_sync_leader, sync_leader_decided, wait_for_leadership_decision
+from src.services.jobs.queue import stop_job_queue
+from src.services.llm.rate_limit import set_background_priority
+from src.services.readiness import CHECK_GRAPH, CHECK_INDEX, CHECK_WARMUP, get_readiness, prepare_worker
 from src.ascii_art import FULL_BANNER
 
 # Configure logging
@@ -31,10 +42,52 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup event
     # Display ASCII art banner
-    print(FULL_BANNER)
+    with startup_phase("banner"):
+        print(FULL_BANNER)
     
     logger.info("Starting up FWTX NextGen Wiki API")
     
+    with startup_phase("config"):
+        log_configuration()
+    
+    if settings.LEADER_ELECTION_ENABLED:
+        # Every worker runs this lifespan; only the elected one does the singleton work
+        logger.info("Competing for sync leadership...")
+        start_sync_leader(on_elected=_on_elected_leader, on_demoted=_on_demoted_leader)
+    else:
+        start_graphiti_initialization()
+        if settings.ENABLE_SYNC_SCHEDULER:
+            start_scheduler()
+    
+    # /ready reports 503 until the worker is prepared
+    start_worker_preparation()
+    
+    finish_startup()
+    
+    yield
+    
+    # Shutdown event
+    logger.info("Shutting down FWTX Wiki API")
+    
+    if _prepare_task is not None:
+        _prepare_task.cancel()
+    
+    # Cancel background sync and research jobs
+    await stop_job_queue()
+    
+    if settings.LEADER_ELECTION_ENABLED:
+        # Stops the scheduler and hands the lease to another worker
+        await stop_sync_leader()
+    else:
+        # Stop sync scheduler
+        try:
+            stop_sync_scheduler()
+        except Exception as e:
+            logger.error(f"Error stopping sync scheduler: {e}")
+
+
+def log_configuration():
+    """Log the configuration summary shown at startup."""
     # Create compact configuration display
     config_display = f"""
 ╔═══════════════════════════════════════════════════════════════════════════════════════════════════╗
@@ -63,45 +116,72 @@ async def lifespan(app: FastAPI):
 
     if not settings.API_KEY:
         logger.warning("API_KEY not set in environment. Authentication is disabled.")
+
+
+_graphiti_initialization_started = False
+_prepare_task = None
+
+
+def start_graphiti_initialization(hold_readiness: bool = True):
+    """
+    Start Graphiti initialization once per process.
     
-    # Initialize Graphiti knowledge graph
+    hold_readiness keeps /ready at 503 until it finishes; a worker that takes
+    over leadership while already serving doesn't hold it.
+    """
+    global _graphiti_initialization_started
+    if _graphiti_initialization_started:
+        return
+    _graphiti_initialization_started = True
+    if hold_readiness:
+        get_readiness().expect(CHECK_GRAPH)
     try:
         logger.info("Initializing Graphiti knowledge graph...")
         
         # Run initialization in a background task to not block startup
-        asyncio.create_task(initialize_graphiti(settings.LOAD_INITIAL_DATA, settings.SYNC_MODE))
+        asyncio.create_task(initialize_graphiti(settings.LOAD_INITIAL_DATA, settings.SYNC_MODE, hold_readiness))
         if settings.LOAD_INITIAL_DATA:
             logger.info(f"Graphiti initialization started in background (mode: {settings.SYNC_MODE})")
         else:
             logger.info("Graphiti initialization started (basic setup only - set LOAD_INITIAL_DATA=true to load data)")
     except Exception as e:
         logger.error(f"Failed to start Graphiti initialization: {e}")
-    
-    # Start sync scheduler if enabled
-    if settings.ENABLE_SYNC_SCHEDULER:
-        try:
-            logger.info("Starting data sync scheduler...")
+
+
+def start_scheduler():
+    """Start the sync scheduler, logging instead of raising on failure."""
+    try:
+        logger.info("Starting data sync scheduler...")
+        with startup_phase("scheduler_start"):
             start_sync_scheduler()
-            logger.info("Data sync scheduler started")
-        except Exception as e:
-            logger.error(f"Failed to start sync scheduler: {e}")
-    
-    yield
-    
-    # Shutdown event
-    logger.info("Shutting down FWTX Wiki API")
-    
-    # Stop sync scheduler
+        logger.info("Data sync scheduler started")
+    except Exception as e:
+        logger.error(f"Failed to start sync scheduler: {e}")
+
+
+async def _on_elected_leader():
+    # Only an election won at startup holds readiness for the graph load
+    start_graphiti_initialization(hold_readiness=not sync_leader_decided())
+    if settings.ENABLE_SYNC_SCHEDULER:
+        start_scheduler()
+
+
+async def _on_demoted_leader():
     try:
         stop_sync_scheduler()
     except Exception as e:
         logger.error(f"Error stopping sync scheduler: {e}")
 
 
-async def initialize_graphiti(load_initial_data: bool, sync_mode: str = "initial"):
+async def initialize_graphiti(load_initial_data: bool, sync_mode: str = "initial", hold_readiness: bool = True):
     """Background task to initialize Graphiti."""
+    # Data loading yields OpenAI capacity to interactive requests
+    set_background_priority()
     try:
-        await graphiti_init(load_initial_data_flag=load_initial_data, sync_mode=sync_mode)
+        readiness_check = get_readiness().check(CHECK_GRAPH) if hold_readiness else nullcontext()
+        with startup_phase("graphiti_init"):
+            async with readiness_check:
+                await graphiti_init(load_initial_data_flag=load_initial_data, sync_mode=sync_mode)
         logger.info("Graphiti initialization completed successfully")
         
         # If initial data was loaded, log some statistics
@@ -112,6 +192,22 @@ async def initialize_graphiti(load_initial_data: bool, sync_mode: str = "initial
         # Continue running even if initialization fails
         # The app can still serve static files and handle basic requests
 
+
+def start_worker_preparation():
+    """Hold readiness until the worker is prepared, preparing it in the background."""
+    global _prepare_task
+    readiness = get_readiness()
+    readiness.expect(CHECK_INDEX)
+    if settings.READINESS_WARMUP_QUERIES:
+        readiness.expect(CHECK_WARMUP)
+    _prepare_task = asyncio.create_task(prepare_worker(
+        readiness,
+        entity_index.ensure_current,
+        query_knowledge_graph,
+        # The elected worker expects the graph check before the election settles
+        leadership_decided=wait_for_leadership_decision if settings.LEADER_ELECTION_ENABLED else None,
+    ))
+
 # Create FastAPI app
 app = FastAPI(
     title="FWTX Wiki API",
@@ -137,6 +233,7 @@ app.include_router(router)
 app.include_router(sync_router)
 app.include_router(research_router)
 app.include_router(graph_router)
+app.include_router(jobs_router)
 
 # Mount static files
 app.mount("/", StaticFiles(directory="client", html=True), name="static")